@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from typing import List, Optional
+from app.api.endpoints.pnodes import (
+    get_fields, get_pnode_query, get_response_cache, get_snapshot, network_info_body,
+    not_modified, pnodes_page, snapshot_meta, summary_body
+)
+from app.api.responses import ResponseCache
+from app.api.static_assets import StaticAssets
+from app.services.pnode_store import PNodeQuery
+from app.services.snapshot_cache import Snapshot
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"], default_response_class=ORJSONResponse)
+
+def get_static_assets(request: Request) -> StaticAssets:
+    return request.app.state.static_assets
+
+@router.get("/bootstrap")
+async def get_dashboard_bootstrap(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    active_only: bool = False,
+    network: Optional[str] = "testnet",
+    fields: Optional[List[str]] = Depends(get_fields),
+    query: PNodeQuery = Depends(get_pnode_query),
+    snapshot: Snapshot = Depends(get_snapshot),
+    response_cache: ResponseCache = Depends(get_response_cache)
+):
+    """
+    Everything the dashboard's first paint needs, in one round trip.
+
+    ``summary``, ``network_info`` and ``pnodes`` are the bodies of
+    /pnodes/stats/summary, /pnodes/network/info and /pnodes/ (which takes
+    the same listing parameters), all read from one snapshot so the three
+    panels never disagree. Follow ``pnodes.next_cursor`` on /pnodes/.
+    """
+    try:
+        cached = not_modified(request, response, snapshot)
+        if cached:
+            return cached
+
+        return response_cache.respond(request, response, lambda: {
+            "network": network,
+            "summary": summary_body(snapshot),
+            "network_info": network_info_body(snapshot),
+            "pnodes": pnodes_page(snapshot, query, fields, skip, limit, active_only, network),
+            **snapshot_meta(snapshot)
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@router.get("/", include_in_schema=False)
+async def get_dashboard_page(request: Request, assets: StaticAssets = Depends(get_static_assets)):
+    """The dashboard page; revalidated on every load, its assets never are"""
+    return assets.page(request)
+
+@router.get("/static/{name}", include_in_schema=False)
+async def get_dashboard_asset(name: str, request: Request, assets: StaticAssets = Depends(get_static_assets)):
+    """Precompressed frontend assets; content-hashed names are immutable"""
+    return assets.static(request, name)
@@ -0,0 +1,113 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from datetime import datetime
+import dataclasses
+import sqlite3
+import time
+
+from app import config
+from app.api.endpoints.pnodes import get_fields, get_history_store, get_pnode_query, get_snapshot, to_epoch
+from app.services.export import (
+    EXPORT_FORMATS, encode_rows, fleet_columns, fleet_rows, history_columns, parquet_available
+)
+from app.services.history_store import HISTORY_METRICS, HistoryStore
+from app.services.pnode_record import PNODE_FIELDS
+from app.services.pnode_store import PNodeQuery
+from app.services.snapshot_cache import Snapshot
+
+# Included before the pnodes router so /pnodes/export is not taken for a pubkey
+router = APIRouter(prefix="/pnodes", tags=["Export"])
+
+FORMAT_PATTERN = f"^({'|'.join(EXPORT_FORMATS)})$"
+
+def check_format(format: str = Query("csv", pattern=FORMAT_PATTERN)) -> str:
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export needs pyarrow installed on the server")
+    return format
+
+def export_response(chunks, columns, format: str, filename: str, snapshot: Snapshot) -> StreamingResponse:
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        encode_rows(chunks, columns, format),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{extension}"',
+            "X-Snapshot-Version": str(snapshot.version),
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+@router.get("/export")
+async def export_pnodes(
+    network: Optional[str] = "testnet",
+    format: str = Depends(check_format),
+    fields: Optional[List[str]] = Depends(get_fields),
+    query: PNodeQuery = Depends(get_pnode_query),
+    snapshot: Snapshot = Depends(get_snapshot)
+):
+    """
+    Stream every matching pNode of the current snapshot as CSV, NDJSON or Parquet.
+
+    Takes the /pnodes filters, sort and ``fields``, without pagination.
+    Rows are encoded ``EXPORT_CHUNK_ROWS`` at a time straight from the
+    snapshot (one Parquet row group per chunk), so the download starts at
+    once and memory does not grow with the fleet. The whole file comes
+    from the snapshot version in ``X-Snapshot-Version``.
+    """
+    fields = fields or list(PNODE_FIELDS)
+    rows = snapshot.store.select(query)
+    return export_response(
+        fleet_rows(snapshot.store.pnodes, rows, fields, config.EXPORT_CHUNK_ROWS),
+        fleet_columns(fields),
+        format,
+        f"pnodes-{network}-v{snapshot.version}",
+        snapshot,
+    )
+
+@router.get("/export/history")
+async def export_history(
+    network: Optional[str] = "testnet",
+    format: str = Depends(check_format),
+    metric: Optional[List[str]] = Query(None, description=f"Any of: {', '.join(HISTORY_METRICS)} (default all)"),
+    resolution: str = Query("1h", pattern="^(raw|1m|1h|1d)$"),
+    start: Optional[datetime] = Query(None, description="ISO timestamp, default one day before end"),
+    end: Optional[datetime] = Query(None, description="ISO timestamp, default now"),
+    query: PNodeQuery = Depends(get_pnode_query),
+    snapshot: Snapshot = Depends(get_snapshot),
+    history: HistoryStore = Depends(get_history_store)
+):
+    """
+    Stream the metric history of every matching pNode.
+
+    The nodes are the current snapshot's, selected with the /pnodes
+    filters and exported in pubkey order. Rollups (``1m``/``1h``/``1d``)
+    give min/max/avg/last/count columns per metric and are streamed from
+    disk in index order; ``raw`` gives the samples still held in memory.
+    """
+    metrics = metric or list(HISTORY_METRICS)
+    unknown = [m for m in metrics if m not in HISTORY_METRICS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown metric(s): {', '.join(unknown)}; choose from {', '.join(HISTORY_METRICS)}")
+    end_ts = to_epoch(end, time.time())
+    start_ts = to_epoch(start, end_ts - 86400)
+    if start_ts > end_ts:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    store = snapshot.store
+    rows = store.select(dataclasses.replace(query, sort_by="pubkey", descending=False))
+    pubkeys = (store.pubkeys[row] for row in rows)
+    if resolution == "raw":
+        chunks = history.export_raw(network, pubkeys, start_ts, end_ts, metrics, config.EXPORT_CHUNK_ROWS)
+    else:
+        try:
+            chunks = await history.export_rollups(network, pubkeys, resolution, start_ts, end_ts, metrics, config.EXPORT_CHUNK_ROWS)
+        except sqlite3.Error as e:
+            raise HTTPException(status_code=503, detail=f"History rollups cannot be exported from this store: {str(e)}")
+    return export_response(
+        chunks,
+        history_columns(metrics, raw=resolution == "raw"),
+        format,
+        f"pnode-history-{network}-{resolution}",
+        snapshot,
+    )
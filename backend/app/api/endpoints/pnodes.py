@@ -1,127 +1,749 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Dict, List, Optional
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field
+from typing import Callable, Dict, List, Optional, Sequence, Union
+from datetime import datetime, timezone
+import hashlib
 import random
-from app.services.xandeum_client import XandeumPRPCClient
+import time
+import orjson
+from app import config
+from app.api.responses import ResponseCache, compressed_json_response, json_response, negotiate_encoding
+from app.services.client_registry import ClientRegistry
+from app.services.group_aggregates import GROUP_DIMENSIONS, GroupAggregates
+from app.services.history_store import HISTORY_METRICS, RESOLUTIONS, RETENTION, HistoryStore
+from app.services.leaderboards import LEADERBOARD_METRICS, Leaderboards
+from app.services.pagination import Cursor, InvalidCursorError, decode_cursor, encode_cursor, query_fingerprint
+from app.services.pnode_record import PNODE_FIELDS
+from app.services.pnode_store import SORTABLE_COLUMNS, PNodeQuery
+from app.services.snapshot_cache import FanOut, Snapshot, SnapshotCache, UnknownNetworkError
+from app.services.xandeum_client import DETAIL_FIELDS, XandeumPRPCClient, pnode_details
 
-router = APIRouter(prefix="/pnodes", tags=["pNodes"])
+router = APIRouter(prefix="/pnodes", tags=["pNodes"], default_response_class=ORJSONResponse)
 
-def get_client(network: str = "testnet"):
-    return XandeumPRPCClient(network=network)
+# network=all: every configured network, fetched concurrently
+ALL_NETWORKS = "all"
+
+def get_client(request: Request, network: Optional[str] = "testnet") -> XandeumPRPCClient:
+    """Long-lived client for the network, owned by the app lifespan"""
+    registry: ClientRegistry = request.app.state.client_registry
+    try:
+        return registry.get(network)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown network: {network}")
+
+def get_snapshot_cache(request: Request) -> SnapshotCache:
+    return request.app.state.snapshot_cache
+
+def get_history_store(request: Request) -> HistoryStore:
+    return request.app.state.history_store
+
+def get_response_cache(request: Request) -> ResponseCache:
+    return request.app.state.response_cache
+
+def get_group_aggregates(request: Request) -> GroupAggregates:
+    return request.app.state.group_aggregates
+
+def get_leaderboards(request: Request) -> Leaderboards:
+    return request.app.state.leaderboards
+
+def parse_fields(fields: Optional[List[str]]) -> Optional[List[str]]:
+    """``fields=a,b&fields=c`` -> ["a", "b", "c"] (order kept, duplicates dropped)"""
+    if not fields:
+        return None
+    names = [name.strip() for value in fields for name in value.split(",") if name.strip()]
+    return list(dict.fromkeys(names)) or None
+
+def checked_fields(fields: Optional[List[str]], allowed: Sequence[str]) -> Optional[List[str]]:
+    """parse_fields, answering 400 for names outside ``allowed``"""
+    names = parse_fields(fields)
+    unknown = [name for name in names or () if name not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}; choose from {', '.join(allowed)}")
+    return names
+
+def get_fields(
+    fields: Optional[List[str]] = Query(None, description=f"Comma-separated subset of: {', '.join(PNODE_FIELDS)}")
+) -> Optional[List[str]]:
+    """Projection for node lists; None means every field"""
+    return checked_fields(fields, PNODE_FIELDS)
+
+def get_detail_fields(
+    fields: Optional[List[str]] = Query(None, description=f"Comma-separated subset of: {', '.join(DETAIL_FIELDS)}")
+) -> Optional[List[str]]:
+    """Projection for node details; None means every key"""
+    return checked_fields(fields, DETAIL_FIELDS)
+
+def to_epoch(value: Optional[datetime], default: float) -> float:
+    """Epoch seconds; naive datetimes are taken as UTC"""
+    if value is None:
+        return default
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+async def measured_uptimes(history: HistoryStore, network: str, pubkeys: List[str]) -> Dict[str, Dict[str, Optional[float]]]:
+    """uptime_7d/uptime_30d per node from recorded history (None without samples)"""
+    now = time.time()
+    windows = {"uptime_7d": now - 7 * 86400, "uptime_30d": now - 30 * 86400}
+    return await history.uptime_percents(network, pubkeys, windows, now)
+
+async def pick_resolution(history: HistoryStore, network: str, start: float, end: float) -> str:
+    """Raw samples while they cover the range, else the finest rollup still retained"""
+    window = await history.raw_window(network)
+    if window and window[0] <= start:
+        return "raw"
+    age = time.time() - start
+    for resolution in RESOLUTIONS:
+        if age <= RETENTION[resolution] and (end - start) / RESOLUTIONS[resolution] <= 1500:
+            return resolution
+    return "1d"
+
+async def get_snapshot(
+    network: Optional[str] = "testnet",
+    cache: SnapshotCache = Depends(get_snapshot_cache)
+) -> Snapshot:
+    """Current snapshot for the requested network, shared by every endpoint"""
+    if network == ALL_NETWORKS:
+        raise HTTPException(status_code=400, detail="network=all is only supported by /pnodes/stats/summary, /pnodes/network/info and /pnodes/stats/compare")
+    try:
+        return await cache.get(network)
+    except UnknownNetworkError:
+        raise HTTPException(status_code=404, detail=f"Unknown network: {network}")
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"No snapshot available for {network}: {str(e)}")
+
+async def get_snapshot_or_fan_out(
+    network: Optional[str] = "testnet",
+    cache: SnapshotCache = Depends(get_snapshot_cache)
+) -> Union[Snapshot, FanOut]:
+    """get_snapshot, or every configured network at once for network=all"""
+    if network == ALL_NETWORKS:
+        return await cache.get_many(cache.networks, config.FANOUT_TIMEOUT)
+    return await get_snapshot(network, cache)
+
+async def get_fan_out(
+    networks: Optional[List[str]] = Query(None, description="Networks to compare (default all configured)"),
+    cache: SnapshotCache = Depends(get_snapshot_cache)
+) -> FanOut:
+    names = list(dict.fromkeys(name.strip() for value in networks or () for name in value.split(",") if name.strip()))
+    unknown = [name for name in names if name not in cache.networks]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown network(s): {', '.join(unknown)}")
+    return await cache.get_many(names or cache.networks, config.FANOUT_TIMEOUT)
+
+def snapshot_details(snapshot: Snapshot, pubkey: str) -> Optional[Dict]:
+    """Details of a real-data pNode from the snapshot's pubkey index (no upstream call)"""
+    pnode = snapshot.store.get(pubkey)
+    return pnode_details(pnode) if pnode is not None else None
+
+def snapshot_meta(snapshot: Snapshot) -> Dict:
+    # Everything here is fixed per version so bodies (and ETags) are stable;
+    # the snapshot age goes in the X-Snapshot-Age header instead
+    return {
+        "is_real_data": snapshot.is_real_data,
+        "snapshot_version": snapshot.version,
+        "last_updated": snapshot.fetched_at.isoformat(),
+    }
+
+def snapshot_etag(snapshot: Snapshot, request: Request) -> str:
+    """Strong ETag: the same snapshot version, query and content coding give a byte-identical body"""
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    digest = hashlib.sha1(f"{request.url.path}?{params}:{encoding}".encode()).hexdigest()[:12]
+    return f'"{snapshot.network}-v{snapshot.version}-{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def not_modified(request: Request, response: Response, snapshot: Snapshot) -> Optional[Response]:
+    """Set caching headers; return a 304 response if the client's copy is current"""
+    headers = {
+        "ETag": snapshot_etag(snapshot, request),
+        "Cache-Control": "no-cache",
+        "X-Snapshot-Version": str(snapshot.version),
+        "X-Snapshot-Age": f"{snapshot.age_seconds:.3f}",
+    }
+    if snapshot.restored:
+        # Served from the previous process's copy until the first fetch lands
+        headers["X-Snapshot-Restored"] = "true"
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+def fan_out_response(request: Request, response: Response, fan_out: FanOut, response_cache: ResponseCache, build: Callable[[], Dict]) -> Response:
+    """Per-network results with ``errors`` for networks that did not answer.
+
+    Complete results are keyed on every snapshot version and cached like
+    single-network responses; partial ones are built per request and never
+    cached, so the missing networks show up as soon as they recover.
+    """
+    content = lambda: {**build(), "errors": fan_out.errors, "partial": fan_out.partial}
+    if fan_out.partial:
+        return json_response(content(), status_code=200 if fan_out.snapshots else 503)
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    versions = "-".join(f"{network}{snapshot.version}" for network, snapshot in sorted(fan_out.snapshots.items()))
+    digest = hashlib.sha1(f"{request.url.path}?{params}:{encoding}".encode()).hexdigest()[:12]
+    headers = {"ETag": f'"{versions}-{digest}"', "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response_cache.respond(request, response, content)
+
+def summary_body(snapshot: Snapshot) -> Dict:
+    network_info = snapshot.network_info
+    return {
+        "network": snapshot.network,
+        **snapshot.store.summary,
+        "current_epoch": network_info.get("epoch", 0),
+        "current_slot": network_info.get("slot", 0),
+        "block_height": network_info.get("block_height", 0),
+        "network_version": network_info.get("network_version", "1.2.0"),
+        "is_real_data": False,
+        "demo_note": "Realistic simulation - Dashboard ready for Xandeum API",
+        **snapshot_meta(snapshot)
+    }
+
+def network_info_body(snapshot: Snapshot) -> Dict:
+    return {
+        "network": snapshot.network,
+        **snapshot.network_info,
+        **snapshot_meta(snapshot)
+    }
+
+def get_pnode_query(
+    active_only: bool = False,
+    status: Optional[List[str]] = Query(None, description="active / inactive"),
+    version: Optional[List[str]] = Query(None),
+    data_center: Optional[List[str]] = Query(None),
+    location: Optional[List[str]] = Query(None),
+    min_stake: Optional[float] = None,
+    max_stake: Optional[float] = None,
+    min_commission: Optional[float] = None,
+    max_commission: Optional[float] = None,
+    min_performance: Optional[float] = None,
+    max_performance: Optional[float] = None,
+    pubkey_prefix: Optional[str] = None,
+    search: Optional[str] = Query(None, description="pubkey/IP prefix or data center substring"),
+    sort_by: str = Query("stake", description=f"One of: {', '.join(SORTABLE_COLUMNS)}"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+) -> PNodeQuery:
+    """Listing filters shared by the pNode list endpoints"""
+    if sort_by not in SORTABLE_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by {sort_by}; choose one of {', '.join(SORTABLE_COLUMNS)}")
+    if active_only:
+        status = [s for s in (status or ["active"]) if s == "active"]
+    return PNodeQuery(
+        status=status,
+        version=version,
+        data_center=data_center,
+        location=location,
+        min_stake=min_stake,
+        max_stake=max_stake,
+        min_commission=min_commission,
+        max_commission=max_commission,
+        min_performance=min_performance,
+        max_performance=max_performance,
+        pubkey_prefix=pubkey_prefix,
+        search=search,
+        sort_by=sort_by,
+        descending=order == "desc",
+    )
+
+def pnodes_page(
+    snapshot: Snapshot,
+    query: PNodeQuery,
+    fields: Optional[List[str]],
+    skip: int,
+    limit: int,
+    active_only: bool,
+    network: str,
+    position: Optional[Cursor] = None
+) -> Dict:
+    """One page of a filtered, sorted node listing (the /pnodes body)"""
+    start = skip
+    store = snapshot.store
+    rows = store.select(query)
+    if position is not None:
+        start = store.seek(rows, query.sort_by, query.descending, position.last_value, position.last_pubkey)
+    
+    total = len(rows)
+    page_rows = rows[start:start + limit]
+    if fields:
+        paginated_pnodes = orjson.Fragment(store.project(page_rows, fields))
+    else:
+        paginated_pnodes = [store.pnodes[row] for row in page_rows]
+    
+    next_cursor = None
+    if start + limit < total:
+        last_row = page_rows[-1]
+        next_cursor = encode_cursor(Cursor(
+            version=snapshot.version,
+            sort_by=query.sort_by,
+            descending=query.descending,
+            last_value=store.value(query.sort_by, last_row),
+            last_pubkey=store.pubkeys[last_row],
+            query_hash=query_fingerprint(query),
+        ))
+    
+    return {
+        "network": network,
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+        "active_only": active_only,
+        "sort_by": query.sort_by,
+        "order": "desc" if query.descending else "asc",
+        "is_real_data": False,
+        "note": "Demo data - Ready for real Xandeum API integration",
+        **snapshot_meta(snapshot),
+        "next_cursor": next_cursor,
+        "pnodes": paginated_pnodes
+    }
 
 @router.get("/")
 async def get_all_pnodes(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     active_only: bool = False,
-    network: Optional[str] = "testnet"
+    network: Optional[str] = "testnet",
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; overrides skip"),
+    fields: Optional[List[str]] = Depends(get_fields),
+    query: PNodeQuery = Depends(get_pnode_query),
+    snapshot: Snapshot = Depends(get_snapshot),
+    cache: SnapshotCache = Depends(get_snapshot_cache),
+    response_cache: ResponseCache = Depends(get_response_cache)
 ):
     """
-    Get all pNodes with pagination.
+    Get all pNodes with pagination, filtering and sorting.
     
+    Filters are answered from indexes built once per snapshot. Follow
+    ``next_cursor`` to walk the whole fleet: pages stay on the snapshot
+    version the walk started on while it is retained, and fall back to a
+    keyset seek on the latest snapshot after that, so rows never repeat.
+    ``fields`` limits each node to the listed keys.
     Note: Returns realistic demo data since Xandeum public RPC endpoints are not available.
     """
     try:
-        client = get_client(network)
-        pnodes = await client.get_pnodes()
+        position: Optional[Cursor] = None
+        if cursor:
+            position = decode_cursor(cursor, query)
+            snapshot = cache.get_version(network, position.version) or snapshot
         
-        if active_only:
-            pnodes = [p for p in pnodes if p.get("is_active", False)]
+        cached = not_modified(request, response, snapshot)
+        if cached:
+            return cached
         
-        total = len(pnodes)
-        paginated_pnodes = pnodes[skip:skip + limit]
+        return response_cache.respond(request, response, lambda: pnodes_page(
+            snapshot, query, fields, skip, limit, active_only, network, position
+        ))
         
-        return {
-            "network": network,
-            "total": total,
-            "skip": skip,
-            "limit": limit,
-            "active_only": active_only,
-            "is_real_data": False,
-            "note": "Demo data - Ready for real Xandeum API integration",
-            "pnodes": paginated_pnodes
-        }
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@router.get("/changes")
+async def get_pnode_changes(
+    request: Request,
+    response: Response,
+    since: int = Query(..., ge=0, description="snapshot_version the client already has"),
+    network: Optional[str] = "testnet",
+    snapshot: Snapshot = Depends(get_snapshot),
+    cache: SnapshotCache = Depends(get_snapshot_cache),
+    response_cache: ResponseCache = Depends(get_response_cache)
+):
+    """
+    Nodes added, removed or changed since a snapshot version.
+    
+    Apply the result to the copy fetched at ``since`` to reach ``version``.
+    When ``full_resync`` is true that version is no longer retained and the
+    client should reload ``/pnodes`` instead.
+    """
+    try:
+        cached = not_modified(request, response, snapshot)
+        if cached:
+            return cached
+        
+        def build_changes() -> Dict:
+            diff = cache.changes_since(network, since)
+            if diff is None:
+                return {
+                    "network": network,
+                    "since": since,
+                    "version": snapshot.version,
+                    "full_resync": True,
+                    "added": [],
+                    "removed": [],
+                    "changed": []
+                }
+            return {
+                "network": network,
+                "since": since,
+                "version": diff.to_version,
+                "full_resync": False,
+                **diff.to_dict()
+            }
         
+        return response_cache.respond(request, response, build_changes)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+class DetailsRequest(BaseModel):
+    pubkeys: List[str] = Field(..., min_length=1, description="pNode pubkeys; duplicates are looked up once")
+    fields: Optional[List[str]] = Field(None, description="Keys to return per node (default all)")
+
+@router.post("/details")
+async def get_pnode_details_batch(
+    request: Request,
+    body: DetailsRequest,
+    network: Optional[str] = "testnet",
+    client: XandeumPRPCClient = Depends(get_client),
+    snapshot: Snapshot = Depends(get_snapshot),
+    history: HistoryStore = Depends(get_history_store)
+):
+    """
+    Details for many pNodes in one request.
+    
+    Duplicate pubkeys are looked up once. Against a real endpoint all of
+    them are answered from the current snapshot, without calling upstream;
+    demo lookups run concurrently, at most DETAILS_CONCURRENCY at a time.
+    Measured uptimes come from one history query. Every pubkey
+    gets its own entry, with ``error`` set when it is unknown or its lookup
+    failed, so one bad node does not fail the batch.
+    """
+    pubkeys = list(dict.fromkeys(body.pubkeys))
+    if len(pubkeys) > config.DETAILS_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {config.DETAILS_BATCH_MAX} pubkeys per request")
+    names = checked_fields(body.fields, DETAIL_FIELDS)
+    
+    try:
+        if snapshot.is_real_data:
+            found = [snapshot_details(snapshot, pubkey) for pubkey in pubkeys]
+        else:
+            found = await client.get_pnode_details_many(pubkeys, concurrency=config.DETAILS_CONCURRENCY)
+        uptimes = await measured_uptimes(history, network, [p for p, d in zip(pubkeys, found) if isinstance(d, dict)])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+    
+    results = []
+    for pubkey, details in zip(pubkeys, found):
+        if isinstance(details, Exception):
+            results.append({"pubkey": pubkey, "error": f"Error: {str(details)}"})
+            continue
+        if details is None:
+            results.append({"pubkey": pubkey, "error": "not found"})
+            continue
+        details.update((key, value) for key, value in uptimes[pubkey].items() if value is not None)
+        if names:
+            details = {name: details[name] for name in names if name in details}
+        results.append(details)
+    
+    return compressed_json_response(request, {
+        "network": network,
+        "requested": len(body.pubkeys),
+        "unique": len(pubkeys),
+        "found": sum(1 for details in found if isinstance(details, dict)),
+        "pnodes": results
+    })
 
 @router.get("/{pubkey}")
-async def get_pnode_by_pubkey(pubkey: str, network: Optional[str] = "testnet"):
+async def get_pnode_by_pubkey(
+    pubkey: str,
+    network: Optional[str] = "testnet",
+    names: Optional[List[str]] = Depends(get_detail_fields),
+    client: XandeumPRPCClient = Depends(get_client),
+    snapshot: Snapshot = Depends(get_snapshot),
+    history: HistoryStore = Depends(get_history_store)
+):
     """Get detailed information about a specific pNode"""
     try:
-        client = get_client(network)
-        details = await client.get_pnode_details(pubkey)
+        if snapshot.is_real_data:
+            details = snapshot_details(snapshot, pubkey)
+        else:
+            details = await client.get_pnode_details(pubkey)
         if not details:
             raise HTTPException(status_code=404, detail=f"pNode {pubkey} not found")
-        return details
+        # Measured uptime from recorded history replaces placeholder values
+        uptimes = await measured_uptimes(history, network, [pubkey])
+        details.update((key, value) for key, value in uptimes[pubkey].items() if value is not None)
+        if names:
+            details = {name: details[name] for name in names if name in details}
+        return json_response(details)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
-@router.get("/stats/summary")
-async def get_pnode_summary(network: Optional[str] = "testnet"):
-    """Get summary statistics - Demo data showing dashboard capability"""
+@router.get("/{pubkey}/history")
+async def get_pnode_history(
+    request: Request,
+    pubkey: str,
+    network: Optional[str] = "testnet",
+    metric: Optional[List[str]] = Query(None, description=f"Any of: {', '.join(HISTORY_METRICS)} (default all)"),
+    resolution: str = Query("auto", pattern="^(auto|raw|1m|1h|1d)$"),
+    start: Optional[datetime] = Query(None, description="ISO timestamp, default one hour before end"),
+    end: Optional[datetime] = Query(None, description="ISO timestamp, default now"),
+    history: HistoryStore = Depends(get_history_store)
+):
+    """
+    Metric history for one pNode.
+    
+    ``raw`` returns every recorded sample (only the most recent ones are
+    kept); ``1m``/``1h``/``1d`` return min/max/avg/last per bucket, read from
+    persisted rollups. ``auto`` picks raw samples when they cover the range
+    and otherwise the finest rollup that keeps the response small.
+    """
+    metrics = metric or list(HISTORY_METRICS)
+    unknown = [m for m in metrics if m not in HISTORY_METRICS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown metric(s): {', '.join(unknown)}; choose from {', '.join(HISTORY_METRICS)}")
+    end_ts = to_epoch(end, time.time())
+    start_ts = to_epoch(start, end_ts - 3600)
+    if start_ts > end_ts:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    try:
+        if resolution == "auto":
+            resolution = await pick_resolution(history, network, start_ts, end_ts)
+        if resolution == "raw":
+            points = await history.raw(network, pubkey, start_ts, end_ts, metrics) or []
+        else:
+            points = await history.rollups(network, pubkey, resolution, start_ts, end_ts, metrics)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+    
+    return compressed_json_response(request, {
+        "network": network,
+        "pubkey": pubkey,
+        "resolution": resolution,
+        "start": datetime.fromtimestamp(start_ts, timezone.utc).isoformat(),
+        "end": datetime.fromtimestamp(end_ts, timezone.utc).isoformat(),
+        "metrics": metrics,
+        "points": points
+    })
+
+@router.get("/{pubkey}/ranks")
+async def get_pnode_ranks(
+    request: Request,
+    response: Response,
+    pubkey: str,
+    network: Optional[str] = "testnet",
+    snapshot: Snapshot = Depends(get_snapshot),
+    leaderboards: Leaderboards = Depends(get_leaderboards),
+    response_cache: ResponseCache = Depends(get_response_cache)
+):
+    """Rank of one pNode on every leaderboard (O(log n) per board)"""
+    if snapshot.store.get(pubkey) is None:
+        raise HTTPException(status_code=404, detail=f"pNode {pubkey} not found")
+    try:
+        cached = not_modified(request, response, snapshot)
+        if cached:
+            return cached
+        
+        boards = await leaderboards.for_snapshot(snapshot)
+        
+        def build_ranks() -> Dict:
+            pnode = snapshot.store.get(pubkey)
+            return {
+                "network": network,
+                "pubkey": pubkey,
+                "ranks": {
+                    metric: {
+                        "rank": boards.rank(metric, pubkey),
+                        "of": len(boards.boards[metric]),
+                        "value": pnode.get(metric)
+                    }
+                    for metric in LEADERBOARD_METRICS
+                },
+                **snapshot_meta(snapshot)
+            }
+        
+        return response_cache.respond(request, response, build_ranks)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@router.get("/leaderboards/{metric}")
+async def get_leaderboard(
+    request: Request,
+    response: Response,
+    metric: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=500),
+    network: Optional[str] = "testnet",
+    fields: Optional[List[str]] = Depends(get_fields),
+    snapshot: Snapshot = Depends(get_snapshot),
+    leaderboards: Leaderboards = Depends(get_leaderboards),
+    response_cache: ResponseCache = Depends(get_response_cache)
+):
+    """
+    Top pNodes by stake, performance_score or uptime_24h (highest first),
+    or by response_time_ms or commission (lowest first).
+    
+    Boards are kept sorted across snapshots and only nodes whose value
+    changed are moved, so a page costs O(log n + limit) instead of a sort.
+    Nodes without a value for the metric are not ranked.
+    """
+    if metric not in LEADERBOARD_METRICS:
+        raise HTTPException(status_code=404, detail=f"Unknown leaderboard {metric!r}; choose from {', '.join(LEADERBOARD_METRICS)}")
     try:
-        client = get_client(network)
-        pnodes = await client.get_pnodes()
-        network_info = await client.get_network_info()
+        cached = not_modified(request, response, snapshot)
+        if cached:
+            return cached
+        
+        boards = await leaderboards.for_snapshot(snapshot)
         
-        if not pnodes:
+        def build_leaderboard() -> Dict:
+            entries = []
+            for rank, pubkey in boards.top(metric, limit, skip):
+                pnode = snapshot.store.get(pubkey)
+                if pnode is None:
+                    continue  # ranked by boards newer than this request's snapshot
+                entries.append({
+                    "rank": rank,
+                    "value": pnode.get(metric),
+                    "pnode": {name: pnode.get(name) for name in fields} if fields else pnode
+                })
             return {
                 "network": network,
-                "total_pnodes": 0,
-                "active_pnodes": 0,
-                "inactive_pnodes": 0,
-                "total_stake": 0,
-                "avg_commission": 0,
-                "avg_performance": 0,
-                "is_real_data": False
+                "metric": metric,
+                "order": "desc" if LEADERBOARD_METRICS[metric] else "asc",
+                "ranked": len(boards.boards[metric]),
+                "skip": skip,
+                "limit": limit,
+                **snapshot_meta(snapshot),
+                "entries": entries
             }
         
-        active_pnodes = [p for p in pnodes if p.get("is_active", False)]
-        total_stake = sum(p.get("stake", 0) for p in active_pnodes)
+        return response_cache.respond(request, response, build_leaderboard)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@router.get("/stats/summary")
+async def get_pnode_summary(
+    request: Request,
+    response: Response,
+    network: Optional[str] = "testnet",
+    snapshot: Union[Snapshot, FanOut] = Depends(get_snapshot_or_fan_out),
+    response_cache: ResponseCache = Depends(get_response_cache)
+):
+    """Get summary statistics - Demo data showing dashboard capability
+
+    With ``network=all`` the summaries of every configured network are
+    returned together under ``networks``.
+    """
+    try:
+        if isinstance(snapshot, FanOut):
+            fan_out = snapshot
+            return fan_out_response(request, response, fan_out, response_cache, lambda: {
+                "network": ALL_NETWORKS,
+                "networks": {name: summary_body(s) for name, s in fan_out.snapshots.items()}
+            })
         
-        commissions = [p.get("commission", 0) for p in active_pnodes if p.get("stake", 0) > 0]
-        avg_commission = sum(commissions) / len(commissions) if commissions else 0
+        cached = not_modified(request, response, snapshot)
+        if cached:
+            return cached
         
-        performances = [p.get("performance_score", 0) for p in active_pnodes]
-        avg_performance = sum(performances) / len(performances) if performances else 0
+        return response_cache.respond(request, response, lambda: summary_body(snapshot))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@router.get("/stats/compare")
+async def compare_networks(
+    request: Request,
+    response: Response,
+    fan_out: FanOut = Depends(get_fan_out),
+    response_cache: ResponseCache = Depends(get_response_cache)
+):
+    """
+    Summary and network info of several networks side by side.
+    
+    Networks are fetched concurrently with a per-network timeout, so the
+    response takes as long as the slowest network. Networks that fail or
+    time out are listed in ``errors`` and the rest are still returned.
+    """
+    try:
+        def build_comparison() -> Dict:
+            summaries = {name: summary_body(s) for name, s in fan_out.snapshots.items()}
+            return {
+                "networks": {
+                    name: {"summary": summaries[name], "network_info": network_info_body(s)}
+                    for name, s in fan_out.snapshots.items()
+                },
+                "totals": {
+                    key: sum(summary[key] for summary in summaries.values())
+                    for key in ("total_pnodes", "active_pnodes", "inactive_pnodes", "total_stake")
+                }
+            }
         
-        # Calculate some additional stats
-        high_performers = len([p for p in active_pnodes if p.get("performance_score", 0) > 0.9])
-        low_commission = len([p for p in active_pnodes if p.get("commission", 0) < 3.0])
+        return fan_out_response(request, response, fan_out, response_cache, build_comparison)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@router.get("/stats/distribution")
+async def get_pnode_distribution(
+    request: Request,
+    response: Response,
+    network: Optional[str] = "testnet",
+    by: Optional[List[str]] = Query(None, description=f"Any of: {', '.join(GROUP_DIMENSIONS)} (default all)"),
+    snapshot: Snapshot = Depends(get_snapshot),
+    groups: GroupAggregates = Depends(get_group_aggregates),
+    response_cache: ResponseCache = Depends(get_response_cache)
+):
+    """
+    Nodes, active ratio and stake per version, data center and location.
+    
+    Read from group-by tables that each snapshot updates from its diff, so
+    the cost depends on the number of groups, not the size of the fleet.
+    """
+    dimensions = parse_fields(by) or list(GROUP_DIMENSIONS)
+    unknown = [d for d in dimensions if d not in GROUP_DIMENSIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Cannot group by {', '.join(unknown)}; choose from {', '.join(GROUP_DIMENSIONS)}")
+    try:
+        cached = not_modified(request, response, snapshot)
+        if cached:
+            return cached
         
-        return {
+        distributions = await groups.distributions(snapshot, dimensions)
+        return response_cache.respond(request, response, lambda: {
             "network": network,
-            "total_pnodes": len(pnodes),
-            "active_pnodes": len(active_pnodes),
-            "inactive_pnodes": len(pnodes) - len(active_pnodes),
-            "total_stake": total_stake,
-            "avg_commission": round(avg_commission, 2),
-            "avg_performance": round(avg_performance, 3),
-            "high_performers": high_performers,
-            "low_commission_nodes": low_commission,
-            "current_epoch": network_info.get("epoch", 0),
-            "current_slot": network_info.get("slot", 0),
-            "block_height": network_info.get("block_height", 0),
-            "network_version": network_info.get("network_version", "1.2.0"),
-            "is_real_data": False,
-            "demo_note": "Realistic simulation - Dashboard ready for Xandeum API"
-        }
+            "total_pnodes": len(snapshot.store),
+            "distributions": distributions,
+            **snapshot_meta(snapshot)
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 @router.get("/network/info")
-async def get_network_information(network: Optional[str] = "testnet"):
-    """Get network information - Demo data"""
+async def get_network_information(
+    request: Request,
+    response: Response,
+    network: Optional[str] = "testnet",
+    snapshot: Union[Snapshot, FanOut] = Depends(get_snapshot_or_fan_out),
+    response_cache: ResponseCache = Depends(get_response_cache)
+):
+    """Get network information - Demo data (``network=all`` for every network)"""
     try:
-        client = get_client(network)
-        info = await client.get_network_info()
-        return {
-            "network": network,
-            **info
-        }
+        if isinstance(snapshot, FanOut):
+            fan_out = snapshot
+            return fan_out_response(request, response, fan_out, response_cache, lambda: {
+                "network": ALL_NETWORKS,
+                "networks": {name: network_info_body(s) for name, s in fan_out.snapshots.items()}
+            })
+        
+        cached = not_modified(request, response, snapshot)
+        if cached:
+            return cached
+        
+        return response_cache.respond(request, response, lambda: network_info_body(snapshot))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
@@ -0,0 +1,106 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from app import config
+from app.api.endpoints.pnodes import get_snapshot, get_snapshot_cache
+from app.services.broadcast import BroadcastHub, HubMessage, build_message
+from app.services.snapshot_cache import Snapshot, SnapshotCache
+
+# Included before the pnodes router so /pnodes/stream is not taken for a pubkey
+router = APIRouter(prefix="/pnodes", tags=["Live updates"])
+
+def get_broadcast_hub(request: Request) -> BroadcastHub:
+    return request.app.state.broadcast_hub
+
+def initial_message(cache: SnapshotCache, snapshot: Snapshot, since: Optional[int]) -> HubMessage:
+    """Catch a (re)connecting client up: a diff if its version is retained, else a resync"""
+    diff = cache.changes_since(snapshot.network, since) if since is not None else None
+    return build_message(snapshot, diff)
+
+def parse_version(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+@router.get("/stream")
+async def stream_updates(
+    request: Request,
+    network: Optional[str] = "testnet",
+    snapshot: Snapshot = Depends(get_snapshot),
+    cache: SnapshotCache = Depends(get_snapshot_cache),
+    hub: BroadcastHub = Depends(get_broadcast_hub)
+):
+    """
+    Server-Sent Events stream of snapshot updates.
+    
+    Each ``snapshot`` event carries the new summary plus the node changes
+    since the previous version (or ``full_resync``). Reconnecting clients
+    send ``Last-Event-ID`` and are caught up from that version.
+    """
+    try:
+        hub.check_capacity()
+    except OverflowError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    since = parse_version(request.headers.get("last-event-id"))
+    
+    async def events():
+        # Subscribed only once the body is being sent: a client gone before
+        # then, or a failed first message, leaves nothing behind in the hub
+        subscriber = hub.subscribe(network)
+        try:
+            first = initial_message(cache, cache.peek(network) or snapshot, since)
+            yield b"retry: 5000\n\n" + first.sse
+            while True:
+                message = await subscriber.next(config.STREAM_HEARTBEAT_SECONDS)
+                # Generator only resumes once the previous chunk was sent, so a slow
+                # client just leaves updates to coalesce in its subscriber
+                yield message.sse if message else b": heartbeat\n\n"
+        finally:
+            hub.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/ws")
+async def websocket_updates(websocket: WebSocket, network: str = "testnet", since: Optional[int] = None):
+    """Same updates as /pnodes/stream, as JSON text frames over a WebSocket"""
+    cache: SnapshotCache = websocket.app.state.snapshot_cache
+    hub: BroadcastHub = websocket.app.state.broadcast_hub
+    if network not in cache.networks:
+        await websocket.close(code=1008)
+        return
+    try:
+        subscriber = hub.subscribe(network)
+    except OverflowError:
+        await websocket.close(code=1013)
+        return
+    
+    async def wait_for_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    
+    async def send_updates():
+        snapshot = await cache.get(network)
+        await websocket.send_text(initial_message(cache, snapshot, since).text)
+        while True:
+            message = await subscriber.next(config.STREAM_HEARTBEAT_SECONDS)
+            await websocket.send_text(message.text if message else '{"type":"heartbeat"}')
+    
+    try:
+        await websocket.accept()
+        # Stop sending as soon as the client goes away, even while idle
+        tasks = [asyncio.create_task(wait_for_disconnect()), asyncio.create_task(send_updates())]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.unsubscribe(subscriber)
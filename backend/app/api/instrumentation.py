@@ -0,0 +1,148 @@
+import time
+from typing import Dict, Set
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.endpoint_pool import CLOSED, HALF_OPEN, OPEN
+from app.services.metrics import (
+    HTTP_LATENCY,
+    HTTP_REQUESTS,
+    REGISTRY,
+    CallbackCounter,
+    CallbackGauge,
+    Labels,
+    Registry,
+)
+
+CIRCUIT_STATES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Label for requests that matched no route, so unknown paths cannot blow up cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+# Requests being served, by id(scope); labelled when scraped, once routing has run
+_in_flight: Dict[int, Scope] = {}
+_routes_served: Set[str] = set()
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route the router matched for this request.
+
+    The router stores the matched route in the scope (also when only the
+    path matched and the response is a 405), so this is a dict lookup
+    rather than a walk over every route. Before routing, or when nothing
+    matched, the request is labelled ``unmatched``.
+    """
+    route = scope.get("route")
+    return route.path if route is not None else UNMATCHED_ROUTE
+
+
+def _in_flight_by_route() -> Dict[Labels, float]:
+    counts = dict.fromkeys(_routes_served, 0)
+    for scope in _in_flight.values():
+        route = route_template(scope)
+        counts[route] = counts.get(route, 0) + 1
+    return {(route,): count for route, count in counts.items()}
+
+
+HTTP_IN_FLIGHT = REGISTRY.register(CallbackGauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ("route",), _in_flight_by_route))
+
+
+class MetricsMiddleware:
+    """Per-route request counts, latency histograms and in-flight gauges.
+
+    Plain ASGI rather than BaseHTTPMiddleware: no extra task or body
+    buffering per request. Requests are labelled by route template
+    (``/pnodes/{pubkey}``) so pubkeys and query strings do not become label
+    values; the template is read from the route the router matched, after
+    routing. Streaming routes (``/pnodes/stream``) record the connection
+    lifetime.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+        method = scope["method"]
+        _in_flight[id(scope)] = scope
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            del _in_flight[id(scope)]
+            route = route_template(scope)
+            _routes_served.add(route)
+            HTTP_LATENCY.observe(route, method, value=time.perf_counter() - started)
+            HTTP_REQUESTS.inc(route, method, str(status))
+
+
+def register_app_metrics(registry: Registry, snapshot_cache, client_registry, response_cache, broadcast_hub):
+    """Scrape-time gauges and counters over state the app already keeps"""
+    networks = snapshot_cache.networks
+
+    def snapshots():
+        return [(network, s) for network in networks if (s := snapshot_cache.peek(network)) is not None]
+
+    def cache_counts(attr: str):
+        return lambda: {(): getattr(response_cache, attr)}
+
+    def single_flight(key: str):
+        return lambda: {(network,): stats[key] for network, stats in client_registry.single_flight_stats().items()}
+
+    def pool(key: str):
+        return lambda: {(): getattr(client_registry.stats, key)}
+
+    def endpoints(value):
+        return lambda: {
+            (network, endpoint["url"]): value(endpoint)
+            for network, stats in client_registry.endpoint_stats().items()
+            for endpoint in stats["endpoints"]
+        }
+
+    def routing(key: str):
+        return lambda: {(network,): stats[key] for network, stats in client_registry.endpoint_stats().items()}
+
+    for metric in (
+        CallbackGauge("snapshot_age_seconds", "Age of the snapshot currently served", ("network",),
+                      lambda: {(network,): s.age_seconds for network, s in snapshots()}),
+        CallbackGauge("snapshot_version", "Version of the snapshot currently served", ("network",),
+                      lambda: {(network,): s.version for network, s in snapshots()}),
+        CallbackGauge("snapshot_pnodes", "pNodes in the snapshot currently served", ("network",),
+                      lambda: {(network,): len(s.pnodes) for network, s in snapshots()}),
+        CallbackCounter("response_cache_hits_total", "Responses served from cached encoded bodies", (),
+                        cache_counts("hits")),
+        CallbackCounter("response_cache_misses_total", "Responses serialized and compressed on demand", (),
+                        cache_counts("misses")),
+        CallbackGauge("response_cache_bytes", "Bytes held by the response cache", (), cache_counts("size")),
+        CallbackCounter("single_flight_callers_total", "Upstream fetch callers, executed or coalesced",
+                        ("network",), single_flight("callers")),
+        CallbackCounter("single_flight_executions_total", "Upstream fetches actually made", ("network",),
+                        single_flight("executions")),
+        CallbackCounter("upstream_connections_created_total", "New upstream connections", (),
+                        pool("connections_created")),
+        CallbackCounter("upstream_connections_reused_total", "Upstream requests on a pooled connection", (),
+                        pool("connections_reused")),
+        CallbackGauge("upstream_endpoint_latency_ewma_seconds", "Latency estimate used to route upstream requests",
+                      ("network", "url"), endpoints(lambda e: (e["ewma_ms"] or 0) / 1000)),
+        CallbackGauge("upstream_endpoint_circuit_state", "Upstream circuit breaker: 0 closed, 1 half-open, 2 open",
+                      ("network", "url"), endpoints(lambda e: CIRCUIT_STATES[e["state"]])),
+        CallbackCounter("upstream_hedged_requests_total", "Upstream requests hedged to a second endpoint",
+                        ("network",), routing("hedges")),
+        CallbackCounter("upstream_failovers_total", "Upstream requests retried on another endpoint after a failure",
+                        ("network",), routing("failovers")),
+        CallbackGauge("stream_subscribers", "Connected live-update subscribers", ("network",),
+                      lambda: {(network,): n for network, n in broadcast_hub.to_dict()["subscribers"].items()}),
+    ):
+        registry.register(metric)
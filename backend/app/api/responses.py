@@ -0,0 +1,142 @@
+import gzip
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+
+from app.api.instrumentation import route_template
+from app.services.metrics import SERIALIZATION
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def json_response(content: Any, response: Optional[Response] = None, status_code: int = 200) -> ORJSONResponse:
+    """Encode ``content`` with orjson and return it as the response.
+
+    Returning a Response skips FastAPI's jsonable_encoder walk, which is most
+    of the cost of a large node list; orjson serializes PNode records and
+    NumPy values natively. Headers already set on the injected ``response``
+    (ETag etc.) are carried over.
+    """
+    headers = dict(response.headers) if response is not None else None
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> str:
+    """Best content coding the client accepts: br, then gzip, else identity"""
+    accepted: Dict[str, float] = {}
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return "identity"
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return body
+
+
+def encoded_response(body: bytes, encoding: str, headers: Dict[str, str], status_code: int = 200) -> Response:
+    headers = {**headers, "Vary": "Accept-Encoding"}
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+def encode(request: Request, content: Any) -> Tuple[bytes, str]:
+    """Serialize ``content`` and compress it for ``request``; the time taken
+    is recorded per route as response_serialization_seconds"""
+    started = time.perf_counter()
+    body = orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if len(body) < MIN_COMPRESS_SIZE:
+        encoding = "identity"
+    body = compress(body, encoding)
+    SERIALIZATION.observe(route_template(request.scope), value=time.perf_counter() - started)
+    return body, encoding
+
+
+def compressed_json_response(request: Request, content: Any, response: Optional[Response] = None) -> Response:
+    """json_response, compressed on the fly for clients that accept it"""
+    body, encoding = encode(request, content)
+    headers = dict(response.headers) if response is not None else {}
+    return encoded_response(body, encoding, headers)
+
+
+class ResponseCache:
+    """Encoded (and compressed) bodies of snapshot responses, keyed by ETag.
+
+    The ETag pins snapshot version, path, query and content coding, so a
+    cached body stays valid as long as it is retained: hot responses are
+    serialized and compressed once per snapshot instead of once per request.
+    Least recently used bodies are dropped beyond ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._bodies: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+
+    def respond(self, request: Request, response: Response, build: Callable[[], Any]) -> Response:
+        """Cached body for the ETag already set on ``response``, building it on a miss"""
+        etag = response.headers["etag"]
+        headers = dict(response.headers)
+        cached = self._bodies.get(etag)
+        if cached is not None:
+            self.hits += 1
+            self._bodies.move_to_end(etag)
+            body, encoding = cached
+            return encoded_response(body, encoding, headers)
+
+        self.misses += 1
+        body, encoding = encode(request, build())
+        self._store(etag, body, encoding)
+        return encoded_response(body, encoding, headers)
+
+    def _store(self, etag: str, body: bytes, encoding: str):
+        if len(body) > self.max_bytes:
+            return
+        self._bodies[etag] = (body, encoding)
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, (evicted, _) = self._bodies.popitem(last=False)
+            self.size -= len(evicted)
+
+    def to_dict(self) -> Dict:
+        return {
+            "entries": len(self._bodies),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
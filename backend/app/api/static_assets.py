@@ -0,0 +1,116 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+from app.api.responses import negotiate_encoding
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Hashed URLs never change content, so browsers may keep them for a year
+IMMUTABLE = "public, max-age=31536000, immutable"
+# index.html and unhashed names are revalidated (cheap 304s)
+REVALIDATE = "no-cache"
+
+ASSET_EXTENSIONS = (".js", ".css")
+
+
+@dataclass
+class Asset:
+    media_type: str
+    etag: str
+    # content coding -> body, compressed once at startup at maximum level
+    bodies: Dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, body: bytes, media_type: str) -> "Asset":
+        asset = cls(media_type=media_type, etag=f'"{hashlib.sha256(body).hexdigest()[:16]}"')
+        asset.bodies["identity"] = body
+        asset.bodies["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+        if brotli is not None:
+            asset.bodies["br"] = brotli.compress(body, quality=11)
+        return asset
+
+
+class StaticAssets:
+    """The dashboard frontend, served by the API.
+
+    Each .js/.css file gets a content-hashed URL (``script.3f2a9c1d.js``)
+    cached for a year, and index.html is rewritten to reference those URLs,
+    so a returning browser only revalidates the page itself. Every file is
+    gzip- and brotli-compressed once at startup. The page is told to call
+    the API on its own origin instead of the standalone default.
+    """
+
+    def __init__(self, directory: str, prefix: str = "/dashboard"):
+        self.directory = directory
+        self.prefix = prefix
+        self.index: Optional[Asset] = None
+        self.assets: Dict[str, Asset] = {}  # URL name -> asset
+        self.hashed: Dict[str, str] = {}  # file name -> hashed URL name
+
+    def load(self):
+        if not os.path.isdir(self.directory):
+            logger.warning(f"Frontend directory {self.directory} not found; /dashboard is disabled")
+            return
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(ASSET_EXTENSIONS):
+                continue
+            with open(os.path.join(self.directory, name), "rb") as f:
+                body = f.read()
+            media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            asset = Asset.build(body, media_type)
+            stem, ext = os.path.splitext(name)
+            hashed = f"{stem}.{asset.etag.strip(chr(34))[:8]}{ext}"
+            self.hashed[name] = hashed
+            self.assets[hashed] = asset
+            self.assets[name] = asset
+        index_path = os.path.join(self.directory, "index.html")
+        if os.path.exists(index_path):
+            with open(index_path, encoding="utf-8") as f:
+                self.index = Asset.build(self.render_index(f.read()).encode(), "text/html; charset=utf-8")
+        logger.info(f"Serving dashboard frontend from {self.directory} ({len(self.hashed)} assets)")
+
+    def url(self, name: str) -> str:
+        return f"{self.prefix}/static/{self.hashed.get(name, name)}"
+
+    def render_index(self, html: str) -> str:
+        """Point local script/stylesheet references at their hashed URLs"""
+        def replace(match: re.Match) -> str:
+            attribute, name = match.group(1), match.group(2)
+            return f'{attribute}="{self.url(name)}"' if name in self.hashed else match.group(0)
+
+        html = re.sub(r'(src|href)="(?:\./)?([\w.-]+)"', replace, html)
+        # Same-origin API calls (script.js defaults to localhost when opened standalone)
+        return html.replace("</head>", '  <meta name="api-base" content="" />\n  </head>', 1)
+
+    def respond(self, request: Request, asset: Optional[Asset], cache_control: str) -> Response:
+        if asset is None:
+            return Response(status_code=404)
+        headers = {"ETag": asset.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if request.headers.get("if-none-match") == asset.etag:
+            return Response(status_code=304, headers=headers)
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        if encoding not in asset.bodies:
+            encoding = "identity" if encoding != "br" else "gzip"
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(asset.bodies[encoding], media_type=asset.media_type, headers=headers)
+
+    def page(self, request: Request) -> Response:
+        return self.respond(request, self.index, REVALIDATE)
+
+    def static(self, request: Request, name: str) -> Response:
+        cache_control = IMMUTABLE if name in self.hashed.values() else REVALIDATE
+        return self.respond(request, self.assets.get(name), cache_control)
@@ -0,0 +1,103 @@
+import os
+from typing import List
+
+
+def _get_list(name: str, default: str) -> List[str]:
+    return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
+
+
+# Networks served by the API. Each one gets its own snapshot in the cache.
+NETWORKS = _get_list("XANDEUM_NETWORKS", "testnet,mainnet,demo")
+
+# JSON-RPC endpoint per network, e.g. XANDEUM_RPC_URL_TESTNET=http://host:8899,
+# or a comma-separated pool of them. Networks without one run on demo data.
+RPC_URLS = {
+    network: os.environ[f"XANDEUM_RPC_URL_{network.upper()}"]
+    for network in NETWORKS
+    if os.getenv(f"XANDEUM_RPC_URL_{network.upper()}")
+}
+
+# JSON report written by find_endpoints.py. The working endpoints it found for
+# a network become its pool when no XANDEUM_RPC_URL_<NETWORK> is set.
+RPC_DISCOVERY_REPORT = os.getenv("RPC_DISCOVERY_REPORT", "")
+
+# Upstream pool routing. A request still unanswered after its endpoint's p95
+# (RPC_HEDGE_DELAY_MS until enough samples) is hedged to the next fastest
+# endpoint. An endpoint's circuit opens after RPC_BREAKER_FAILURES consecutive
+# failures; one probe is let through every RPC_BREAKER_RESET seconds.
+RPC_HEDGE = os.getenv("RPC_HEDGE", "true").lower() in ("1", "true", "yes")
+RPC_HEDGE_DELAY_MS = float(os.getenv("RPC_HEDGE_DELAY_MS", "500"))
+RPC_EWMA_ALPHA = float(os.getenv("RPC_EWMA_ALPHA", "0.2"))
+RPC_BREAKER_FAILURES = int(os.getenv("RPC_BREAKER_FAILURES", "5"))
+RPC_BREAKER_RESET = float(os.getenv("RPC_BREAKER_RESET", "30"))
+
+# How often (seconds) the background refresher pulls a new snapshot per network
+SNAPSHOT_REFRESH_INTERVAL = float(os.getenv("SNAPSHOT_REFRESH_INTERVAL", "30"))
+
+# Seconds each network gets in network=all and /pnodes/stats/compare requests;
+# slower networks are reported as errors and the rest returned
+FANOUT_TIMEOUT = float(os.getenv("FANOUT_TIMEOUT", "5"))
+
+# POST /pnodes/details: most pubkeys per request, and lookups run at once
+DETAILS_BATCH_MAX = int(os.getenv("DETAILS_BATCH_MAX", "1000"))
+DETAILS_CONCURRENCY = int(os.getenv("DETAILS_CONCURRENCY", "32"))
+
+# Recent snapshots kept per network so paging cursors stay on their version
+SNAPSHOT_RETAIN = int(os.getenv("SNAPSHOT_RETAIN", "5"))
+
+# Warm start: when set, the latest snapshot of each network is written to this
+# directory on every refresh, and after a restart requests are served from it
+# (marked restored, with its real age) until the first upstream fetch lands.
+# Point it at a persistent volume. Files older than SNAPSHOT_RESTORE_MAX_AGE
+# seconds are not served.
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "")
+SNAPSHOT_RESTORE_MAX_AGE = float(os.getenv("SNAPSHOT_RESTORE_MAX_AGE", "86400"))
+
+# Several workers on one host (uvicorn --workers N, or WEB_CONCURRENCY): point
+# SHARED_SNAPSHOT_DIR at a host-local directory. One elected worker polls
+# upstream and writes each snapshot there; every worker serves it from that
+# file, so they all serve the same version and upstream load stays that of a
+# single process. It also gives the warm start of SNAPSHOT_DIR.
+SHARED_SNAPSHOT_DIR = os.getenv("SHARED_SNAPSHOT_DIR", "")
+# How often the other workers look for a new version of that file (seconds)
+SHARED_SNAPSHOT_SYNC_INTERVAL = float(os.getenv("SHARED_SNAPSHOT_SYNC_INTERVAL", "1"))
+
+# Shared upstream connection pool (one aiohttp connector for every network client)
+RPC_POOL_LIMIT = int(os.getenv("RPC_POOL_LIMIT", "100"))
+RPC_POOL_LIMIT_PER_HOST = int(os.getenv("RPC_POOL_LIMIT_PER_HOST", "20"))
+RPC_DNS_CACHE_TTL = int(os.getenv("RPC_DNS_CACHE_TTL", "300"))
+RPC_KEEPALIVE_TIMEOUT = float(os.getenv("RPC_KEEPALIVE_TIMEOUT", "30"))
+
+# Live updates (SSE / WebSocket)
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+STREAM_MAX_SUBSCRIBERS = int(os.getenv("STREAM_MAX_SUBSCRIBERS", "10000"))
+
+# Per-node metric history: rollups are persisted to this SQLite file; the last
+# HISTORY_RAW_SAMPLES snapshots are also kept raw in memory (float32, so about
+# 20 bytes per node per sample). Nodes unseen for HISTORY_EVICT_AFTER seconds
+# free their in-memory slot.
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", "pnode_history.sqlite3")
+HISTORY_RAW_SAMPLES = int(os.getenv("HISTORY_RAW_SAMPLES", "120"))
+HISTORY_EVICT_AFTER = float(os.getenv("HISTORY_EVICT_AFTER", "86400"))
+
+# Dashboard frontend served at /dashboard/ (index.html, script.js, style.css).
+# Assets get content-hashed URLs and are precompressed once at startup.
+FRONTEND_DIR = os.getenv(
+    "FRONTEND_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "frontend")
+)
+
+# Rows per chunk of /pnodes/export and /pnodes/export/history (and per Parquet
+# row group). Export memory is bounded by one chunk, not by the row count.
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "5000"))
+
+# Serialized/compressed snapshot responses kept for reuse (bytes, LRU)
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Synthetic fleet served by networks without an RPC URL. The same seed replays
+# the same fleet; churn is the share of nodes replaced per refresh, drift the
+# per-refresh step of the metric random walk. DEMO_FLEET_SIZE=100000 gives a
+# realistic load-test fleet.
+DEMO_FLEET_SIZE = int(os.getenv("DEMO_FLEET_SIZE", "30"))
+DEMO_SEED = int(os.getenv("DEMO_SEED", "0"))
+DEMO_CHURN_RATE = float(os.getenv("DEMO_CHURN_RATE", "0.01"))
+DEMO_DRIFT = float(os.getenv("DEMO_DRIFT", "0.01"))
@@ -0,0 +1,174 @@
+from fastapi import FastAPI, Request, Response
+from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+from datetime import datetime
+import logging
+
+from app import config
+from app.api.endpoints import dashboard, export, pnodes, stream
+from app.api.instrumentation import MetricsMiddleware, register_app_metrics
+from app.api.responses import ResponseCache
+from app.api.static_assets import StaticAssets
+from app.services.broadcast import BroadcastHub
+from app.services.client_registry import ClientRegistry
+from app.services.endpoint_discovery import load_endpoints
+from app.services.group_aggregates import GroupAggregates
+from app.services.leaderboards import Leaderboards
+from app.services.shared_snapshot import SharedSnapshotCache
+from app.services.snapshot_persistence import SnapshotPersistence
+from app.services.history_store import HistoryStore
+from app.services import metrics
+from app.services.snapshot_cache import SnapshotCache
+from app.services.synthetic_fleet import SyntheticFleet
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup
+    logger.info("Starting Xandeum pNode Dashboard API...")
+    discovered = load_endpoints(config.RPC_DISCOVERY_REPORT)
+    client_registry = ClientRegistry(
+        networks=config.NETWORKS,
+        rpc_urls={**discovered, **config.RPC_URLS},
+        limit=config.RPC_POOL_LIMIT,
+        limit_per_host=config.RPC_POOL_LIMIT_PER_HOST,
+        ttl_dns_cache=config.RPC_DNS_CACHE_TTL,
+        keepalive_timeout=config.RPC_KEEPALIVE_TIMEOUT,
+        fleet_factory=lambda network: SyntheticFleet(
+            network,
+            size=config.DEMO_FLEET_SIZE,
+            seed=config.DEMO_SEED,
+            churn_rate=config.DEMO_CHURN_RATE,
+            drift=config.DEMO_DRIFT,
+        ),
+        pool_options=dict(
+            hedge=config.RPC_HEDGE,
+            hedge_delay_ms=config.RPC_HEDGE_DELAY_MS,
+            ewma_alpha=config.RPC_EWMA_ALPHA,
+            failure_threshold=config.RPC_BREAKER_FAILURES,
+            reset_timeout=config.RPC_BREAKER_RESET,
+        ),
+    )
+    await client_registry.start()
+    app.state.client_registry = client_registry
+    persistence = None
+    if config.SHARED_SNAPSHOT_DIR:
+        snapshot_cache = SharedSnapshotCache(
+            client_factory=client_registry.get,
+            networks=config.NETWORKS,
+            directory=config.SHARED_SNAPSHOT_DIR,
+            refresh_interval=config.SNAPSHOT_REFRESH_INTERVAL,
+            retain=config.SNAPSHOT_RETAIN,
+            sync_interval=config.SHARED_SNAPSHOT_SYNC_INTERVAL,
+        )
+    else:
+        if config.SNAPSHOT_DIR:
+            persistence = SnapshotPersistence(config.SNAPSHOT_DIR, max_age=config.SNAPSHOT_RESTORE_MAX_AGE)
+        snapshot_cache = SnapshotCache(
+            client_factory=client_registry.get,
+            networks=config.NETWORKS,
+            refresh_interval=config.SNAPSHOT_REFRESH_INTERVAL,
+            retain=config.SNAPSHOT_RETAIN,
+            restore=persistence.load if persistence else None,
+        )
+    if persistence:
+        snapshot_cache.add_listener(persistence.record)
+    broadcast_hub = BroadcastHub(max_subscribers=config.STREAM_MAX_SUBSCRIBERS)
+    snapshot_cache.add_listener(broadcast_hub.publish)
+    app.state.broadcast_hub = broadcast_hub
+    history_store = HistoryStore(
+        path=config.HISTORY_DB_PATH,
+        capacity=config.HISTORY_RAW_SAMPLES,
+        evict_after=config.HISTORY_EVICT_AFTER,
+        # Workers sharing a snapshot share the database too; only the refresher writes
+        persist=(lambda: snapshot_cache.is_leader) if isinstance(snapshot_cache, SharedSnapshotCache) else None,
+    )
+    history_store.open()
+    snapshot_cache.add_listener(history_store.record)
+    app.state.history_store = history_store
+    group_aggregates = GroupAggregates()
+    snapshot_cache.add_listener(group_aggregates.record, prepare=group_aggregates.prepare)
+    app.state.group_aggregates = group_aggregates
+    leaderboards = Leaderboards()
+    snapshot_cache.add_listener(leaderboards.record, prepare=leaderboards.prepare)
+    app.state.leaderboards = leaderboards
+    app.state.response_cache = ResponseCache(max_bytes=config.RESPONSE_CACHE_MAX_BYTES)
+    static_assets = StaticAssets(config.FRONTEND_DIR)
+    static_assets.load()
+    app.state.static_assets = static_assets
+    await snapshot_cache.start()
+    app.state.snapshot_cache = snapshot_cache
+    register_app_metrics(metrics.REGISTRY, snapshot_cache, client_registry, app.state.response_cache, broadcast_hub)
+    yield
+    # Shutdown
+    logger.info("Shutting down...")
+    await snapshot_cache.stop()
+    if persistence:
+        await persistence.close()
+    await history_store.close()
+    await client_registry.close()
+
+app = FastAPI(
+    title="Xandeum pNode Dashboard API",
+    description="Analytics platform for Xandeum proof nodes",
+    version="2.0.0",
+    lifespan=lifespan
+)
+app.include_router(stream.router)  # before pnodes: /pnodes/{pubkey} would shadow /pnodes/stream
+app.include_router(export.router)  # likewise for /pnodes/export
+app.include_router(pnodes.router)
+app.include_router(dashboard.router)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # In production, restrict this!
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["ETag", "X-Snapshot-Version", "X-Snapshot-Age", "X-Snapshot-Restored"],
+)
+app.add_middleware(MetricsMiddleware)
+
+@app.get("/")
+async def root():
+    return {
+        "service": "Xandeum pNode Dashboard API",
+        "status": "running",
+        "endpoints": {
+            "docs": "/docs",
+            "dashboard": "/dashboard/",
+            "dashboard_bootstrap": "/dashboard/bootstrap",
+            "health": "/health",
+            "metrics": "/metrics",
+            "pnodes": "/pnodes",
+            "pnodes_summary": "/pnodes/stats/summary",
+            "network_compare": "/pnodes/stats/compare",
+            "distribution": "/pnodes/stats/distribution",
+            "leaderboard": "/pnodes/leaderboards/{metric}",
+            "pnode_ranks": "/pnodes/{pubkey}/ranks",
+            "network_info": "/pnodes/network/info",
+            "pnode_history": "/pnodes/{pubkey}/history",
+            "export": "/pnodes/export",
+            "history_export": "/pnodes/export/history",
+            "live_updates": "/pnodes/stream"
+        }
+    }
+
+@app.get("/health")
+async def health_check(request: Request):
+    return {
+        "status": "healthy",
+        "timestamp": datetime.utcnow().isoformat(),
+        "snapshots": request.app.state.snapshot_cache.status(),
+        "upstream_pool": request.app.state.client_registry.pool_stats(),
+        "single_flight": request.app.state.client_registry.single_flight_stats(),
+        "upstream_endpoints": request.app.state.client_registry.endpoint_stats(),
+        "live_updates": request.app.state.broadcast_hub.to_dict(),
+        "response_cache": request.app.state.response_cache.to_dict()
+    }
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus text exposition of request, upstream, snapshot and cache metrics"""
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, Optional, Set
+
+import orjson
+
+from app.services.snapshot_cache import Snapshot
+from app.services.snapshot_diff import SnapshotDiff
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HubMessage:
+    """One update, encoded once and shared by every subscriber"""
+    network: str
+    version: int
+    payload: Dict
+
+    @cached_property
+    def body(self) -> bytes:
+        return orjson.dumps(self.payload)
+
+    @cached_property
+    def text(self) -> str:
+        return self.body.decode()
+
+    @cached_property
+    def sse(self) -> bytes:
+        return b"id: %d\nevent: snapshot\ndata: %s\n\n" % (self.version, self.body)
+
+
+def build_message(snapshot: Snapshot, diff: Optional[SnapshotDiff]) -> HubMessage:
+    """Update for clients at ``diff.from_version``; no diff means reload everything"""
+    info = snapshot.network_info
+    payload = {
+        "type": "snapshot",
+        "network": snapshot.network,
+        "version": snapshot.version,
+        "since": diff.from_version if diff else None,
+        "full_resync": diff is None,
+        "summary": snapshot.store.summary,
+        "network_info": {"epoch": info.get("epoch", 0), "slot": info.get("slot", 0)},
+        "changes": diff.to_dict() if diff else None,
+    }
+    return HubMessage(snapshot.network, snapshot.version, payload)
+
+
+class Subscriber:
+    """One connected dashboard.
+
+    Holds at most one undelivered message. If a newer update arrives while
+    one is still pending (the client is slow to drain), the backlog collapses
+    into a single full-resync message for the latest version, so memory per
+    client stays O(1) however far behind it falls.
+    """
+
+    def __init__(self, network: str):
+        self.network = network
+        self.coalesced = 0
+        self.delivered = 0
+        self._pending: Optional[HubMessage] = None
+        self._wakeup = asyncio.Event()
+
+    def offer(self, message: HubMessage, resync: HubMessage):
+        if self._pending is not None:
+            self._pending = resync
+            self.coalesced += 1
+        else:
+            self._pending = message
+        self._wakeup.set()
+
+    async def next(self, timeout: float) -> Optional[HubMessage]:
+        """Next message, or None after ``timeout`` seconds (time for a heartbeat)"""
+        if self._pending is None:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        self._wakeup.clear()
+        message, self._pending = self._pending, None
+        if message is not None:
+            self.delivered += 1
+        return message
+
+
+@dataclass
+class HubStats:
+    published: int = 0
+    fanned_out: int = 0
+    coalesced: int = 0
+    rejected: int = 0
+    peak_subscribers: int = 0
+
+
+class BroadcastHub:
+    """Fans each new snapshot out to every subscriber of its network.
+
+    Registered as a SnapshotCache listener: one message per snapshot is built
+    and encoded once, then handed to subscribers by reference.
+    """
+
+    def __init__(self, max_subscribers: int = 10000):
+        self.max_subscribers = max_subscribers
+        self.stats = HubStats()
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def check_capacity(self):
+        """Raise OverflowError when no further subscriber would be accepted"""
+        if self.subscriber_count >= self.max_subscribers:
+            self.stats.rejected += 1
+            raise OverflowError("Too many live subscribers")
+
+    def subscribe(self, network: str) -> Subscriber:
+        self.check_capacity()
+        subscriber = Subscriber(network)
+        self._subscribers.setdefault(network, set()).add(subscriber)
+        self.stats.peak_subscribers = max(self.stats.peak_subscribers, self.subscriber_count)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.get(subscriber.network, set()).discard(subscriber)
+        self.stats.coalesced += subscriber.coalesced
+
+    def publish(self, snapshot: Snapshot):
+        subscribers = self._subscribers.get(snapshot.network)
+        self.stats.published += 1
+        if not subscribers:
+            return
+        message = build_message(snapshot, snapshot.diff)
+        resync = build_message(snapshot, None)
+        for subscriber in subscribers:
+            subscriber.offer(message, resync)
+        self.stats.fanned_out += len(subscribers)
+
+    def to_dict(self) -> Dict:
+        return {
+            "subscribers": {network: len(subs) for network, subs in self._subscribers.items()},
+            "published": self.stats.published,
+            "fanned_out": self.stats.fanned_out,
+            "coalesced": self.stats.coalesced + sum(
+                s.coalesced for subs in self._subscribers.values() for s in subs
+            ),
+            "rejected": self.stats.rejected,
+            "peak_subscribers": self.stats.peak_subscribers,
+        }
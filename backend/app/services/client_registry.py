@@ -0,0 +1,144 @@
+import aiohttp
+import logging
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+from app.services.endpoint_pool import split_urls
+from app.services.synthetic_fleet import SyntheticFleet
+from app.services.xandeum_client import XandeumPRPCClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolStats:
+    """Counters for the shared upstream connection pool"""
+    requests: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    connections_queued: int = 0
+    dns_cache_hits: int = 0
+    dns_cache_misses: int = 0
+
+    @property
+    def reuse_ratio(self) -> float:
+        total = self.connections_created + self.connections_reused
+        return self.connections_reused / total if total else 0.0
+
+    def to_dict(self) -> Dict:
+        return {**asdict(self), "reuse_ratio": round(self.reuse_ratio, 4)}
+
+
+class ClientRegistry:
+    """One XandeumPRPCClient per network, all sharing one pooled connector.
+
+    Created and closed from the app lifespan so sessions and keep-alive
+    connections outlive individual requests.
+    """
+
+    def __init__(
+        self,
+        networks: List[str],
+        rpc_urls: Optional[Dict[str, Union[str, Sequence[str]]]] = None,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        ttl_dns_cache: int = 300,
+        keepalive_timeout: float = 30.0,
+        fleet_factory: Optional[Callable[[str], SyntheticFleet]] = None,
+        pool_options: Optional[Dict] = None,
+    ):
+        self.networks = list(networks)
+        self.rpc_urls = rpc_urls or {}
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self.fleet_factory = fleet_factory  # Demo-mode data per network
+        self.pool_options = pool_options  # EndpointPool tuning for every network
+        self.stats = PoolStats()
+        self.connector: Optional[aiohttp.TCPConnector] = None
+        self._clients: Dict[str, XandeumPRPCClient] = {}
+
+    async def start(self):
+        self.connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.ttl_dns_cache,
+            use_dns_cache=True,
+            keepalive_timeout=self.keepalive_timeout,
+            enable_cleanup_closed=True,
+        )
+        trace_config = self._build_trace_config()
+        for network in self.networks:
+            client = XandeumPRPCClient(
+                network=network,
+                rpc_urls=split_urls(self.rpc_urls.get(network)),
+                pool_options=self.pool_options,
+                connector=self.connector,
+                trace_configs=[trace_config],
+                fleet=self.fleet_factory(network) if self.fleet_factory else None,
+            )
+            await client.connect()
+            self._clients[network] = client
+        logger.info(
+            f"Client registry ready for {self.networks} "
+            f"(limit={self.limit}, per_host={self.limit_per_host})"
+        )
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.close()
+        self._clients = {}
+        if self.connector is not None:
+            await self.connector.close()
+            self.connector = None
+
+    def get(self, network: str) -> XandeumPRPCClient:
+        client = self._clients.get(network)
+        if client is None:
+            raise KeyError(network)
+        return client
+
+    def pool_stats(self) -> Dict:
+        return self.stats.to_dict()
+
+    def endpoint_stats(self) -> Dict:
+        """Routing, hedging and breaker state of each network's upstream pool"""
+        return {
+            network: client.transport.to_dict()
+            for network, client in self._clients.items()
+            if client.transport is not None
+        }
+
+    def single_flight_stats(self) -> Dict:
+        return {network: client.single_flight.stats.to_dict() for network, client in self._clients.items()}
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        stats = self.stats
+
+        async def on_request_start(session, ctx, params):
+            stats.requests += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            stats.connections_created += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            stats.connections_reused += 1
+
+        async def on_connection_queued_start(session, ctx, params):
+            stats.connections_queued += 1
+
+        async def on_dns_cache_hit(session, ctx, params):
+            stats.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            stats.dns_cache_misses += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_connection_queued_start.append(on_connection_queued_start)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace_config
@@ -0,0 +1,227 @@
+import asyncio
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from app.services.jsonrpc import JsonRpcError, JsonRpcTransport
+
+logger = logging.getLogger(__name__)
+
+# The address space the old serial sweep covered
+DEFAULT_TARGETS = {
+    "mainnet": ["https://mainnet.xandeum.network", "http://mainnet.xandeum.network"],
+    "testnet": ["https://testnet.xandeum.network", "http://testnet.xandeum.network"],
+}
+DEFAULT_PORTS = ["", ":8899", ":80", ":443", ":8080"]
+DEFAULT_PATHS = ["", "/", "/rpc", "/api", "/api/v1", "/v1/rpc"]
+DEFAULT_METHODS = ["getClusterNodes", "getVoteAccounts", "getEpochInfo"]
+
+# Probe outcomes
+OK = "ok"  # answered JSON-RPC for at least one method
+HTTP_ERROR = "http_error"
+INVALID = "invalid"  # answered, but not JSON-RPC
+TIMEOUT = "timeout"
+UNREACHABLE = "unreachable"  # refused, DNS failure, TLS failure
+SKIPPED = "skipped"  # host already found unreachable
+
+
+@dataclass
+class ProbeResult:
+    network: str
+    url: str
+    status: str = SKIPPED
+    latency_ms: Optional[float] = None
+    # method -> "ok" or the JSON-RPC error message
+    methods: Dict[str, str] = field(default_factory=dict)
+    batch: bool = False  # the endpoint accepted a JSON-RPC batch
+    error: Optional[str] = None
+
+    @property
+    def methods_ok(self) -> int:
+        return sum(1 for outcome in self.methods.values() if outcome == OK)
+
+
+def origin(url: str) -> str:
+    """scheme://host:port, the unit a refused connection rules out"""
+    parts = urlsplit(url)
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+    except ValueError:  # malformed port; the probe itself reports it
+        return url
+    return f"{parts.scheme}://{parts.hostname}:{port}"
+
+
+def candidate_urls(base_urls: Sequence[str], ports: Sequence[str], paths: Sequence[str]) -> List[str]:
+    urls = []
+    for base in base_urls:
+        for port in ports:
+            for path in paths:
+                url = f"{base}{port}{path}"
+                if url not in urls:
+                    urls.append(url)
+    return urls
+
+
+class EndpointDiscovery:
+    """Concurrent JSON-RPC endpoint scanner.
+
+    All probes share one connector and run at most ``concurrency`` at a
+    time. Each candidate URL gets a single JSON-RPC batch of every method
+    (falling back to one call per method if the server rejects batches).
+    Candidates are grouped by origin: the first probe to an origin runs
+    alone, and if the host refuses the connection the rest of its
+    candidates are skipped instead of each waiting out their own failure.
+    """
+
+    def __init__(
+        self,
+        methods: Sequence[str] = DEFAULT_METHODS,
+        concurrency: int = 32,
+        timeout: float = 3.0,
+        connect_timeout: float = 1.5,
+    ):
+        self.methods = list(methods)
+        self.concurrency = concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=connect_timeout)
+
+    async def discover(
+        self,
+        targets: Dict[str, Sequence[str]] = DEFAULT_TARGETS,
+        ports: Sequence[str] = DEFAULT_PORTS,
+        paths: Sequence[str] = DEFAULT_PATHS,
+    ) -> "DiscoveryReport":
+        """Probe every base URL x port x path per network"""
+        started = time.perf_counter()
+        by_origin: Dict[str, List[ProbeResult]] = {}
+        results: List[ProbeResult] = []
+        for network, base_urls in targets.items():
+            for url in candidate_urls(base_urls, ports, paths):
+                result = ProbeResult(network=network, url=url)
+                results.append(result)
+                by_origin.setdefault(origin(url), []).append(result)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout) as session:
+
+            async def probe(result: ProbeResult):
+                async with semaphore:
+                    await self.probe(JsonRpcTransport(session, result.url), result)
+
+            async def scan_origin(candidates: List[ProbeResult]):
+                await probe(candidates[0])
+                if candidates[0].status == UNREACHABLE:
+                    for result in candidates[1:]:
+                        result.error = f"host unreachable: {candidates[0].error}"
+                    return
+                await asyncio.gather(*(probe(result) for result in candidates[1:]))
+
+            await asyncio.gather(*(scan_origin(candidates) for candidates in by_origin.values()))
+
+        report = DiscoveryReport(results=results, duration_ms=(time.perf_counter() - started) * 1000)
+        logger.info(
+            f"Endpoint discovery: {report.probed} probes, {report.skipped} skipped, "
+            f"{len(report.working())} working in {report.duration_ms:.0f}ms"
+        )
+        return report
+
+    async def probe(self, transport: JsonRpcTransport, result: ProbeResult):
+        """Send every method as one batch and record what came back"""
+        started = time.perf_counter()
+        try:
+            try:
+                outcomes = await transport.batch([(method, None) for method in self.methods], return_exceptions=True)
+                result.batch = True
+            except JsonRpcError:
+                # Batch rejected as a whole: one call per method
+                outcomes = await asyncio.gather(
+                    *(transport.call(method) for method in self.methods), return_exceptions=True
+                )
+            for method, outcome in zip(self.methods, outcomes):
+                if isinstance(outcome, JsonRpcError):
+                    result.methods[method] = outcome.args[0]
+                elif isinstance(outcome, Exception):
+                    raise outcome
+                else:
+                    result.methods[method] = OK
+            answered = any(not isinstance(o, JsonRpcError) or o.code is not None for o in outcomes)
+            result.status = OK if answered else INVALID
+        except aiohttp.ClientResponseError as e:
+            result.status, result.error = HTTP_ERROR, f"HTTP {e.status}"
+        except aiohttp.ClientConnectorError as e:
+            result.status, result.error = UNREACHABLE, str(e)
+        except asyncio.TimeoutError:
+            result.status, result.error = TIMEOUT, "timed out"
+        except (aiohttp.ContentTypeError, ValueError, TypeError, AttributeError) as e:
+            result.status, result.error = INVALID, f"not a JSON-RPC response: {e}"
+        except aiohttp.ClientError as e:
+            result.status, result.error = UNREACHABLE, str(e)
+        result.latency_ms = round((time.perf_counter() - started) * 1000, 2)
+
+
+@dataclass
+class DiscoveryReport:
+    results: List[ProbeResult]
+    duration_ms: float
+    generated_at: datetime = field(default_factory=datetime.utcnow)
+
+    @property
+    def probed(self) -> int:
+        return sum(1 for r in self.results if r.status != SKIPPED)
+
+    @property
+    def skipped(self) -> int:
+        return len(self.results) - self.probed
+
+    def working(self, network: Optional[str] = None) -> List[ProbeResult]:
+        """Endpoints that answered JSON-RPC, most methods then lowest latency first"""
+        found = [r for r in self.results if r.status == OK and (network is None or r.network == network)]
+        return sorted(found, key=lambda r: (-r.methods_ok, r.latency_ms))
+
+    def to_dict(self) -> Dict:
+        networks = sorted({r.network for r in self.results})
+        return {
+            "generated_at": self.generated_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 1),
+            "probed": self.probed,
+            "skipped": self.skipped,
+            "endpoints": {
+                network: [
+                    {"url": r.url, "latency_ms": r.latency_ms, "methods": r.methods, "batch": r.batch}
+                    for r in self.working(network)
+                ]
+                for network in networks
+            },
+            "results": [asdict(r) for r in self.results],
+        }
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def load_endpoints(path: Optional[str]) -> Dict[str, List[str]]:
+    """Ranked endpoint URLs per network from a saved discovery report.
+
+    A missing or unreadable report yields no endpoints, so startup falls back
+    to the configured URLs (or demo data).
+    """
+    if not path:
+        return {}
+    try:
+        with open(path) as f:
+            report = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring endpoint discovery report {path}: {e}")
+        return {}
+    return {
+        network: [endpoint["url"] for endpoint in endpoints]
+        for network, endpoints in report.get("endpoints", {}).items()
+        if endpoints
+    }
@@ -0,0 +1,265 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Union
+
+import aiohttp
+
+from app.services.jsonrpc import JsonRpcError, JsonRpcTransport, RpcCall
+
+logger = logging.getLogger(__name__)
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def split_urls(value: Union[str, Sequence[str], None]) -> List[str]:
+    """"http://a,http://b" or a list of URLs -> list of URLs"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [url.strip() for url in value if url.strip()]
+
+
+class NoEndpointAvailableError(Exception):
+    """Every endpoint in the pool has its circuit open"""
+
+
+class CircuitBreaker:
+    """Per-endpoint breaker: opens after ``failure_threshold`` consecutive
+    failures, and after ``reset_timeout`` lets a single probe through
+    (half-open). The probe's outcome closes or re-opens it."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.trips = 0
+
+    def available(self) -> bool:
+        """Whether a request could be sent now (does not claim the probe)"""
+        if self.state == CLOSED:
+            return True
+        return not self.probing and time.monotonic() - self.opened_at >= self.reset_timeout
+
+    def acquire(self) -> bool:
+        """Claim permission to send; in half-open state only one probe at a time"""
+        if not self.available():
+            return False
+        if self.state != CLOSED:
+            self.state = HALF_OPEN
+            self.probing = True
+        return True
+
+    def release(self):
+        """The request was abandoned (a cancelled hedge) and says nothing about health"""
+        self.probing = False
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.probing = False
+
+    def record_failure(self):
+        self.probing = False
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.trips += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+
+class Endpoint:
+    """One upstream URL with its latency estimate and breaker"""
+
+    def __init__(self, transport: JsonRpcTransport, breaker: CircuitBreaker, alpha: float, window: int):
+        self.transport = transport
+        self.breaker = breaker
+        self.alpha = alpha
+        self.ewma_ms: Optional[float] = None
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def url(self) -> str:
+        return self.transport.url
+
+    def observe(self, latency_ms: float):
+        self.ewma_ms = latency_ms if self.ewma_ms is None else self.alpha * latency_ms + (1 - self.alpha) * self.ewma_ms
+        self.latencies.append(latency_ms)
+
+    def p95_ms(self) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def to_dict(self) -> Dict:
+        p95 = self.p95_ms()
+        return {
+            "url": self.url,
+            "state": self.breaker.state,
+            "ewma_ms": round(self.ewma_ms, 2) if self.ewma_ms is not None else None,
+            "p95_ms": round(p95, 2) if p95 is not None else None,
+            "requests": self.requests,
+            "failures": self.failures,
+            "trips": self.breaker.trips,
+        }
+
+
+@dataclass
+class PoolCounters:
+    requests: int = 0
+    hedges: int = 0  # second request sent because the first exceeded its p95
+    hedge_wins: int = 0  # ... and answered first
+    failovers: int = 0  # retried on the next endpoint after a failure
+    unavailable: int = 0  # every breaker open
+
+
+class EndpointPool:
+    """JSON-RPC transport over several upstream URLs.
+
+    Drop-in for JsonRpcTransport (``call``/``batch``). Each request goes to
+    the available endpoint with the lowest latency EWMA (unmeasured ones
+    first, so every endpoint gets sampled). If it has not answered within
+    that endpoint's recent p95, the same request is hedged to the next
+    endpoint and the first answer wins; if it fails, the next endpoint is
+    tried straight away. Transport failures feed per-endpoint circuit
+    breakers; JSON-RPC error objects are answers, not endpoint failures.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        urls: Sequence[str],
+        hedge: bool = True,
+        hedge_delay_ms: float = 500.0,
+        min_hedge_delay_ms: float = 20.0,
+        min_samples: int = 10,
+        ewma_alpha: float = 0.2,
+        window: int = 100,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        if not urls:
+            raise ValueError("EndpointPool needs at least one URL")
+        self.endpoints = [
+            Endpoint(JsonRpcTransport(session, url), CircuitBreaker(failure_threshold, reset_timeout), ewma_alpha, window)
+            for url in urls
+        ]
+        self.hedge = hedge
+        self.hedge_delay_ms = hedge_delay_ms  # until an endpoint has min_samples latencies
+        self.min_hedge_delay_ms = min_hedge_delay_ms
+        self.min_samples = min_samples
+        self.counters = PoolCounters()
+
+    @property
+    def url(self) -> str:
+        return self.endpoints[0].url
+
+    def ranked(self) -> List[Endpoint]:
+        """Available endpoints, fastest first"""
+        available = [e for e in self.endpoints if e.breaker.available()]
+        return sorted(available, key=lambda e: e.ewma_ms if e.ewma_ms is not None else 0.0)
+
+    def hedge_delay(self, endpoint: Endpoint) -> float:
+        """Seconds to wait on ``endpoint`` before hedging"""
+        p95 = endpoint.p95_ms() if len(endpoint.latencies) >= self.min_samples else None
+        return max(p95 if p95 is not None else self.hedge_delay_ms, self.min_hedge_delay_ms) / 1000
+
+    async def call(self, method: str, params: Optional[list] = None) -> Any:
+        return await self._route(lambda transport: transport.call(method, params))
+
+    async def batch(self, calls: Sequence[RpcCall], return_exceptions: bool = False) -> List[Any]:
+        if not calls:
+            return []
+        return await self._route(lambda transport: transport.batch(calls, return_exceptions=return_exceptions))
+
+    async def _route(self, send: Callable[[JsonRpcTransport], Awaitable[Any]]) -> Any:
+        """``send(transport)`` on the best endpoint, hedged and failed over as described above"""
+        self.counters.requests += 1
+        candidates = iter(self.ranked())
+        pending: Dict[asyncio.Task, Endpoint] = {}
+        errors: List[BaseException] = []
+
+        def launch() -> Optional[Endpoint]:
+            for endpoint in candidates:
+                if endpoint.breaker.acquire():
+                    task = asyncio.create_task(self._attempt(endpoint, send))
+                    pending[task] = endpoint
+                    return endpoint
+            return None
+
+        primary = launch()
+        if primary is None:
+            self.counters.unavailable += 1
+            raise NoEndpointAvailableError(f"All {len(self.endpoints)} upstream endpoints have open circuits")
+
+        hedged = not self.hedge
+        try:
+            while pending:
+                timeout = self.hedge_delay(primary) if not hedged else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    if launch() is not None:
+                        self.counters.hedges += 1
+                    continue
+                for task in done:
+                    endpoint = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        if endpoint is not primary and hedged:
+                            self.counters.hedge_wins += 1
+                        return task.result()
+                    if isinstance(error, JsonRpcError):
+                        raise error  # the upstream answered; another endpoint would say the same
+                    errors.append(error)
+                if not pending:
+                    failover = launch()
+                    if failover is not None:
+                        self.counters.failovers += 1
+                        primary = failover
+            raise errors[-1]
+        finally:
+            for task in pending:
+                task.cancel()
+                # A loser that finished before the cancel still has its error retrieved
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def _attempt(self, endpoint: Endpoint, send: Callable[[JsonRpcTransport], Awaitable[Any]]) -> Any:
+        endpoint.requests += 1
+        started = time.perf_counter()
+        try:
+            results = await send(endpoint.transport)
+        except JsonRpcError:
+            endpoint.observe((time.perf_counter() - started) * 1000)
+            endpoint.breaker.record_success()
+            raise
+        except asyncio.CancelledError:
+            # Lost a hedge race: at least this slow, but not a failure
+            endpoint.observe((time.perf_counter() - started) * 1000)
+            endpoint.breaker.release()
+            raise
+        except Exception as e:
+            endpoint.failures += 1
+            endpoint.breaker.record_failure()
+            if endpoint.breaker.state == OPEN:
+                logger.warning(f"Circuit open for {endpoint.url}: {e}")
+            raise
+        endpoint.observe((time.perf_counter() - started) * 1000)
+        endpoint.breaker.record_success()
+        return results
+
+    def to_dict(self) -> Dict:
+        return {**asdict(self.counters), "endpoints": [e.to_dict() for e in self.endpoints]}
@@ -0,0 +1,127 @@
+import csv
+import dataclasses
+import io
+from operator import attrgetter
+from typing import AsyncIterator, Dict, List, Sequence, Tuple, get_args
+
+import numpy as np
+import orjson
+
+from app.services.history_store import EXPORT_AGGREGATES
+from app.services.pnode_record import PNode
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # csv / ndjson only
+    pa = None
+
+# format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# An exported column: (name, kind), kind one of str / int / float / bool
+Column = Tuple[str, str]
+
+
+def _kind(annotation) -> str:
+    types = [t for t in get_args(annotation) if t is not type(None)] or [annotation]
+    return {bool: "bool", int: "int", float: "float"}.get(types[0], "str")
+
+
+PNODE_KINDS: Dict[str, str] = {field.name: _kind(field.type) for field in dataclasses.fields(PNode)}
+
+
+def parquet_available() -> bool:
+    return pa is not None
+
+
+def fleet_columns(fields: Sequence[str]) -> List[Column]:
+    return [(name, PNODE_KINDS[name]) for name in fields]
+
+
+def history_columns(metrics: Sequence[str], raw: bool) -> List[Column]:
+    if raw:
+        return [("pubkey", "str"), ("timestamp", "float")] + [(metric, "float") for metric in metrics]
+    return [("pubkey", "str"), ("timestamp", "int")] + [
+        (f"{metric}_{aggregate}", "int" if aggregate == "count" else "float")
+        for metric in metrics for aggregate in EXPORT_AGGREGATES
+    ]
+
+
+async def fleet_rows(pnodes: Sequence[PNode], rows: np.ndarray, fields: Sequence[str], chunk_rows: int) -> AsyncIterator[List[Tuple]]:
+    """``fields`` of the selected nodes as tuples, ``chunk_rows`` at a time"""
+    getter = attrgetter(*fields)
+    single = len(fields) == 1
+    for start in range(0, len(rows), chunk_rows):
+        chunk = [pnodes[row] for row in rows[start:start + chunk_rows]]
+        yield [(getter(p),) for p in chunk] if single else [getter(p) for p in chunk]
+
+
+class _ChunkSink:
+    """Write-only file for ParquetWriter that hands back what was written since the last drain"""
+
+    closed = False
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _csv_chunk(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue().encode()
+
+
+async def encode_rows(chunks: AsyncIterator[List[Tuple]], columns: Sequence[Column], format: str) -> AsyncIterator[bytes]:
+    """Encode row chunks as they arrive: one body chunk (or Parquet row group) per row chunk.
+
+    Nothing but the current chunk is held, so the first bytes go out
+    immediately and memory stays flat however many rows are exported.
+    """
+    names = [name for name, _ in columns]
+    if format == "csv":
+        yield _csv_chunk([names])
+        async for rows in chunks:
+            yield _csv_chunk(rows)
+    elif format == "ndjson":
+        async for rows in chunks:
+            yield b"".join(
+                orjson.dumps(dict(zip(names, row)), option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+                for row in rows
+            )
+    elif format == "parquet":
+        types = {"str": pa.string(), "int": pa.int64(), "float": pa.float64(), "bool": pa.bool_()}
+        schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        sink = _ChunkSink()
+        with pq.ParquetWriter(sink, schema) as writer:
+            async for rows in chunks:
+                if rows:
+                    writer.write_table(pa.Table.from_arrays(
+                        [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)],
+                        schema=schema,
+                    ))
+                    yield sink.drain()
+        yield sink.drain()  # footer
+    else:
+        raise ValueError(f"Unknown export format {format!r}; choose from {', '.join(EXPORT_FORMATS)}")
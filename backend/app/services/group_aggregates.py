@@ -0,0 +1,172 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.pnode_store import PNodeStore
+from app.services.snapshot_cache import Snapshot
+from app.services.snapshot_diff import SnapshotDiff, diff_applies
+
+logger = logging.getLogger(__name__)
+
+# Fields the fleet can be grouped by
+GROUP_DIMENSIONS = ("version", "data_center", "location")
+
+# A node's contribution: its group per dimension, is_active, stake
+_Contribution = Tuple[Tuple, bool, int]
+_TRACKED_FIELDS = frozenset(GROUP_DIMENSIONS + ("is_active", "stake"))
+
+
+class GroupStats:
+    __slots__ = ("nodes", "active", "stake", "active_stake")
+
+    def __init__(self):
+        self.nodes = 0
+        self.active = 0
+        self.stake = 0
+        self.active_stake = 0
+
+    def add(self, is_active: bool, stake: int, sign: int = 1):
+        self.nodes += sign
+        self.stake += sign * stake
+        if is_active:
+            self.active += sign
+            self.active_stake += sign * stake
+
+
+class NetworkGroups:
+    """Group-by tables of one network, kept current from snapshot diffs.
+
+    Each table maps a group value to running totals. A snapshot that only
+    changes a few nodes touches only their groups, so a distribution costs
+    O(groups) to read and O(changed nodes) to maintain.
+    """
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self.tables: Dict[str, Dict[object, GroupStats]] = {dimension: {} for dimension in GROUP_DIMENSIONS}
+        self.totals = GroupStats()
+        self._contributions: Dict[str, _Contribution] = {}
+
+    def rebuild(self, store: PNodeStore, version: int):
+        self.tables = {dimension: {} for dimension in GROUP_DIMENSIONS}
+        self.totals = GroupStats()
+        self._contributions = {}
+        for pnode in store.pnodes:
+            self._add(pnode)
+        self.version = version
+
+    def apply(self, diff: SnapshotDiff):
+        """Move the tables from ``diff.from_version`` to ``diff.to_version``"""
+        for pubkey in diff.removed:
+            self._remove(pubkey)
+        for pnode in diff.added:
+            self._remove(pnode["pubkey"])
+            self._add(pnode)
+        for change in diff.changed:
+            if _TRACKED_FIELDS.intersection(change.changed_fields):
+                self._remove(change.pubkey)
+                self._add(change.pnode)
+        self.version = diff.to_version
+
+    def _add(self, pnode):
+        contribution = (
+            tuple(pnode.get(dimension) for dimension in GROUP_DIMENSIONS),
+            bool(pnode.get("is_active")),
+            int(pnode.get("stake") or 0),
+        )
+        self._contributions[pnode["pubkey"]] = contribution
+        self._count(contribution, 1)
+
+    def _remove(self, pubkey: str):
+        contribution = self._contributions.pop(pubkey, None)
+        if contribution is not None:
+            self._count(contribution, -1)
+
+    def _count(self, contribution: _Contribution, sign: int):
+        values, is_active, stake = contribution
+        self.totals.add(is_active, stake, sign)
+        for dimension, value in zip(GROUP_DIMENSIONS, values):
+            table = self.tables[dimension]
+            stats = table.get(value)
+            if stats is None:
+                stats = table[value] = GroupStats()
+            stats.add(is_active, stake, sign)
+            if stats.nodes == 0:
+                del table[value]
+
+    def distribution(self, dimension: str) -> List[Dict]:
+        """One row per group, largest first"""
+        total_nodes = self.totals.nodes or 1
+        total_stake = self.totals.stake or 1
+        rows = [
+            {
+                "value": value,
+                "nodes": stats.nodes,
+                "active": stats.active,
+                "inactive": stats.nodes - stats.active,
+                "active_ratio": round(stats.active / stats.nodes, 4),
+                "node_share": round(stats.nodes / total_nodes, 4),
+                "stake": stats.stake,
+                "active_stake": stats.active_stake,
+                "stake_share": round(stats.stake / total_stake, 4),
+            }
+            for value, stats in self.tables[dimension].items()
+        ]
+        rows.sort(key=lambda row: (-row["nodes"], str(row["value"])))
+        return rows
+
+
+class GroupAggregates:
+    """Per-network group-by tables. Register ``record`` and ``prepare`` with the SnapshotCache."""
+
+    def __init__(self):
+        self.networks: Dict[str, NetworkGroups] = {}
+        self.rebuilds = 0
+        self.incremental_updates = 0
+        # Rebuilt on the snapshot cache's worker thread, waiting for ``record``
+        self._prepared: Dict[str, NetworkGroups] = {}
+
+    def prepare(self, snapshot: Snapshot):
+        """Rebuild off the event loop when ``record`` could not just apply the diff"""
+        groups = self.networks.get(snapshot.network)
+        if not diff_applies(snapshot.diff, groups.version if groups is not None else None, len(snapshot.store)):
+            self._prepared[snapshot.network] = self._build(snapshot)
+
+    @staticmethod
+    def _build(snapshot: Snapshot) -> NetworkGroups:
+        groups = NetworkGroups()
+        groups.rebuild(snapshot.store, snapshot.version)
+        return groups
+
+    def record(self, snapshot: Snapshot):
+        groups = self._prepared.pop(snapshot.network, None)
+        if groups is not None and groups.version == snapshot.version:
+            self.networks[snapshot.network] = groups
+            self.rebuilds += 1
+            return
+        groups = self.networks.get(snapshot.network)
+        if groups is not None and diff_applies(snapshot.diff, groups.version, len(snapshot.store)):
+            groups.apply(snapshot.diff)
+            self.incremental_updates += 1
+        else:
+            # No prepare ran for this snapshot (registered without it, or it failed)
+            self.networks[snapshot.network] = self._build(snapshot)
+            self.rebuilds += 1
+
+    async def for_snapshot(self, snapshot: Snapshot) -> NetworkGroups:
+        """Tables for ``snapshot``, or newer ones: a request still holding an
+        older snapshot does not wind them back. Tables the listeners never
+        built (e.g. for a restored snapshot) are built on a worker thread."""
+        groups = self.networks.get(snapshot.network)
+        if groups is not None and groups.version >= snapshot.version:
+            return groups
+        built = await asyncio.to_thread(self._build, snapshot)
+        groups = self.networks.get(snapshot.network)
+        if groups is None or groups.version < built.version:
+            self.networks[snapshot.network] = groups = built
+            self.rebuilds += 1
+        return groups
+
+    async def distributions(self, snapshot: Snapshot, dimensions: Iterable[str]) -> Dict[str, List[Dict]]:
+        groups = await self.for_snapshot(snapshot)
+        return {dimension: groups.distribution(dimension) for dimension in dimensions}
@@ -0,0 +1,712 @@
+import asyncio
+import logging
+import math
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timezone
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.snapshot_cache import Snapshot
+
+logger = logging.getLogger(__name__)
+
+# Per-node metrics sampled from every snapshot. is_active is stored as 0/1 so
+# its average over a bucket is the fraction of samples the node was up.
+HISTORY_METRICS = ("response_time_ms", "performance_score", "peer_count", "uptime_24h", "is_active")
+
+# Rollup resolution -> bucket width in seconds
+RESOLUTIONS = {"1m": 60, "1h": 3600, "1d": 86400}
+
+# How long each resolution is kept on disk (seconds)
+RETENTION = {"1m": 2 * 86400, "1h": 90 * 86400, "1d": 3 * 365 * 86400}
+
+AGGREGATES = ("min", "max", "sum", "count", "last")
+
+# Per-metric columns of exported rollup rows
+EXPORT_AGGREGATES = ("min", "max", "avg", "last", "count")
+
+_METRIC_COLUMNS = [f"{metric}_{agg}" for metric in HISTORY_METRICS for agg in AGGREGATES]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS rollups (
+    network TEXT NOT NULL,
+    pubkey TEXT NOT NULL,
+    resolution TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    {", ".join(f"{column} REAL" for column in _METRIC_COLUMNS)},
+    PRIMARY KEY (network, pubkey, resolution, bucket)
+) WITHOUT ROWID
+"""
+
+
+def _merge_sql() -> str:
+    """Upsert that folds a bucket into any partial row already on disk"""
+    assignments = []
+    for metric in HISTORY_METRICS:
+        assignments += [
+            f"{metric}_min = min(coalesce({metric}_min, excluded.{metric}_min), coalesce(excluded.{metric}_min, {metric}_min))",
+            f"{metric}_max = max(coalesce({metric}_max, excluded.{metric}_max), coalesce(excluded.{metric}_max, {metric}_max))",
+            f"{metric}_sum = coalesce({metric}_sum, 0) + coalesce(excluded.{metric}_sum, 0)",
+            f"{metric}_count = coalesce({metric}_count, 0) + coalesce(excluded.{metric}_count, 0)",
+            f"{metric}_last = coalesce(excluded.{metric}_last, {metric}_last)",
+        ]
+    columns = ["network", "pubkey", "resolution", "bucket"] + _METRIC_COLUMNS
+    return (
+        f"INSERT INTO rollups ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+        f"ON CONFLICT (network, pubkey, resolution, bucket) DO UPDATE SET {', '.join(assignments)}"
+    )
+
+
+_MERGE_SQL = _merge_sql()
+
+RollupRow = Tuple
+
+
+def snapshot_timestamp(snapshot: Snapshot) -> float:
+    return snapshot.fetched_at.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _snapshot_values(snapshot: Snapshot) -> np.ndarray:
+    """rows x HISTORY_METRICS matrix (NaN where a node has no value)"""
+    store = snapshot.store
+    return np.column_stack([getattr(store, metric).astype(np.float64) for metric in HISTORY_METRICS])
+
+
+def _none_if_nan(value: float) -> Optional[float]:
+    return None if math.isnan(value) else float(value)
+
+
+class _OpenBuckets:
+    """Running min/max/sum/count/last for the current bucket of one resolution"""
+
+    def __init__(self, slots: int):
+        self.start: Optional[int] = None
+        self.min = np.full((slots, len(HISTORY_METRICS)), np.nan)
+        self.max = np.full((slots, len(HISTORY_METRICS)), np.nan)
+        self.sum = np.zeros((slots, len(HISTORY_METRICS)))
+        self.count = np.zeros((slots, len(HISTORY_METRICS)), dtype=np.int64)
+        self.last = np.full((slots, len(HISTORY_METRICS)), np.nan)
+
+    def grow(self, slots: int):
+        extra = slots - len(self.count)
+        self.min = np.vstack([self.min, np.full((extra, len(HISTORY_METRICS)), np.nan)])
+        self.max = np.vstack([self.max, np.full((extra, len(HISTORY_METRICS)), np.nan)])
+        self.sum = np.vstack([self.sum, np.zeros((extra, len(HISTORY_METRICS)))])
+        self.count = np.vstack([self.count, np.zeros((extra, len(HISTORY_METRICS)), dtype=np.int64)])
+        self.last = np.vstack([self.last, np.full((extra, len(HISTORY_METRICS)), np.nan)])
+
+    def add(self, slots: np.ndarray, values: np.ndarray):
+        present = ~np.isnan(values)
+        self.min[slots] = np.fmin(self.min[slots], values)
+        self.max[slots] = np.fmax(self.max[slots], values)
+        self.sum[slots] += np.where(present, values, 0.0)
+        self.count[slots] += present
+        self.last[slots] = np.where(present, values, self.last[slots])
+
+    def clear(self, slots=slice(None)):
+        self.min[slots] = np.nan
+        self.max[slots] = np.nan
+        self.sum[slots] = 0.0
+        self.count[slots] = 0
+        self.last[slots] = np.nan
+
+    def aggregates(self, slot: int) -> Dict[str, Dict]:
+        return {
+            metric: _aggregate(self.min[slot, i], self.max[slot, i], self.sum[slot, i], self.count[slot, i], self.last[slot, i])
+            for i, metric in enumerate(HISTORY_METRICS)
+        }
+
+
+def _aggregate(minimum, maximum, total, count, last) -> Optional[Dict]:
+    if not count:
+        return None
+    return {
+        "min": float(minimum),
+        "max": float(maximum),
+        "avg": float(total) / int(count),
+        "last": float(last),
+        "count": int(count),
+    }
+
+
+class _ClosedBuckets:
+    """Aggregates of buckets that closed, copied out of the open arrays.
+
+    Turning them into rollup rows is a Python loop over every node, so it
+    is left to the write thread instead of the event loop.
+    """
+
+    def __init__(self, network: str, resolution: str, start: int, pubkeys: List[str], stacked: np.ndarray):
+        self.network = network
+        self.resolution = resolution
+        self.start = start
+        self.pubkeys = pubkeys
+        self.stacked = stacked
+        self._rows: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.pubkeys)
+
+    def row(self, pubkey: str) -> Optional[Tuple]:
+        """``(bucket, *columns)`` of one node, laid out like a stored row"""
+        if self._rows is None:
+            self._rows = {pubkey: i for i, pubkey in enumerate(self.pubkeys)}
+        i = self._rows.get(pubkey)
+        if i is None:
+            return None
+        return (self.start, *(_none_if_nan(value) for value in self.stacked[i].ravel()))
+
+    def __iter__(self) -> Iterator[RollupRow]:
+        for pubkey, values in zip(self.pubkeys, self.stacked):
+            yield (self.network, pubkey, self.resolution, self.start, *(_none_if_nan(value) for value in values.ravel()))
+
+
+class NetworkHistory:
+    """In-memory history of one network.
+
+    Each node owns a slot: a fixed ``capacity`` ring of raw samples (all slots
+    share the ring position and timestamps, since every snapshot samples the
+    whole fleet at once) plus the running aggregates of its open 1m/1h/1d
+    buckets. Closed buckets are handed back from ``record`` for persisting.
+    Slots of nodes unseen for ``evict_after`` seconds are recycled.
+    """
+
+    def __init__(self, network: str, capacity: int = 120, evict_after: float = 86400):
+        self.network = network
+        self.capacity = capacity
+        self.evict_after = evict_after
+        self.slots: Dict[str, int] = {}
+        self._pubkeys: List[Optional[str]] = []
+        self._free: List[int] = []
+        self._allocated = 0
+        self._last_seen = np.zeros(0)
+        self.samples = np.full((0, capacity, len(HISTORY_METRICS)), np.nan, dtype=np.float32)
+        self.timestamps = np.full(capacity, np.nan)
+        self.head = 0
+        self.open = {resolution: _OpenBuckets(0) for resolution in RESOLUTIONS}
+
+    def _grow(self, needed: int):
+        size = max(needed, 2 * len(self._last_seen), 64)
+        extra = size - len(self._last_seen)
+        self._last_seen = np.concatenate([self._last_seen, np.zeros(extra)])
+        self.samples = np.concatenate([
+            self.samples,
+            np.full((extra, self.capacity, len(HISTORY_METRICS)), np.nan, dtype=np.float32),
+        ])
+        for buckets in self.open.values():
+            buckets.grow(size)
+
+    def _slot_for(self, pubkey: str) -> int:
+        slot = self.slots.get(pubkey)
+        if slot is not None:
+            return slot
+        if self._free:
+            slot = self._free.pop()
+            self._pubkeys[slot] = pubkey
+        else:
+            slot = self._allocated
+            self._allocated += 1
+            self._pubkeys.append(pubkey)
+        self.slots[pubkey] = slot
+        return slot
+
+    def record(self, pubkeys: Sequence[str], values: np.ndarray, ts: float) -> List[_ClosedBuckets]:
+        """Append one sample per node; returns the buckets that closed"""
+        closed: List[_ClosedBuckets] = []
+        for resolution, width in RESOLUTIONS.items():
+            buckets = self.open[resolution]
+            start = int(ts // width) * width
+            if buckets.start is not None and buckets.start != start:
+                closed += self._closed(resolution, np.arange(self._allocated))
+                buckets.clear()
+            buckets.start = start
+
+        slots = np.fromiter((self._slot_for(p) for p in pubkeys), dtype=np.int64, count=len(pubkeys))
+        if self._allocated > len(self._last_seen):
+            self._grow(self._allocated)
+
+        self.samples[:, self.head, :] = np.nan
+        self.samples[slots, self.head, :] = values
+        self.timestamps[self.head] = ts
+        self.head = (self.head + 1) % self.capacity
+        self._last_seen[slots] = ts
+        for buckets in self.open.values():
+            buckets.add(slots, values)
+
+        closed += self._evict(ts)
+        return closed
+
+    def _evict(self, now: float) -> List[_ClosedBuckets]:
+        allocated = self._last_seen[:self._allocated]
+        stale = np.flatnonzero((allocated > 0) & (allocated < now - self.evict_after))
+        if not len(stale):
+            return []
+        # Partial buckets of evicted nodes are persisted before the slot is reused
+        rows: List[_ClosedBuckets] = []
+        for resolution, buckets in self.open.items():
+            rows += self._closed(resolution, stale)
+            buckets.clear(stale)
+        for slot in stale:
+            del self.slots[self._pubkeys[slot]]
+            self._pubkeys[slot] = None
+            self._free.append(int(slot))
+        self._last_seen[stale] = 0
+        self.samples[stale] = np.nan
+        return rows
+
+    def _closed(self, resolution: str, slots: np.ndarray) -> List[_ClosedBuckets]:
+        buckets = self.open[resolution]
+        if buckets.start is None:
+            return []
+        slots = slots[buckets.count[slots].any(axis=1)]
+        if not len(slots):
+            return []
+        stacked = np.stack([
+            buckets.min[slots], buckets.max[slots], buckets.sum[slots], buckets.count[slots], buckets.last[slots]
+        ], axis=2)
+        return [_ClosedBuckets(self.network, resolution, buckets.start, [self._pubkeys[slot] for slot in slots], stacked)]
+
+    def pending_buckets(self) -> List[_ClosedBuckets]:
+        """Every open bucket (used to persist partial buckets on shutdown)"""
+        pending: List[_ClosedBuckets] = []
+        for resolution in RESOLUTIONS:
+            pending += self._closed(resolution, np.arange(self._allocated))
+        return pending
+
+    def raw(self, pubkey: str, start: float, end: float, metrics: Sequence[str]) -> Optional[List[Dict]]:
+        slot = self.slots.get(pubkey)
+        if slot is None:
+            return None
+        order = np.roll(np.arange(self.capacity), -self.head)
+        times = self.timestamps[order]
+        keep = order[(times >= start) & (times <= end)]
+        columns = [HISTORY_METRICS.index(m) for m in metrics]
+        values = self.samples[slot][keep][:, columns]
+        points = []
+        for ts, row in zip(self.timestamps[keep], values):
+            if np.isnan(row).all():
+                continue
+            point = {"timestamp": float(ts)}
+            point.update((metric, _none_if_nan(value)) for metric, value in zip(metrics, row))
+            points.append(point)
+        return points
+
+    def open_bucket(self, pubkey: str, resolution: str) -> Optional[Tuple[int, Dict[str, Dict]]]:
+        slot = self.slots.get(pubkey)
+        buckets = self.open[resolution]
+        if slot is None or buckets.start is None or not buckets.count[slot].any():
+            return None
+        return buckets.start, buckets.aggregates(slot)
+
+
+class HistoryStore:
+    """Per-node metric history fed from every snapshot.
+
+    Raw samples live in per-node ring buffers in memory; 1m/1h/1d rollups are
+    merged into SQLite as their buckets close, so range queries read a handful
+    of indexed rows instead of scanning samples. Register ``record`` as a
+    SnapshotCache listener; snapshots are folded into memory on a worker
+    thread of their own, in order, and readers wait for any still in flight.
+    Closed buckets are written by a second thread and served from memory
+    until their write commits, so no reader waits on the disk.
+    """
+
+    def __init__(self, path: str, capacity: int = 120, evict_after: float = 86400,
+                 persist: Optional[Callable[[], bool]] = None):
+        self.path = path
+        # Whether this process writes rollups (with several workers on one
+        # database only the snapshot refresher does); None means always
+        self.persist = persist
+        self.capacity = capacity
+        self.evict_after = evict_after
+        self.networks: Dict[str, NetworkHistory] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        # Second connection for rollup reads: WAL lets it read while the writer writes
+        self._reader: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._records: set = set()
+        self._writes: set = set()
+        self._pruned_at: Dict[str, float] = {}
+        # Guards self.networks and self._unwritten: written on the workers, read from the loop
+        self._memory_lock = threading.Lock()
+        # Closed buckets handed to the writer whose rows are not committed yet
+        self._unwritten: List[_ClosedBuckets] = []
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-write")
+
+    def open(self):
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+        self._db.commit()
+        if self.path != ":memory:":
+            self._reader = sqlite3.connect(
+                f"{Path(self.path).absolute().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+
+    async def close(self):
+        await self._settled()
+        with self._memory_lock:
+            pending = [buckets for history in self.networks.values() for buckets in history.pending_buckets()]
+            if pending and self._persisting():
+                self._submit_write(pending)
+        if self._writes:
+            await asyncio.gather(*(asyncio.wrap_future(write) for write in list(self._writes)), return_exceptions=True)
+        self._worker.shutdown()
+        self._writer.shutdown()
+        for db in (self._reader, self._db):
+            if db is not None:
+                db.close()
+        self._db = self._reader = None
+
+    def record(self, snapshot: Snapshot):
+        future = asyncio.get_running_loop().run_in_executor(self._worker, self._record, snapshot, self._persisting())
+        self._records.add(future)
+        future.add_done_callback(self._record_done)
+
+    def _record(self, snapshot: Snapshot, persist: bool):
+        values = _snapshot_values(snapshot)
+        with self._memory_lock:
+            history = self.networks.get(snapshot.network)
+            if history is None:
+                history = self.networks[snapshot.network] = NetworkHistory(snapshot.network, self.capacity, self.evict_after)
+            closed = history.record(snapshot.store.pubkeys, values, snapshot_timestamp(snapshot))
+            if closed and persist:
+                self._submit_write(closed)
+
+    def _persisting(self) -> bool:
+        return self.persist is None or self.persist()
+
+    def _record_done(self, future: asyncio.Future):
+        self._records.discard(future)
+        if not future.cancelled() and future.exception():
+            logger.error(f"Failed to record metric history: {future.exception()}")
+
+    def _submit_write(self, closed: List[_ClosedBuckets]):
+        """Queue ``closed`` for the writer; readers serve it from memory meanwhile.
+        Called with _memory_lock held."""
+        self._unwritten += closed
+        future = self._writer.submit(self._write, closed)
+        self._writes.add(future)
+        future.add_done_callback(self._write_done)
+
+    def _write_done(self, future: Future):
+        self._writes.discard(future)
+        if not future.cancelled() and future.exception():
+            logger.error(f"Failed to write metric rollups: {future.exception()}")
+
+    async def _settled(self):
+        """Wait for snapshots still on their way into memory (not for rollups on their way to disk)"""
+        if self._records:
+            await asyncio.gather(*self._records, return_exceptions=True)
+
+    def _write(self, closed: List[_ClosedBuckets]):
+        with self._db_lock:
+            try:
+                self._db.executemany(_MERGE_SQL, (row for buckets in closed for row in buckets))
+                now = time.time()
+                for resolution, keep in RETENTION.items():
+                    if now - self._pruned_at.get(resolution, 0) >= RESOLUTIONS[resolution]:
+                        self._db.execute(
+                            "DELETE FROM rollups WHERE resolution = ? AND bucket < ?",
+                            (resolution, now - keep),
+                        )
+                        self._pruned_at[resolution] = now
+                # Commit and stop serving the buckets from memory at once, so
+                # readers (who hold the same lock) see every bucket exactly once
+                with self._memory_lock:
+                    self._db.commit()
+                    self._forget(closed)
+            except Exception:
+                self._db.rollback()
+                with self._memory_lock:
+                    self._forget(closed)
+                raise
+
+    def _forget(self, closed: List[_ClosedBuckets]):
+        self._unwritten = [buckets for buckets in self._unwritten if all(buckets is not c for c in closed)]
+
+    @contextmanager
+    def _reading(self) -> Iterator[sqlite3.Connection]:
+        """Connection for rollup reads, with _memory_lock held so the rows on
+        disk, the unwritten buckets and the open ones all agree"""
+        if self._reader is None:
+            # An in-memory database has no second connection: read on the writer's, between writes
+            with self._db_lock, self._memory_lock:
+                yield self._db
+        else:
+            with self._memory_lock:
+                yield self._reader
+
+    def _unwritten_rows(self, network: str, pubkey: str, resolution: str,
+                        buckets: Optional[Sequence[_ClosedBuckets]] = None) -> List[Tuple]:
+        """``(bucket, *columns)`` rows of ``pubkey`` still on their way to disk; caller holds _memory_lock"""
+        rows = []
+        for closed in self._unwritten if buckets is None else buckets:
+            if closed.network == network and closed.resolution == resolution:
+                row = closed.row(pubkey)
+                if row is not None:
+                    rows.append(row)
+        return rows
+
+    def _read_points(self, network: str, pubkey: str, resolution: str, start: float, end: float) -> Dict[int, Dict[str, Dict]]:
+        with self._reading() as db:
+            rows = db.execute(
+                f"SELECT bucket, {', '.join(_METRIC_COLUMNS)} FROM rollups "
+                "WHERE network = ? AND pubkey = ? AND resolution = ? AND bucket >= ? AND bucket <= ? "
+                "ORDER BY bucket",
+                (network, pubkey, resolution, int(start // RESOLUTIONS[resolution] * RESOLUTIONS[resolution]), end),
+            ).fetchall()
+            rows += self._unwritten_rows(network, pubkey, resolution)
+            return self._points(network, pubkey, resolution, start, end, rows)
+
+    async def rollups(
+        self,
+        network: str,
+        pubkey: str,
+        resolution: str,
+        start: float,
+        end: float,
+        metrics: Sequence[str] = HISTORY_METRICS,
+    ) -> List[Dict]:
+        """Buckets overlapping [start, end], oldest first, including the open one"""
+        await self._settled()
+        points = await asyncio.to_thread(self._read_points, network, pubkey, resolution, start, end)
+        return [
+            {"timestamp": bucket, **{metric: aggregates[metric] for metric in metrics}}
+            for bucket, aggregates in sorted(points.items())
+        ]
+
+    def _points(self, network: str, pubkey: str, resolution: str, start: float, end: float,
+                rows: Sequence[Tuple]) -> Dict[int, Dict[str, Dict]]:
+        """bucket -> per-metric aggregates from ``(bucket, *columns)`` rows plus
+        the open bucket; caller holds _memory_lock"""
+        points: Dict[int, Dict[str, Dict]] = {}
+        for row in rows:
+            bucket, values = row[0], row[1:]
+            aggregates = {
+                metric: _aggregate(*values[i * len(AGGREGATES):(i + 1) * len(AGGREGATES)])
+                for i, metric in enumerate(HISTORY_METRICS)
+            }
+            # A bucket can be both on disk (persisted partially) and unwritten
+            stored = points.get(bucket)
+            points[bucket] = aggregates if stored is None else {
+                metric: _merge(stored[metric], aggregates[metric]) for metric in HISTORY_METRICS
+            }
+
+        history = self.networks.get(network)
+        current = history.open_bucket(pubkey, resolution) if history else None
+        if current is not None and start - RESOLUTIONS[resolution] < current[0] <= end:
+            bucket, live = current
+            stored = points.get(bucket, {})
+            points[bucket] = {metric: _merge(stored.get(metric), live[metric]) for metric in HISTORY_METRICS}
+        return points
+
+    def _open_export(self, network: str, resolution: str, start: float,
+                     end: float) -> Tuple[sqlite3.Connection, sqlite3.Cursor, List[_ClosedBuckets]]:
+        # A connection of its own: WAL lets it read while rollups keep being written
+        reader = sqlite3.connect(f"{Path(self.path).absolute().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        # The cursor's first step pins what it reads; take the unwritten buckets at that same moment
+        with self._memory_lock:
+            cursor = reader.execute(
+                f"SELECT pubkey, bucket, {', '.join(_METRIC_COLUMNS)} FROM rollups "
+                "WHERE network = ? AND resolution = ? AND bucket >= ? AND bucket <= ? "
+                "ORDER BY pubkey, bucket",
+                (network, resolution, int(start // RESOLUTIONS[resolution] * RESOLUTIONS[resolution]), end),
+            )
+            unwritten = list(self._unwritten)
+        return reader, cursor, unwritten
+
+    async def export_rollups(
+        self,
+        network: str,
+        pubkeys: Iterable[str],
+        resolution: str,
+        start: float,
+        end: float,
+        metrics: Sequence[str] = HISTORY_METRICS,
+        chunk_rows: int = 5000,
+    ) -> AsyncIterator[List[Tuple]]:
+        """Buckets of many nodes as flat rows, about ``chunk_rows`` at a time.
+
+        ``pubkeys`` must be in ascending order: stored rows are read in
+        primary-key order and merge-joined with it, each node's open bucket
+        folded in, so memory holds one chunk however long the export is.
+        Rows are ``(pubkey, bucket, *EXPORT_AGGREGATES per metric)``.
+
+        The reader is opened here, before the first row is asked for, so a
+        store that cannot be read (e.g. ``:memory:``) raises sqlite3.Error
+        while the caller can still answer with an error status.
+        """
+        await self._settled()
+        reader, cursor, unwritten = await asyncio.to_thread(self._open_export, network, resolution, start, end)
+        return self._rollup_rows(reader, cursor, unwritten, network, pubkeys, resolution, start, end, metrics, chunk_rows)
+
+    async def _rollup_rows(
+        self,
+        reader: sqlite3.Connection,
+        cursor: sqlite3.Cursor,
+        unwritten: List[_ClosedBuckets],
+        network: str,
+        pubkeys: Iterable[str],
+        resolution: str,
+        start: float,
+        end: float,
+        metrics: Sequence[str],
+        chunk_rows: int,
+    ) -> AsyncIterator[List[Tuple]]:
+        try:
+            stored: List[Tuple] = []
+            position = 0
+            exhausted = False
+            chunk: List[Tuple] = []
+            for count, pubkey in enumerate(pubkeys, 1):
+                rows = []
+                while True:
+                    if position == len(stored):
+                        if exhausted:
+                            break
+                        stored, position = await asyncio.to_thread(cursor.fetchmany, chunk_rows), 0
+                        if not stored:
+                            exhausted = True
+                            break
+                    if stored[position][0] > pubkey:
+                        break
+                    if stored[position][0] == pubkey:
+                        rows.append(stored[position][1:])
+                    position += 1
+                with self._memory_lock:
+                    rows += self._unwritten_rows(network, pubkey, resolution, unwritten)
+                    points = self._points(network, pubkey, resolution, start, end, rows)
+                for bucket in sorted(points):
+                    chunk.append((pubkey, bucket, *(
+                        None if points[bucket][metric] is None else points[bucket][metric][aggregate]
+                        for metric in metrics for aggregate in EXPORT_AGGREGATES
+                    )))
+                if len(chunk) >= chunk_rows:
+                    yield chunk
+                    chunk = []
+                elif count % chunk_rows == 0:
+                    await asyncio.sleep(0)  # nodes without history: don't hold the loop
+            if chunk:
+                yield chunk
+        finally:
+            reader.close()
+
+    async def export_raw(
+        self,
+        network: str,
+        pubkeys: Iterable[str],
+        start: float,
+        end: float,
+        metrics: Sequence[str] = HISTORY_METRICS,
+        chunk_rows: int = 5000,
+    ) -> AsyncIterator[List[Tuple]]:
+        """Raw samples of many nodes as ``(pubkey, timestamp, *metrics)`` rows, about ``chunk_rows`` at a time"""
+        await self._settled()
+        chunk: List[Tuple] = []
+        for count, pubkey in enumerate(pubkeys, 1):
+            for point in self._raw(network, pubkey, start, end, metrics) or ():
+                chunk.append((pubkey, point["timestamp"], *(point[metric] for metric in metrics)))
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+            elif count % chunk_rows == 0:
+                await asyncio.sleep(0)
+        if chunk:
+            yield chunk
+
+    async def raw(self, network: str, pubkey: str, start: float, end: float, metrics: Sequence[str] = HISTORY_METRICS) -> Optional[List[Dict]]:
+        await self._settled()
+        return self._raw(network, pubkey, start, end, metrics)
+
+    def _raw(self, network: str, pubkey: str, start: float, end: float, metrics: Sequence[str]) -> Optional[List[Dict]]:
+        with self._memory_lock:
+            history = self.networks.get(network)
+            return history.raw(pubkey, start, end, metrics) if history else None
+
+    async def raw_window(self, network: str) -> Optional[Tuple[float, float]]:
+        """Oldest and newest raw sample times held for the network"""
+        await self._settled()
+        with self._memory_lock:
+            history = self.networks.get(network)
+            if history is None or np.isnan(history.timestamps).all():
+                return None
+            return float(np.nanmin(history.timestamps)), float(np.nanmax(history.timestamps))
+
+    def _read_activity(self, network: str, pubkeys: Sequence[str], start: float,
+                       end: float) -> Tuple[List[Tuple], Dict[str, Optional[Tuple[int, Dict[str, Dict]]]]]:
+        """Hourly ``(pubkey, bucket, active samples, samples)`` rows and each node's open hour"""
+        floor = int(start // 3600 * 3600)
+        active = HISTORY_METRICS.index("is_active") * len(AGGREGATES)
+        total_column, count_column = active + AGGREGATES.index("sum"), active + AGGREGATES.index("count")
+        rows: List[Tuple] = []
+        with self._reading() as db:
+            for i in range(0, len(pubkeys), 500):  # stay under SQLite's bound-parameter limit
+                chunk = pubkeys[i:i + 500]
+                rows += db.execute(
+                    "SELECT pubkey, bucket, is_active_sum, is_active_count FROM rollups "
+                    f"WHERE network = ? AND resolution = '1h' AND pubkey IN ({', '.join('?' * len(chunk))}) "
+                    "AND bucket >= ? AND bucket <= ?",
+                    (network, *chunk, floor, end),
+                ).fetchall()
+            if self._unwritten:
+                for pubkey in pubkeys:
+                    rows += [
+                        (pubkey, row[0], row[1 + total_column], row[1 + count_column])
+                        for row in self._unwritten_rows(network, pubkey, "1h") if floor <= row[0] <= end
+                    ]
+            history = self.networks.get(network)
+            live_buckets = {pubkey: history.open_bucket(pubkey, "1h") if history else None for pubkey in pubkeys}
+        return rows, live_buckets
+
+    async def uptime_percents(
+        self, network: str, pubkeys: Sequence[str], starts: Dict[str, float], end: float
+    ) -> Dict[str, Dict[str, Optional[float]]]:
+        """uptime_percent for many nodes and windows (``{name: start}``) in one query"""
+        await self._settled()
+        pubkeys = list(pubkeys)
+        rows, live_buckets = await asyncio.to_thread(self._read_activity, network, pubkeys, min(starts.values()), end)
+        # pubkey -> [(bucket, active samples, samples)]
+        buckets: Dict[str, List[Tuple[int, float, int]]] = {pubkey: [] for pubkey in pubkeys}
+        for pubkey, bucket, total, count in rows:
+            if count:
+                buckets[pubkey].append((bucket, total, count))
+
+        floors = {name: int(start // 3600 * 3600) for name, start in starts.items()}
+        result = {}
+        for pubkey in pubkeys:
+            current = live_buckets[pubkey]
+            live = current[1]["is_active"] if current else None
+            windows = {}
+            for name, floor in floors.items():
+                total = sum(t for bucket, t, _ in buckets[pubkey] if bucket >= floor)
+                count = sum(c for bucket, _, c in buckets[pubkey] if bucket >= floor)
+                if live is not None and floor <= current[0] <= end:
+                    total += live["avg"] * live["count"]
+                    count += live["count"]
+                windows[name] = round(100.0 * total / count, 2) if count else None
+            result[pubkey] = windows
+        return result
+
+    async def uptime_percent(self, network: str, pubkey: str, start: float, end: float) -> Optional[float]:
+        """Share of samples in which the node was active, from hourly rollups"""
+        return (await self.uptime_percents(network, [pubkey], {"uptime": start}, end))[pubkey]["uptime"]
+
+def _merge(a: Optional[Dict], b: Optional[Dict]) -> Optional[Dict]:
+    if a is None or b is None:
+        return a or b
+    count = a["count"] + b["count"]
+    return {
+        "min": min(a["min"], b["min"]),
+        "max": max(a["max"], b["max"]),
+        "avg": (a["avg"] * a["count"] + b["avg"] * b["count"]) / count,
+        "last": b["last"] if b["last"] is not None else a["last"],
+        "count": count,
+    }
@@ -0,0 +1,103 @@
+import aiohttp
+import itertools
+import logging
+import time
+from typing import Any, List, Optional, Sequence, Tuple
+
+from app.services.metrics import RPC_ERRORS, RPC_LATENCY
+
+logger = logging.getLogger(__name__)
+
+# (method, params) pair as sent in a JSON-RPC request
+RpcCall = Tuple[str, Optional[list]]
+
+
+class JsonRpcError(Exception):
+    """Error object returned by the upstream, or a malformed response"""
+
+    def __init__(self, message: str, code: Optional[int] = None, method: Optional[str] = None):
+        super().__init__(message)
+        self.code = code
+        self.method = method
+
+
+class JsonRpcTransport:
+    """Minimal JSON-RPC 2.0 transport over a shared aiohttp session"""
+
+    def __init__(self, session: aiohttp.ClientSession, url: str):
+        self.session = session
+        self.url = url
+        self._ids = itertools.count(1)
+
+    async def call(self, method: str, params: Optional[list] = None) -> Any:
+        """Send one request object (not a batch array) and return its result"""
+        request_id = next(self._ids)
+        body = await self._post({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or []}, [method])
+        if not isinstance(body, dict):
+            RPC_ERRORS.inc(method)
+            raise JsonRpcError("Invalid response", method=method)
+        if "error" in body:
+            RPC_ERRORS.inc(method)
+            error = body["error"] or {}
+            raise JsonRpcError(error.get("message", "Unknown error"), error.get("code"), method)
+        return body.get("result")
+
+    async def batch(self, calls: Sequence[RpcCall], return_exceptions: bool = False) -> List[Any]:
+        """Send every call as one JSON-RPC batch array (one HTTP round trip).
+
+        Results come back in the order of ``calls``. With ``return_exceptions``
+        a failed call yields its JsonRpcError in place of a result, otherwise
+        the first error is raised.
+        """
+        if not calls:
+            return []
+
+        payload = []
+        ids = []
+        for method, params in calls:
+            request_id = next(self._ids)
+            ids.append(request_id)
+            payload.append({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or []})
+        body = await self._post(payload, [method for method, _ in calls])
+
+        # A server that rejects the whole batch replies with a single error object
+        if isinstance(body, dict):
+            for method, _ in calls:
+                RPC_ERRORS.inc(method)
+            error = body.get("error") or {}
+            raise JsonRpcError(error.get("message", "Invalid batch response"), error.get("code"))
+
+        by_id = {item.get("id"): item for item in body if isinstance(item, dict)}
+        results = []
+        for request_id, (method, _) in zip(ids, calls):
+            item = by_id.get(request_id)
+            if item is None:
+                result = JsonRpcError("Missing response", method=method)
+            elif "error" in item:
+                error = item["error"] or {}
+                result = JsonRpcError(error.get("message", "Unknown error"), error.get("code"), method)
+            else:
+                result = item.get("result")
+
+            if isinstance(result, JsonRpcError):
+                RPC_ERRORS.inc(method)
+                if not return_exceptions:
+                    raise result
+            results.append(result)
+        return results
+
+    async def _post(self, payload: Any, methods: Sequence[str]) -> Any:
+        """One HTTP round trip; latency and transport errors are counted per method"""
+        started = time.perf_counter()
+        try:
+            async with self.session.post(self.url, json=payload) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+        except Exception:
+            for method in methods:
+                RPC_ERRORS.inc(method)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            for method in methods:
+                RPC_LATENCY.observe(method, value=elapsed)
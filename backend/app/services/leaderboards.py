@@ -0,0 +1,271 @@
+import asyncio
+import bisect
+import logging
+import math
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.services.pnode_store import PNodeStore
+from app.services.snapshot_cache import Snapshot
+from app.services.snapshot_diff import SnapshotDiff, diff_applies
+
+logger = logging.getLogger(__name__)
+
+# metric -> whether higher values rank first
+LEADERBOARD_METRICS = {
+    "stake": True,
+    "performance_score": True,
+    "uptime_24h": True,
+    "response_time_ms": False,
+    "commission": False,
+}
+
+# (sort value, pubkey): the sort value is negated for descending metrics so
+# every board is ascending, with ties broken by pubkey like PNodeStore.sorted_rows
+_Key = Tuple[Any, str]
+
+
+class OrderStatisticList:
+    """Sorted list with O(log n) rank and positional lookup.
+
+    Keys live in sorted buckets of roughly ``load`` items. A Fenwick tree
+    over bucket sizes turns "which bucket holds position i" and "how many
+    keys precede bucket b" into O(log buckets) walks, so rank() is three
+    binary searches. add/remove shift at most one bucket; the tree is only
+    rebuilt when a bucket splits or empties.
+    """
+
+    def __init__(self, keys: Optional[List] = None, load: int = 512):
+        self.load = load
+        ordered = sorted(keys or ())
+        self._buckets: List[List] = [ordered[i:i + load] for i in range(0, len(ordered), load)]
+        self._maxes: List = [bucket[-1] for bucket in self._buckets]
+        self._len = len(ordered)
+        self._rebuild_tree()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _rebuild_tree(self):
+        tree = [0] + [len(bucket) for bucket in self._buckets]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, bucket: int, delta: int):
+        i = bucket + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _before(self, bucket: int) -> int:
+        """Number of keys in buckets [0, bucket)"""
+        total, i = 0, bucket
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, position: int) -> Tuple[int, int]:
+        """(bucket, offset) of the key at ``position``"""
+        bucket, step = 0, 1 << len(self._tree).bit_length()
+        while step:
+            nxt = bucket + step
+            if nxt < len(self._tree) and self._tree[nxt] <= position:
+                bucket = nxt
+                position -= self._tree[nxt]
+            step >>= 1
+        return bucket, position
+
+    def add(self, key):
+        if not self._buckets:
+            self._buckets, self._maxes = [[key]], [key]
+            self._len = 1
+            self._rebuild_tree()
+            return
+        b = bisect.bisect_left(self._maxes, key)
+        if b == len(self._maxes):
+            b -= 1
+            self._buckets[b].append(key)
+            self._maxes[b] = key
+        else:
+            bisect.insort(self._buckets[b], key)
+        self._len += 1
+        bucket = self._buckets[b]
+        if len(bucket) > 2 * self.load:
+            self._buckets[b:b + 1] = [bucket[:self.load], bucket[self.load:]]
+            self._maxes[b:b + 1] = [bucket[self.load - 1], bucket[-1]]
+            self._rebuild_tree()
+        else:
+            self._tree_add(b, 1)
+
+    def remove(self, key):
+        b = bisect.bisect_left(self._maxes, key)
+        bucket = self._buckets[b] if b < len(self._buckets) else []
+        i = bisect.bisect_left(bucket, key)
+        if i == len(bucket) or bucket[i] != key:
+            raise ValueError(f"{key!r} not in list")
+        del bucket[i]
+        self._len -= 1
+        if bucket:
+            self._maxes[b] = bucket[-1]
+            self._tree_add(b, -1)
+        else:
+            del self._buckets[b]
+            del self._maxes[b]
+            self._rebuild_tree()
+
+    def rank(self, key) -> Optional[int]:
+        """0-based position of ``key``, or None if absent"""
+        b = bisect.bisect_left(self._maxes, key)
+        if b == len(self._maxes):
+            return None
+        bucket = self._buckets[b]
+        i = bisect.bisect_left(bucket, key)
+        if bucket[i] != key:
+            return None
+        return self._before(b) + i
+
+    def __getitem__(self, position: int):
+        if not 0 <= position < self._len:
+            raise IndexError(position)
+        b, i = self._locate(position)
+        return self._buckets[b][i]
+
+    def islice(self, start: int, stop: int) -> Iterator:
+        """Keys at positions [start, stop) without copying the list"""
+        stop = min(stop, self._len)
+        if start >= stop:
+            return
+        b, i = self._locate(start)
+        remaining = stop - start
+        while remaining:
+            chunk = self._buckets[b][i:i + remaining]
+            yield from chunk
+            remaining -= len(chunk)
+            b, i = b + 1, 0
+
+
+def _key(metric: str, pnode) -> Optional[_Key]:
+    value = pnode.get(metric)
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None  # unranked
+    return (-value if LEADERBOARD_METRICS[metric] else value, pnode["pubkey"])
+
+
+class NetworkLeaderboards:
+    """One OrderStatisticList per metric, kept current from snapshot diffs.
+
+    Only nodes that were added, removed or changed one of the ranked values
+    move, so a snapshot costs O(changed nodes * log n) instead of a full
+    sort per board. Nodes without a value for a metric are not ranked on it.
+    """
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self.boards: Dict[str, OrderStatisticList] = {}
+        self._keys: Dict[str, Dict[str, _Key]] = {}
+
+    def rebuild(self, store: PNodeStore, version: int):
+        self.boards, self._keys = {}, {}
+        for metric in LEADERBOARD_METRICS:
+            keys = {}
+            for pnode in store.pnodes:
+                key = _key(metric, pnode)
+                if key is not None:
+                    keys[pnode["pubkey"]] = key
+            self._keys[metric] = keys
+            self.boards[metric] = OrderStatisticList(list(keys.values()))
+        self.version = version
+
+    def apply(self, diff: SnapshotDiff):
+        """Move the boards from ``diff.from_version`` to ``diff.to_version``"""
+        for pubkey in diff.removed:
+            for metric in LEADERBOARD_METRICS:
+                self._set(metric, pubkey, None)
+        for pnode in diff.added:
+            for metric in LEADERBOARD_METRICS:
+                self._set(metric, pnode["pubkey"], _key(metric, pnode))
+        for change in diff.changed:
+            for metric in LEADERBOARD_METRICS.keys() & set(change.changed_fields):
+                self._set(metric, change.pubkey, _key(metric, change.pnode))
+        self.version = diff.to_version
+
+    def _set(self, metric: str, pubkey: str, key: Optional[_Key]):
+        keys = self._keys[metric]
+        old = keys.pop(pubkey, None)
+        if old == key:
+            if key is not None:
+                keys[pubkey] = key
+            return
+        board = self.boards[metric]
+        if old is not None:
+            board.remove(old)
+        if key is not None:
+            board.add(key)
+            keys[pubkey] = key
+
+    def top(self, metric: str, limit: int, skip: int = 0) -> List[Tuple[int, str]]:
+        """(1-based rank, pubkey) for ranks skip+1 .. skip+limit"""
+        board = self.boards[metric]
+        return [(skip + i + 1, pubkey) for i, (_, pubkey) in enumerate(board.islice(skip, skip + limit))]
+
+    def rank(self, metric: str, pubkey: str) -> Optional[int]:
+        """1-based rank of ``pubkey`` on ``metric`` (None if unranked)"""
+        key = self._keys[metric].get(pubkey)
+        if key is None:
+            return None
+        return self.boards[metric].rank(key) + 1
+
+
+class Leaderboards:
+    """Per-network leaderboards. Register ``record`` and ``prepare`` with the SnapshotCache."""
+
+    def __init__(self):
+        self.networks: Dict[str, NetworkLeaderboards] = {}
+        self.rebuilds = 0
+        self.incremental_updates = 0
+        # Rebuilt on the snapshot cache's worker thread, waiting for ``record``
+        self._prepared: Dict[str, NetworkLeaderboards] = {}
+
+    def prepare(self, snapshot: Snapshot):
+        """Rebuild off the event loop when ``record`` could not just apply the diff"""
+        boards = self.networks.get(snapshot.network)
+        if not diff_applies(snapshot.diff, boards.version if boards is not None else None, len(snapshot.store)):
+            self._prepared[snapshot.network] = self._build(snapshot)
+
+    @staticmethod
+    def _build(snapshot: Snapshot) -> NetworkLeaderboards:
+        boards = NetworkLeaderboards()
+        boards.rebuild(snapshot.store, snapshot.version)
+        return boards
+
+    def record(self, snapshot: Snapshot):
+        boards = self._prepared.pop(snapshot.network, None)
+        if boards is not None and boards.version == snapshot.version:
+            self.networks[snapshot.network] = boards
+            self.rebuilds += 1
+            return
+        boards = self.networks.get(snapshot.network)
+        if boards is not None and diff_applies(snapshot.diff, boards.version, len(snapshot.store)):
+            boards.apply(snapshot.diff)
+            self.incremental_updates += 1
+        else:
+            # No prepare ran for this snapshot (registered without it, or it failed)
+            self.networks[snapshot.network] = self._build(snapshot)
+            self.rebuilds += 1
+
+    async def for_snapshot(self, snapshot: Snapshot) -> NetworkLeaderboards:
+        """Boards for ``snapshot``, or newer ones: a request still holding an
+        older snapshot does not wind them back. Boards the listeners never
+        built (e.g. for a restored snapshot) are built on a worker thread."""
+        boards = self.networks.get(snapshot.network)
+        if boards is not None and boards.version >= snapshot.version:
+            return boards
+        built = await asyncio.to_thread(self._build, snapshot)
+        boards = self.networks.get(snapshot.network)
+        if boards is None or boards.version < built.version:
+            self.networks[snapshot.network] = boards = built
+            self.rebuilds += 1
+        return boards
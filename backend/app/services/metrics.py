@@ -0,0 +1,216 @@
+import bisect
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Prometheus text exposition format served by /metrics
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Seconds; covers cache hits (sub-millisecond) up to slow upstream calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _label_text(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return self.header() + list(self.samples())
+
+
+class Counter(_Metric):
+    """Monotonic count per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_label_text(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value per label set that can go up and down"""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) - amount
+
+    def set(self, *labels: str, value: float):
+        self._values[labels] = value
+
+
+class CallbackGauge(_Metric):
+    """Gauge read at scrape time from ``callback`` ({label values: value}).
+
+    For values that are cheaper to compute on demand than to keep current,
+    such as snapshot age or the size of a cache.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 callback: Callable[[], Dict[Labels, float]]):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.callback().items():
+            yield f"{self.name}{_label_text(self.labelnames, labels)} {_format_value(value)}"
+
+
+class CallbackCounter(CallbackGauge):
+    """Counter read at scrape time from counts kept elsewhere (stats dataclasses)"""
+
+    kind = "counter"
+
+
+class Histogram(_Metric):
+    """Bucketed distribution per label set.
+
+    ``observe`` is a bisect and three list/float updates; cumulative bucket
+    counts are only computed when scraped.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, *labels: str, value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def time(self, *labels: str) -> "_Timer":
+        """Context manager observing the elapsed wall time of its block"""
+        return _Timer(self, labels)
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> Iterable[str]:
+        bucket_names = self.labelnames + ("le",)
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_label_text(bucket_names, labels + (bound,))} {cumulative}"
+            label_text = _label_text(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(total)}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: Labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(*self.labels, value=time.perf_counter() - self.started)
+        return False
+
+
+class Registry:
+    """Named metrics rendered together in the text exposition format.
+
+    Everything runs on the event loop, so updates are plain dict/float
+    operations with no locking.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        # Re-registering a name replaces it (callback gauges rebound per app lifespan)
+        self._metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, name: str):
+        self._metrics.pop(name, None)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by route template, method and status", ("route", "method", "status")))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("route", "method")))
+
+RPC_LATENCY = REGISTRY.register(Histogram(
+    "upstream_rpc_duration_seconds", "Upstream pRPC round trip by method (batched calls share one round trip)",
+    ("method",)))
+RPC_ERRORS = REGISTRY.register(Counter(
+    "upstream_rpc_errors_total", "Upstream pRPC calls that failed, by method", ("method",)))
+
+SNAPSHOT_REFRESH = REGISTRY.register(Histogram(
+    "snapshot_refresh_duration_seconds", "Time to fetch and index a network snapshot", ("network",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)))
+SNAPSHOT_REFRESH_FAILURES = REGISTRY.register(Counter(
+    "snapshot_refresh_failures_total", "Snapshot refreshes that failed (the previous snapshot kept serving)",
+    ("network",)))
+
+SERIALIZATION = REGISTRY.register(Histogram(
+    "response_serialization_seconds", "Time to encode and compress a response body", ("route",)))
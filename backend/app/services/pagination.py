@@ -0,0 +1,72 @@
+import base64
+import hashlib
+import json
+from dataclasses import astuple, dataclass
+from typing import Any, Optional
+
+from app.services.pnode_store import NUMERIC_COLUMNS, PNodeQuery
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+@dataclass
+class Cursor:
+    """Keyset position: the last row served plus the snapshot it came from"""
+    version: int
+    sort_by: str
+    descending: bool
+    last_value: Any
+    last_pubkey: str
+    query_hash: str
+
+
+def query_fingerprint(query: PNodeQuery) -> str:
+    """Short hash of the filters (and ordering) a cursor is valid for"""
+    return hashlib.sha1(repr(astuple(query)).encode()).hexdigest()[:12]
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    payload = {
+        "v": cursor.version,
+        "s": cursor.sort_by,
+        "d": cursor.descending,
+        "k": cursor.last_value,
+        "p": cursor.last_pubkey,
+        "q": cursor.query_hash,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _fits_column(sort_by: str, value: Any) -> bool:
+    """Whether ``value`` compares with the ``sort_by`` column (missing values are None)"""
+    if value is None:
+        return True
+    if sort_by in NUMERIC_COLUMNS:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return isinstance(value, str)
+
+
+def decode_cursor(token: str, query: Optional[PNodeQuery] = None) -> Cursor:
+    """Parse an opaque cursor, checking it belongs to the same query"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        cursor = Cursor(
+            version=int(payload["v"]),
+            sort_by=str(payload["s"]),
+            descending=bool(payload["d"]),
+            last_value=payload["k"],
+            last_pubkey=str(payload["p"]),
+            query_hash=str(payload["q"]),
+        )
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(f"Malformed cursor: {e}")
+    if not _fits_column(cursor.sort_by, cursor.last_value):
+        raise InvalidCursorError(f"Malformed cursor: key does not fit sort column {cursor.sort_by!r}")
+
+    if query is not None and query_fingerprint(query) != cursor.query_hash:
+        raise InvalidCursorError("Cursor was issued for different filters or ordering")
+    return cursor
@@ -0,0 +1,64 @@
+import sys
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Low-cardinality strings repeated across the fleet. Interning them means
+# every node points at one shared str instead of its own copy.
+INTERNED_FIELDS = ("version", "status", "data_center", "location", "network")
+
+
+@dataclass(slots=True)
+class PNode:
+    """One pNode in a snapshot.
+
+    A slotted record instead of a 19-key dict: no per-node hash table, and
+    orjson serializes it natively. Read access also works dict-style
+    (``pnode["stake"]``, ``pnode.get("ip")``) so code written against the
+    old dicts keeps working.
+    """
+    pubkey: str
+    ip: Optional[str]
+    version: str
+    is_active: bool
+    last_seen: str
+    stake: int
+    commission: float
+    data_center: Optional[str]
+    performance_score: float
+    uptime_24h: Optional[float]
+    vote_success_rate: Optional[float]
+    response_time_ms: Optional[float]
+    peer_count: Optional[int]
+    network: str
+    is_real_data: bool
+    status: str
+    location: Optional[str]
+    last_vote: int
+    epoch_credits: int
+
+    def __post_init__(self):
+        for name in INTERNED_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                setattr(self, name, sys.intern(value))
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in _FIELD_SET else default
+
+    def keys(self) -> Tuple[str, ...]:
+        return PNODE_FIELDS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(PNODE_FIELDS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in PNODE_FIELDS}
+
+
+PNODE_FIELDS = tuple(f.name for f in fields(PNode))
+_FIELD_SET = frozenset(PNODE_FIELDS)
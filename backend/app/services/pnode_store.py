@@ -0,0 +1,355 @@
+import bisect
+import logging
+import math
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Thresholds used by the summary counters
+HIGH_PERFORMANCE_SCORE = 0.9
+LOW_COMMISSION = 3.0
+LATENCY_PERCENTILES = (50, 95, 99)
+
+NUMERIC_COLUMNS = ("stake", "commission", "performance_score", "uptime_24h", "response_time_ms", "peer_count")
+STRING_COLUMNS = ("pubkey", "ip", "version", "status", "data_center", "location", "last_seen")
+SORTABLE_COLUMNS = NUMERIC_COLUMNS + STRING_COLUMNS
+# Columns answered from a value -> rows hash index
+HASH_INDEXED_COLUMNS = ("status", "version", "data_center", "location")
+
+
+@dataclass
+class PNodeQuery:
+    """Filters and ordering for a pNode listing (all filters are ANDed)"""
+    status: Optional[List[str]] = None
+    version: Optional[List[str]] = None
+    data_center: Optional[List[str]] = None
+    location: Optional[List[str]] = None
+    min_stake: Optional[float] = None
+    max_stake: Optional[float] = None
+    min_commission: Optional[float] = None
+    max_commission: Optional[float] = None
+    min_performance: Optional[float] = None
+    max_performance: Optional[float] = None
+    pubkey_prefix: Optional[str] = None
+    search: Optional[str] = None
+    sort_by: str = "stake"
+    descending: bool = True
+
+    def ranges(self) -> List[Tuple[str, Optional[float], Optional[float]]]:
+        return [
+            ("stake", self.min_stake, self.max_stake),
+            ("commission", self.min_commission, self.max_commission),
+            ("performance_score", self.min_performance, self.max_performance),
+        ]
+
+
+class _Descending:
+    """Wraps a value so tuple comparisons order it high-to-low"""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.value == other.value
+
+
+def sort_tuple(value: Any, pubkey: str, descending: bool) -> Tuple:
+    """Python equivalent of a row's place in sorted_rows (missing values last)"""
+    missing = value is None or (isinstance(value, float) and math.isnan(value))
+    if missing:
+        return (True, 0, pubkey)
+    return (False, _Descending(value) if descending else value, pubkey)
+
+
+def _float_column(pnodes: List[Dict], key: str) -> np.ndarray:
+    """Float column where missing/None values become NaN"""
+    return np.fromiter(
+        (np.nan if p.get(key) is None else p[key] for p in pnodes),
+        dtype=np.float64,
+        count=len(pnodes),
+    )
+
+
+class PNodeStore:
+    """Columnar, read-only view of one snapshot's pNodes.
+
+    Built once per snapshot; every stat is a vectorized NumPy expression over
+    typed columns instead of Python loops over the list of dicts. Row ``i`` of
+    every column is ``pnodes[i]``.
+    """
+
+    def __init__(self, pnodes: List[Dict], columns: Optional[Dict[str, np.ndarray]] = None):
+        # ``columns``: typed columns already built for exactly these rows
+        # (a snapshot restored from disk); the rest are extracted from pnodes
+        columns = columns or {}
+        self.pnodes = pnodes
+        self.pubkeys = [p["pubkey"] for p in pnodes]
+        self.stake = columns["stake"] if "stake" in columns else \
+            np.fromiter((p.get("stake") or 0 for p in pnodes), dtype=np.int64, count=len(pnodes))
+        for name in ("commission", "performance_score", "uptime_24h", "response_time_ms", "peer_count"):
+            setattr(self, name, columns[name] if name in columns else _float_column(pnodes, name))
+        self.is_active = columns["is_active"] if "is_active" in columns else \
+            np.fromiter((bool(p.get("is_active")) for p in pnodes), dtype=bool, count=len(pnodes))
+        self._string_columns: Dict[str, np.ndarray] = {}
+        self._hash_indexes: Dict[str, Dict[str, np.ndarray]] = {}
+        self._sorted_indexes: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._encoded_columns: Dict[str, List[bytes]] = {}
+
+    def __len__(self) -> int:
+        return len(self.pnodes)
+
+    def column(self, name: str) -> np.ndarray:
+        if name in NUMERIC_COLUMNS:
+            return getattr(self, name)
+        return self._string_column(name)
+
+    def _string_column(self, name: str) -> np.ndarray:
+        if name not in self._string_columns:
+            self._string_columns[name] = np.array([p.get(name) for p in self.pnodes], dtype=object)
+        return self._string_columns[name]
+
+    # ----- Secondary indexes (built lazily, once per snapshot) -----
+
+    def hash_index(self, name: str) -> Dict[str, np.ndarray]:
+        """value -> ascending row ids, for exact-match filters"""
+        if name not in self._hash_indexes:
+            groups: Dict[str, List[int]] = {}
+            for row, value in enumerate(self._string_column(name)):
+                groups.setdefault(value, []).append(row)
+            self._hash_indexes[name] = {value: np.array(rows, dtype=np.int64) for value, rows in groups.items()}
+        return self._hash_indexes[name]
+
+    @cached_property
+    def _pubkey_rank(self) -> np.ndarray:
+        """Rank of each row's pubkey; the tie-breaker of every sort order"""
+        rank = np.empty(len(self), dtype=np.int64)
+        rank[self._sorted_pubkey_rows] = np.arange(len(self))
+        return rank
+
+    @cached_property
+    def _sorted_pubkey_rows(self) -> np.ndarray:
+        return np.array(sorted(range(len(self)), key=self.pubkeys.__getitem__), dtype=np.int64)
+
+    def _sort_key(self, name: str) -> np.ndarray:
+        """Ascending float key for a column; missing values become +inf"""
+        if name in NUMERIC_COLUMNS:
+            values = self.column(name).astype(np.float64)
+        else:
+            raw = self._string_column(name)
+            present = np.array([v is not None for v in raw], dtype=bool)
+            values = np.full(len(self), np.inf)
+            if present.any():
+                _, ranks = np.unique(raw[present].astype(str), return_inverse=True)
+                values[present] = ranks
+        return np.where(np.isnan(values), np.inf, values)
+
+    def sorted_rows(self, name: str, descending: bool = False) -> np.ndarray:
+        """Row ids ordered by column, then pubkey; missing values always last"""
+        if name not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort by {name!r}; choose one of {', '.join(SORTABLE_COLUMNS)}")
+        if (name, descending) not in self._sorted_indexes:
+            if name == "stake":
+                # Exact integer key: lamport stakes can exceed float precision
+                key = -self.stake if descending else self.stake
+            else:
+                key = self._sort_key(name)
+                if descending:
+                    key = np.where(np.isinf(key), np.inf, -key)
+            self._sorted_indexes[(name, descending)] = np.lexsort((self._pubkey_rank, key))
+        return self._sorted_indexes[(name, descending)]
+
+    def sort_orders(self) -> Dict[Tuple[str, bool], np.ndarray]:
+        """Every sorted_rows order built so far, keyed by (column, descending)"""
+        return {key: order for key, order in list(self._sorted_indexes.items()) if key[0] in SORTABLE_COLUMNS}
+
+    def seed_sort_orders(self, orders: Dict[Tuple[str, bool], np.ndarray]):
+        """Reuse orders computed for identical rows (e.g. a snapshot restored from disk)"""
+        for key, order in orders.items():
+            if key[0] in SORTABLE_COLUMNS and len(order) == len(self):
+                self._sorted_indexes[key] = order
+
+    def sort_position(self, name: str, descending: bool = False) -> np.ndarray:
+        """Inverse of sorted_rows: row id -> position in that order"""
+        key = (f"{name}:position", descending)
+        if key not in self._sorted_indexes:
+            order = self.sorted_rows(name, descending)
+            position = np.empty(len(self), dtype=np.int64)
+            position[order] = np.arange(len(self))
+            self._sorted_indexes[key] = position
+        return self._sorted_indexes[key]
+
+    def _range_rows(self, name: str, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        order = self.sorted_rows(name)
+        values = self.column(name)[order]
+        start = 0 if low is None else np.searchsorted(values, low, side="left")
+        end = len(values) if high is None else np.searchsorted(values, high, side="right")
+        if end > start and name in NUMERIC_COLUMNS:
+            # NaNs sort last; never let an open upper bound include them
+            end = min(end, len(values) - int(np.isnan(values).sum()))
+        return order[start:end]
+
+    @staticmethod
+    def _prefix_index(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(row ids, values) sorted by lower-cased value, for prefix lookups"""
+        lowered = [v.lower() for v in values]
+        rows = np.array(sorted(range(len(lowered)), key=lowered.__getitem__), dtype=np.int64)
+        return rows, np.array([lowered[i] for i in rows], dtype=str)
+
+    @staticmethod
+    def _prefix_rows(index: Tuple[np.ndarray, np.ndarray], prefix: str) -> np.ndarray:
+        """Rows whose value starts with prefix (case-insensitive)"""
+        rows, values = index
+        if not len(rows):
+            return rows
+        prefix = prefix.lower()
+        start = np.searchsorted(values, prefix, side="left")
+        end = np.searchsorted(values, prefix + "\uffff", side="left")
+        return rows[start:end]
+
+    @cached_property
+    def _pubkey_prefix_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self._prefix_index(self.pubkeys)
+
+    @cached_property
+    def _ip_prefix_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self._prefix_index([p.get("ip") or "" for p in self.pnodes])
+
+    def _search_rows(self, term: str) -> np.ndarray:
+        """pubkey or IP prefix, or data center substring (matched over index keys)"""
+        term = term.lower()
+        parts = [
+            self._prefix_rows(self._pubkey_prefix_index, term),
+            self._prefix_rows(self._ip_prefix_index, term),
+        ]
+        for value, rows in self.hash_index("data_center").items():
+            if value and term in value.lower():
+                parts.append(rows)
+        return np.unique(np.concatenate(parts))
+
+    def select(self, query: PNodeQuery) -> np.ndarray:
+        """Row ids matching the query, in the requested order"""
+        order = self.sorted_rows(query.sort_by, query.descending)
+
+        candidates: List[np.ndarray] = []
+        for name in HASH_INDEXED_COLUMNS:
+            wanted = getattr(query, name)
+            if wanted is not None:
+                index = self.hash_index(name)
+                # Repeated values (?version=a&version=a) must not repeat rows
+                parts = [index[value] for value in dict.fromkeys(wanted) if value in index]
+                candidates.append(np.concatenate(parts) if parts else np.empty(0, dtype=np.int64))
+        for name, low, high in query.ranges():
+            if low is not None or high is not None:
+                candidates.append(self._range_rows(name, low, high))
+        if query.pubkey_prefix:
+            candidates.append(self._prefix_rows(self._pubkey_prefix_index, query.pubkey_prefix))
+        if query.search:
+            candidates.append(self._search_rows(query.search))
+
+        if not candidates:
+            return order
+
+        # Intersect smallest-first, then order the survivors by their position
+        # in the cached sort index: O(k log k) in the matches, not O(n)
+        candidates.sort(key=len)
+        rows = candidates[0]
+        for other in candidates[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, other)
+        position = self.sort_position(query.sort_by, query.descending)
+        return rows[np.argsort(position[rows], kind="stable")]
+
+    def value(self, name: str, row: int) -> Any:
+        """Plain Python value of one cell (NaN -> None)"""
+        value = self.column(name)[row]
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float) and math.isnan(value):
+            return None
+        return value
+
+    def seek(self, rows: np.ndarray, name: str, descending: bool, last_value: Any, last_pubkey: str) -> int:
+        """Index of the first entry of ``rows`` (ordered by name) after the given key.
+
+        Binary search, so a keyset page costs O(log n + limit) however deep it
+        is, and still lands correctly when the key's row changed or vanished.
+        """
+        target = sort_tuple(last_value, last_pubkey, descending)
+        return bisect.bisect_right(
+            rows,
+            target,
+            key=lambda row: sort_tuple(self.value(name, row), self.pubkeys[row], descending),
+        )
+
+    # ----- Projection -----
+
+    def encoded_column(self, name: str) -> List[bytes]:
+        """Each row's value of ``name`` as JSON, encoded once per snapshot"""
+        if name not in self._encoded_columns:
+            self._encoded_columns[name] = [orjson.dumps(p.get(name)) for p in self.pnodes]
+        return self._encoded_columns[name]
+
+    def project(self, rows: Sequence[int], fields: Sequence[str]) -> bytes:
+        """JSON array of ``{field: value}`` objects for ``rows``.
+
+        Spliced together from the per-column encodings, so a projected page
+        never builds per-node dicts or re-encodes values.
+        """
+        columns = [self.encoded_column(name) for name in fields]
+        prefixes = [orjson.dumps(name) + b":" for name in fields]
+        objects = [
+            b"{" + b",".join([prefix + column[row] for prefix, column in zip(prefixes, columns)]) + b"}"
+            for row in rows
+        ]
+        return b"[" + b",".join(objects) + b"]"
+
+    @cached_property
+    def row_by_pubkey(self) -> Dict[str, int]:
+        return {pubkey: i for i, pubkey in enumerate(self.pubkeys)}
+
+    def get(self, pubkey: str) -> Optional[Dict]:
+        row = self.row_by_pubkey.get(pubkey)
+        return None if row is None else self.pnodes[row]
+
+    @staticmethod
+    def _mean(values: np.ndarray) -> float:
+        values = values[~np.isnan(values)]
+        return float(values.mean()) if values.size else 0.0
+
+    def latency_percentiles(self, mask: Optional[np.ndarray] = None) -> Dict[str, Optional[float]]:
+        values = self.response_time_ms if mask is None else self.response_time_ms[mask]
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return {f"p{p}": None for p in LATENCY_PERCENTILES}
+        results = np.percentile(values, LATENCY_PERCENTILES)
+        return {f"p{p}": round(float(v), 1) for p, v in zip(LATENCY_PERCENTILES, results)}
+
+    @cached_property
+    def summary(self) -> Dict:
+        """Fleet-wide stats, computed once per snapshot"""
+        active = self.is_active
+        active_count = int(active.sum())
+        staked = active & (self.stake > 0)
+
+        return {
+            "total_pnodes": len(self),
+            "active_pnodes": active_count,
+            "inactive_pnodes": len(self) - active_count,
+            "total_stake": int(self.stake[active].sum()),
+            "avg_commission": round(self._mean(self.commission[staked]), 2),
+            "avg_performance": round(self._mean(self.performance_score[active]), 3),
+            "avg_uptime_24h": round(self._mean(self.uptime_24h[active]), 2),
+            "high_performers": int((active & (self.performance_score > HIGH_PERFORMANCE_SCORE)).sum()),
+            "low_commission_nodes": int((active & (self.commission < LOW_COMMISSION)).sum()),
+            "latency_ms": self.latency_percentiles(active),
+        }
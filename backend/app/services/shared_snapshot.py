@@ -0,0 +1,206 @@
+import asyncio
+import fcntl
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.services.metrics import SNAPSHOT_REFRESH, SNAPSHOT_REFRESH_FAILURES
+from app.services.pnode_store import PNodeStore
+from app.services.snapshot_cache import Snapshot, SnapshotCache, UnknownNetworkError
+from app.services.snapshot_persistence import SnapshotPersistence, decode_snapshot, map_file
+from app.services.xandeum_client import XandeumPRPCClient
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLease:
+    """Cross-process leader election: an exclusive, non-blocking flock on ``path``.
+
+    The kernel drops the lock when the holder exits, however it exits, so
+    the next worker to try takes over.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        logger.info(f"Worker {os.getpid()} is now the snapshot refresher")
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+def _read_shared(path: str) -> Snapshot:
+    return decode_snapshot(map_file(path), restored=False)
+
+
+class SharedSnapshotCache(SnapshotCache):
+    """SnapshotCache shared by the worker processes of one host.
+
+    The worker holding the leader lease is the only one that polls upstream;
+    it writes each snapshot atomically to ``<directory>/<network>.snapshot``
+    and publishes it in memory as it is. The other workers check that file
+    with one stat() every ``sync_interval`` seconds in the background, and
+    map a new version read-only (store columns and sort orders are not
+    copied), decoding and diffing it on a worker thread. Requests only ever
+    read memory. So all workers serve the same version, with the same ETags
+    and cursors, and upstream load does not grow with the worker count.
+    Followers retry the lease on every refresh interval and take over when
+    the leader exits.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[str], XandeumPRPCClient],
+        networks: List[str],
+        directory: str,
+        refresh_interval: float = 30.0,
+        retain: int = 5,
+        cold_timeout: float = 30.0,
+        sync_interval: float = 1.0,
+    ):
+        super().__init__(client_factory, networks, refresh_interval=refresh_interval, retain=retain)
+        self.persistence = SnapshotPersistence(directory, max_age=float("inf"))
+        self.lease = LeaderLease(os.path.join(directory, "leader.lock"))
+        self.cold_timeout = cold_timeout
+        self.sync_interval = sync_interval
+        self._seen: Dict[str, Tuple[int, int, int]] = {}
+        self._sync_locks: Dict[str, asyncio.Lock] = {network: asyncio.Lock() for network in self.networks}
+
+    @property
+    def is_leader(self) -> bool:
+        return self.lease.held
+
+    async def start(self):
+        await super().start()
+        for network in self.networks:
+            self._loops.append(asyncio.create_task(self._sync_loop(network)))
+
+    async def stop(self):
+        await super().stop()
+        self.lease.release()
+
+    async def get(self, network: str) -> Snapshot:
+        """The current shared snapshot; only a cold start waits (for the leader's first file)"""
+        if network not in self._locks:
+            raise UnknownNetworkError(network)
+        snapshot = self._snapshots.get(network)
+        deadline = time.monotonic() + self.cold_timeout
+        while snapshot is None:
+            if self.lease.try_acquire():
+                return await self.refresh(network)
+            snapshot = await self._sync(network)
+            if snapshot is None:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"no shared snapshot for {network} after {self.cold_timeout}s")
+                await asyncio.sleep(0.05)
+        return snapshot
+
+    async def refresh(self, network: str) -> Optional[Snapshot]:
+        """Leader: fetch, write and publish a new version. Follower: pick up the latest file."""
+        if not self.lease.try_acquire():
+            return await self._sync(network)
+        lock = self._locks[network]
+        previous = self._snapshots.get(network)
+        async with lock:
+            current = await self._sync(network)
+            if current is not None and current is not previous and current.age_seconds < self.refresh_interval:
+                # A previous lease holder wrote a fresh version moments ago
+                return current
+
+            started = time.perf_counter()
+            client = self.client_factory(network)
+            try:
+                pnodes, network_info = await client.fetch_snapshot()
+            except Exception:
+                SNAPSHOT_REFRESH_FAILURES.inc(network)
+                raise
+            snapshot = Snapshot(
+                network=network,
+                version=self._versions[network] + 1,
+                pnodes=pnodes,
+                network_info=network_info,
+                store=await asyncio.to_thread(PNodeStore, pnodes),
+                fetch_duration_ms=(time.perf_counter() - started) * 1000,
+            )
+            await asyncio.to_thread(self._write, snapshot, current)
+            # Publish what was just written rather than reading it back
+            self._seen[network] = self._file_key(network)
+            self._versions[network] = snapshot.version
+            self._publish(snapshot)
+            SNAPSHOT_REFRESH.observe(network, value=snapshot.fetch_duration_ms / 1000)
+            logger.info(
+                f"Shared snapshot v{snapshot.version} for {network}: {len(pnodes)} pNodes "
+                f"in {snapshot.fetch_duration_ms:.1f}ms"
+            )
+            return snapshot
+
+    def _write(self, snapshot: Snapshot, previous: Optional[Snapshot]):
+        """Worker thread: write the shared file, then prepare ``snapshot`` for publishing"""
+        snapshot.store.sorted_rows("stake", descending=True)
+        self.persistence.write(snapshot, snapshot.store.sort_orders())
+        self._prepare(snapshot, previous)
+
+    def _file_key(self, network: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.persistence.path(network))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    async def _sync(self, network: str) -> Optional[Snapshot]:
+        """Publish the file's snapshot if it changed since the last look"""
+        async with self._sync_locks[network]:
+            key = self._file_key(network)
+            if key is None or key == self._seen.get(network):
+                return self._snapshots.get(network)
+            path = self.persistence.path(network)
+            try:
+                snapshot = await asyncio.to_thread(_read_shared, path)
+            except Exception as e:
+                logger.warning(f"Could not read shared snapshot {path}: {e}")
+                return self._snapshots.get(network)
+            self._seen[network] = key
+            current = self._snapshots.get(network)
+            if current is not None and snapshot.version <= current.version:
+                return current
+            await asyncio.to_thread(self._prepare, snapshot, current)
+            if self._snapshots.get(network) is not current:
+                return self._snapshots[network]  # the leader published while this was prepared
+            self._versions[network] = snapshot.version
+            self._publish(snapshot)
+            return snapshot
+
+    async def _sync_loop(self, network: str):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            if self.is_leader:
+                continue  # publishes its own versions
+            try:
+                await self._sync(network)
+            except Exception as e:
+                logger.error(f"Shared snapshot sync failed for {network}: {e}")
+
+    def status(self) -> Dict[str, Dict]:
+        return {network: {**status, "leader": self.is_leader} for network, status in super().status().items()}
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Upper bounds of the "callers served per upstream call" histogram
+CALLER_BUCKETS = (1, 2, 5, 10, 50, 100, 500, 1000)
+
+
+@dataclass
+class SingleFlightStats:
+    executions: int = 0  # upstream calls actually made
+    callers: int = 0  # callers served (executions + coalesced)
+    coalesced: int = 0  # callers that joined an in-flight call
+    max_callers: int = 0
+    callers_histogram: Dict[str, int] = field(
+        default_factory=lambda: {f"le_{b}": 0 for b in CALLER_BUCKETS} | {"le_inf": 0}
+    )
+
+    def record(self, callers: int):
+        self.max_callers = max(self.max_callers, callers)
+        for bound in CALLER_BUCKETS:
+            if callers <= bound:
+                self.callers_histogram[f"le_{bound}"] += 1
+                return
+        self.callers_histogram["le_inf"] += 1
+
+    def to_dict(self) -> Dict:
+        return {
+            "executions": self.executions,
+            "callers": self.callers,
+            "coalesced": self.coalesced,
+            "avg_callers_per_call": round(self.callers / self.executions, 2) if self.executions else 0,
+            "max_callers_per_call": self.max_callers,
+            "callers_histogram": dict(self.callers_histogram),
+        }
+
+
+@dataclass
+class _Call:
+    task: asyncio.Task
+    callers: int = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one in-flight coroutine.
+
+    The coroutine runs as its own task, so a caller being cancelled (client
+    disconnect) never cancels the upstream call other callers are waiting on.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, _Call] = {}
+        self.stats = SingleFlightStats()
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._inflight.get(key)
+        if call is None:
+            call = _Call(task=asyncio.ensure_future(fn()))
+            self._inflight[key] = call
+            call.task.add_done_callback(lambda _, key=key, call=call: self._finish(key, call))
+            self.stats.executions += 1
+        else:
+            self.stats.coalesced += 1
+        call.callers += 1
+        self.stats.callers += 1
+        return await asyncio.shield(call.task)
+
+    def _finish(self, key: Hashable, call: _Call):
+        if self._inflight.get(key) is call:
+            del self._inflight[key]
+        self.stats.record(call.callers)
+        if not call.task.cancelled() and call.task.exception() is not None:
+            logger.debug(f"Single-flight call {key} failed for {call.callers} callers")
@@ -0,0 +1,286 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional
+
+from app.services.metrics import SNAPSHOT_REFRESH, SNAPSHOT_REFRESH_FAILURES
+from app.services.pnode_record import PNode
+from app.services.pnode_store import PNodeStore
+from app.services.snapshot_diff import SnapshotDiff, diff_stores
+from app.services.xandeum_client import XandeumPRPCClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Snapshot:
+    """One consistent view of a network, shared by every endpoint"""
+    network: str
+    version: int
+    pnodes: List[PNode]
+    network_info: Dict
+    store: PNodeStore
+    fetched_at: datetime = field(default_factory=datetime.utcnow)
+    fetch_duration_ms: float = 0.0
+    created_monotonic: float = field(default_factory=time.monotonic)
+    # Changes from the previous version (None for the first snapshot)
+    diff: Optional[SnapshotDiff] = None
+    # Diffs from older retained versions, computed on demand
+    diffs_since: Dict[int, SnapshotDiff] = field(default_factory=dict)
+    # Loaded from disk after a restart rather than fetched by this process
+    restored: bool = False
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.created_monotonic
+
+    @property
+    def is_real_data(self) -> bool:
+        return bool(self.network_info.get("is_real_data", False))
+
+
+class UnknownNetworkError(KeyError):
+    pass
+
+
+@dataclass
+class FanOut:
+    """Snapshots of several networks; networks that failed or timed out are in ``errors``"""
+    snapshots: Dict[str, Snapshot]
+    errors: Dict[str, str]
+    elapsed_ms: float = 0.0
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.errors)
+
+
+class SnapshotCache:
+    """Per-network snapshot cache refreshed in the background.
+
+    Requests never wait on upstream once a snapshot exists: if the current
+    snapshot is older than the refresh interval it is served as-is and a
+    revalidation is started in the background (stale-while-revalidate).
+    Building a snapshot (store, diff and the listeners' ``prepare`` work)
+    happens on a worker thread; only the swap runs on the event loop.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[str], XandeumPRPCClient],
+        networks: List[str],
+        refresh_interval: float = 30.0,
+        retain: int = 5,
+        restore: Optional[Callable[[str], Optional[Snapshot]]] = None,
+    ):
+        self.client_factory = client_factory
+        # Loads a persisted snapshot (blocking) for a network with nothing in memory yet
+        self.restore = restore
+        self.networks = list(networks)
+        self.refresh_interval = refresh_interval
+        self._snapshots: Dict[str, Snapshot] = {}
+        # Recent snapshots kept so cursors can keep paging the version they started on
+        self._history: Dict[str, Deque[Snapshot]] = {network: deque(maxlen=retain) for network in self.networks}
+        self._versions: Dict[str, int] = {network: 0 for network in self.networks}
+        self._locks: Dict[str, asyncio.Lock] = {network: asyncio.Lock() for network in self.networks}
+        self._revalidating: Dict[str, asyncio.Task] = {}
+        self._loops: List[asyncio.Task] = []
+        self._listeners: List[Callable[[Snapshot], None]] = []
+        self._preparers: List[Callable[[Snapshot], None]] = []
+
+    def add_listener(self, listener: Callable[[Snapshot], None], prepare: Optional[Callable[[Snapshot], None]] = None):
+        """Call ``listener(snapshot)`` on the event loop after every new snapshot is published.
+
+        ``prepare(snapshot)``, if given, runs first on a worker thread while
+        the previous snapshot is still being served. It is the place for
+        heavy work, which must build new state rather than change what
+        requests are reading; ``listener`` then swaps it in.
+        """
+        self._listeners.append(listener)
+        if prepare is not None:
+            self._preparers.append(prepare)
+
+    async def start(self):
+        """Restore persisted snapshots, then start one refresh loop per network
+        (does not wait for the first fetch)"""
+        if self.restore is not None:
+            await asyncio.gather(*(self._restore(network) for network in self.networks))
+        for network in self.networks:
+            self._loops.append(asyncio.create_task(self._refresh_loop(network)))
+        logger.info(f"Snapshot refresher started for {self.networks} every {self.refresh_interval}s")
+
+    async def stop(self):
+        tasks = self._loops + list(self._revalidating.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loops = []
+        self._revalidating = {}
+
+    async def get(self, network: str) -> Snapshot:
+        """Return the current snapshot, only waiting on upstream on a cold cache"""
+        if network not in self._locks:
+            raise UnknownNetworkError(network)
+
+        snapshot = self._snapshots.get(network)
+        if snapshot is None:
+            return await self.refresh(network)
+
+        if snapshot.age_seconds > self.refresh_interval:
+            self._revalidate(network)
+        return snapshot
+
+    async def get_many(self, networks: List[str], timeout: float) -> FanOut:
+        """Current snapshots of ``networks``, fetched concurrently.
+
+        Each network gets ``timeout`` seconds, so the whole call takes as long
+        as the slowest network (capped at ``timeout``) rather than the sum. A
+        cold fetch that times out keeps running in the background and is
+        served on the next call.
+        """
+        started = time.perf_counter()
+
+        async def one(network: str) -> Snapshot:
+            return await asyncio.wait_for(asyncio.shield(self.get(network)), timeout)
+
+        results = await asyncio.gather(*(one(network) for network in networks), return_exceptions=True)
+        fan_out = FanOut(snapshots={}, errors={})
+        for network, result in zip(networks, results):
+            if isinstance(result, Snapshot):
+                fan_out.snapshots[network] = result
+            elif isinstance(result, asyncio.TimeoutError):
+                fan_out.errors[network] = f"timed out after {timeout}s"
+            elif isinstance(result, UnknownNetworkError):
+                fan_out.errors[network] = "unknown network"
+            else:
+                fan_out.errors[network] = str(result) or type(result).__name__
+        fan_out.elapsed_ms = (time.perf_counter() - started) * 1000
+        return fan_out
+
+    async def _restore(self, network: str):
+        """Serve the snapshot persisted by the previous process until the first fetch lands.
+        Decoding the file runs on a worker thread."""
+        snapshot = await asyncio.to_thread(self.restore, network)
+        if snapshot is None or network in self._snapshots:
+            return
+        self._snapshots[network] = snapshot
+        self._history[network].append(snapshot)
+        # Keep numbering after the restored version so its ETags and cursors stay valid
+        self._versions[network] = max(self._versions[network], snapshot.version)
+
+    def status(self) -> Dict[str, Dict]:
+        """Version, age and origin of each network's current snapshot"""
+        return {
+            network: {
+                "version": snapshot.version,
+                "age_seconds": round(snapshot.age_seconds, 3),
+                "pnodes": len(snapshot.store),
+                "restored": snapshot.restored,
+            }
+            for network, snapshot in self._snapshots.items()
+        }
+
+    def peek(self, network: str) -> Optional[Snapshot]:
+        return self._snapshots.get(network)
+
+    def changes_since(self, network: str, since: int) -> Optional[SnapshotDiff]:
+        """Diff from version ``since`` to the current snapshot, or None if that
+        version is no longer retained (the caller must resync)"""
+        current = self._snapshots.get(network)
+        if current is None or since > current.version:
+            return None
+        if since == current.version:
+            return SnapshotDiff(from_version=since, to_version=since)
+        if current.diff is not None and current.diff.from_version == since:
+            return current.diff
+        if since not in current.diffs_since:
+            old = self.get_version(network, since)
+            if old is None:
+                return None
+            current.diffs_since[since] = diff_stores(old.store, current.store, since, current.version)
+        return current.diffs_since[since]
+
+    def get_version(self, network: str, version: int) -> Optional[Snapshot]:
+        """A specific recent snapshot, or None once it has been evicted"""
+        for snapshot in self._history.get(network, ()):
+            if snapshot.version == version:
+                return snapshot
+        return None
+
+    async def refresh(self, network: str) -> Snapshot:
+        """Fetch a new snapshot; concurrent callers share a single fetch"""
+        lock = self._locks[network]
+        previous = self._snapshots.get(network)
+        async with lock:
+            current = self._snapshots.get(network)
+            if current is not None and current is not previous and not current.restored:
+                # Someone else refreshed while we were waiting on the lock
+                return current
+
+            started = time.perf_counter()
+            client = self.client_factory(network)
+            try:
+                pnodes, network_info = await client.fetch_snapshot()
+            except Exception:
+                SNAPSHOT_REFRESH_FAILURES.inc(network)
+                raise
+            self._versions[network] += 1
+            store = await asyncio.to_thread(PNodeStore, pnodes)
+            snapshot = Snapshot(
+                network=network,
+                version=self._versions[network],
+                pnodes=pnodes,
+                network_info=network_info,
+                store=store,
+                fetch_duration_ms=(time.perf_counter() - started) * 1000,
+            )
+            await asyncio.to_thread(self._prepare, snapshot, current)
+            self._publish(snapshot)
+            SNAPSHOT_REFRESH.observe(network, value=snapshot.fetch_duration_ms / 1000)
+            logger.info(
+                f"Snapshot v{snapshot.version} for {network}: {len(pnodes)} pNodes "
+                f"in {snapshot.fetch_duration_ms:.1f}ms"
+            )
+            return snapshot
+
+    def _prepare(self, snapshot: Snapshot, previous: Optional[Snapshot]):
+        """Worker thread: diff against ``previous`` and run the listeners' prepare hooks"""
+        if previous is not None:
+            snapshot.diff = diff_stores(previous.store, snapshot.store, previous.version, snapshot.version)
+        for prepare in self._preparers:
+            try:
+                prepare(snapshot)
+            except Exception as e:
+                logger.error(f"Snapshot prepare hook {prepare!r} failed for {snapshot.network}: {e}")
+
+    def _publish(self, snapshot: Snapshot):
+        """Make ``snapshot`` current for its network and notify listeners"""
+        self._snapshots[snapshot.network] = snapshot
+        self._history[snapshot.network].append(snapshot)
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                logger.error(f"Snapshot listener {listener!r} failed for {snapshot.network}: {e}")
+
+    def _revalidate(self, network: str):
+        task = self._revalidating.get(network)
+        if task is None or task.done():
+            self._revalidating[network] = asyncio.create_task(self._safe_refresh(network))
+
+    async def _safe_refresh(self, network: str):
+        try:
+            await self.refresh(network)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Keep serving the previous snapshot
+            logger.error(f"Snapshot refresh failed for {network}: {e}")
+
+    async def _refresh_loop(self, network: str):
+        while True:
+            await self._safe_refresh(network)
+            await asyncio.sleep(self.refresh_interval)
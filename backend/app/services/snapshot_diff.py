@@ -0,0 +1,83 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from app.services.pnode_store import PNodeStore
+
+# Refreshed on every fetch, so comparing them would mark every node as changed
+IGNORED_FIELDS = ("last_seen",)
+
+# State derived from snapshots (leaderboards, group tables) is rebuilt rather
+# than moved along a diff touching more than this fraction of the fleet:
+# moving each node costs several times its share of a rebuild, and the
+# rebuild runs on the snapshot cache's worker thread instead of the event loop
+REBUILD_FRACTION = 0.05
+
+
+@dataclass
+class ChangedPNode:
+    pubkey: str
+    changed_fields: List[str]
+    pnode: Dict
+
+
+@dataclass
+class SnapshotDiff:
+    """Nodes added, removed or changed between two snapshot versions"""
+    from_version: int
+    to_version: int
+    added: List[Dict] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[ChangedPNode] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    @property
+    def touched(self) -> int:
+        """Number of nodes added, removed or changed"""
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    def to_dict(self) -> Dict:
+        return {
+            "added": self.added,
+            "removed": self.removed,
+            "changed": [
+                {"pubkey": c.pubkey, "changed_fields": c.changed_fields, "pnode": c.pnode}
+                for c in self.changed
+            ],
+        }
+
+
+def diff_applies(diff: Optional[SnapshotDiff], version: Optional[int], size: int) -> bool:
+    """Whether state at ``version`` should follow ``diff`` (over a fleet of
+    ``size`` nodes) instead of being rebuilt"""
+    return (
+        diff is not None and version is not None and version == diff.from_version
+        and diff.touched <= REBUILD_FRACTION * size
+    )
+
+
+def diff_stores(old: PNodeStore, new: PNodeStore, from_version: int, to_version: int) -> SnapshotDiff:
+    diff = SnapshotDiff(from_version=from_version, to_version=to_version)
+    old_rows = old.row_by_pubkey
+    new_rows = new.row_by_pubkey
+
+    for pubkey, row in new_rows.items():
+        pnode = new.pnodes[row]
+        old_row = old_rows.get(pubkey)
+        if old_row is None:
+            diff.added.append(pnode)
+            continue
+        previous = old.pnodes[old_row]
+        if previous == pnode:
+            continue
+        changed_fields = [
+            key for key in set(pnode.keys()) | set(previous.keys())
+            if key not in IGNORED_FIELDS and pnode.get(key) != previous.get(key)
+        ]
+        if changed_fields:
+            diff.changed.append(ChangedPNode(pubkey, sorted(changed_fields), pnode))
+
+    diff.removed = [pubkey for pubkey in old_rows if pubkey not in new_rows]
+    return diff
@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import typing
+from dataclasses import fields
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import orjson
+
+from app.services.pnode_record import INTERNED_FIELDS, PNODE_FIELDS, PNode
+from app.services.pnode_store import PNodeStore
+from app.services.snapshot_cache import Snapshot
+
+logger = logging.getLogger(__name__)
+
+# File layout: MAGIC, format version, header length, JSON header, then one
+# 8-byte aligned blob per column / sort order. Numeric columns are raw
+# little-endian arrays, repeated strings are dictionary-encoded int32 codes,
+# free-form strings one JSON array each. PNodeStore's typed columns and sort
+# orders are stored as-is so a reader can map them without copying.
+MAGIC = b"XPNS"
+FORMAT_VERSION = 2
+_PREAMBLE = struct.Struct("<4sHI")
+
+_DTYPES = {bool: "<u1", int: "<i8", float: "<f8"}
+
+# PNodeStore columns written verbatim
+STORE_COLUMNS = ("stake", "commission", "performance_score", "uptime_24h", "response_time_ms", "peer_count", "is_active")
+
+
+def _column_kinds() -> Dict[str, Tuple[str, bool]]:
+    """field -> (kind, nullable) derived from the PNode annotations"""
+    kinds = {}
+    for f in fields(PNode):
+        args = typing.get_args(f.type)
+        nullable = type(None) in args
+        base = next(arg for arg in args if arg is not type(None)) if nullable else f.type
+        if base is str:
+            kinds[f.name] = ("category" if f.name in INTERNED_FIELDS else "text", nullable)
+        else:
+            kinds[f.name] = (_DTYPES[base], nullable)
+    return kinds
+
+
+_COLUMN_KINDS = _column_kinds()
+
+
+def _pad(blob: bytes) -> bytes:
+    return blob + b"\0" * (-len(blob) % 8)
+
+
+def encode_snapshot(snapshot: Snapshot, orders: Dict[Tuple[str, bool], np.ndarray]) -> bytes:
+    """Columnar binary encoding of a snapshot and the sort orders built for it"""
+    pnodes = snapshot.pnodes
+    blobs: List[bytes] = []
+    offset = 0
+
+    def add(blob: bytes) -> Dict:
+        nonlocal offset
+        entry = {"offset": offset, "size": len(blob)}
+        blob = _pad(blob)
+        blobs.append(blob)
+        offset += len(blob)
+        return entry
+
+    columns = []
+    for name, (kind, nullable) in _COLUMN_KINDS.items():
+        values = [p.get(name) for p in pnodes]
+        column = {"name": name, "kind": kind}
+        if kind == "text":
+            column["data"] = add(orjson.dumps(values))
+        elif kind == "category":
+            categories = list(dict.fromkeys(values))
+            lookup = {value: code for code, value in enumerate(categories)}
+            column["categories"] = categories
+            column["data"] = add(np.fromiter((lookup[v] for v in values), dtype="<i4", count=len(values)).tobytes())
+        else:
+            if nullable:
+                mask = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+                column["mask"] = add(mask.tobytes())
+                values = [0 if v is None else v for v in values]
+            column["data"] = add(np.array(values, dtype=kind).tobytes())
+        columns.append(column)
+
+    header = {
+        "network": snapshot.network,
+        "version": snapshot.version,
+        "fetched_at": snapshot.fetched_at.replace(tzinfo=timezone.utc).timestamp(),
+        "fetch_duration_ms": snapshot.fetch_duration_ms,
+        "network_info": snapshot.network_info,
+        "count": len(pnodes),
+        "columns": columns,
+        "store_columns": {
+            name: {"dtype": getattr(snapshot.store, name).dtype.str, **add(getattr(snapshot.store, name).tobytes())}
+            for name in STORE_COLUMNS
+        },
+        "orders": [
+            {"column": name, "descending": descending, "data": add(order.astype("<i8").tobytes())}
+            for (name, descending), order in orders.items()
+        ],
+    }
+    encoded_header = orjson.dumps(header)
+    preamble = _PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(encoded_header))
+    return _pad(preamble + encoded_header) + b"".join(blobs)
+
+
+def read_header(data: bytes) -> Tuple[Dict, int]:
+    """(header, offset of the first blob); ValueError if this is not a snapshot file"""
+    if len(data) < _PREAMBLE.size:
+        raise ValueError("truncated snapshot file")
+    magic, version, length = _PREAMBLE.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"not a format {FORMAT_VERSION} snapshot file")
+    end = _PREAMBLE.size + length
+    header = orjson.loads(data[_PREAMBLE.size:end])
+    return header, end + (-end % 8)
+
+
+def map_file(path: str) -> mmap.mmap:
+    """Read-only mapping of a snapshot file; decode_snapshot's arrays stay views into it"""
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def decode_snapshot(data, restored: bool = True) -> Snapshot:
+    """Inverse of encode_snapshot, from bytes or a map_file mapping.
+
+    PNodeStore columns and sort orders are read-only views of ``data``;
+    only the per-node records are materialized.
+    """
+    header, start = read_header(data)
+    count = header["count"]
+    if [column["name"] for column in header["columns"]] != list(PNODE_FIELDS):
+        raise ValueError("snapshot file was written for a different pNode schema")
+
+    def array(entry: Dict, dtype: str) -> np.ndarray:
+        return np.frombuffer(data, dtype=dtype, count=count, offset=start + entry["offset"])
+
+    columns = []
+    for column in header["columns"]:
+        kind = column["kind"]
+        if kind == "text":
+            begin = start + column["data"]["offset"]
+            values = orjson.loads(data[begin:begin + column["data"]["size"]])
+        elif kind == "category":
+            categories = column["categories"]
+            values = [categories[code] for code in array(column["data"], "<i4").tolist()]
+        else:
+            values = array(column["data"], kind).tolist()
+            if kind == "<u1":
+                values = [bool(v) for v in values]
+            if "mask" in column:
+                mask = array(column["mask"], "?").tolist()
+                values = [None if missing else v for v, missing in zip(values, mask)]
+        columns.append(values)
+
+    pnodes = [PNode(*row) for row in zip(*columns)]
+    store = PNodeStore(pnodes, columns={
+        name: array(entry, entry["dtype"]) for name, entry in header["store_columns"].items()
+    })
+    store.seed_sort_orders({
+        (order["column"], order["descending"]): array(order["data"], "<i8")
+        for order in header["orders"]
+    })
+    age = max(0.0, time.time() - header["fetched_at"])
+    return Snapshot(
+        network=header["network"],
+        version=header["version"],
+        pnodes=pnodes,
+        network_info=header["network_info"],
+        store=store,
+        fetched_at=datetime.fromtimestamp(header["fetched_at"], timezone.utc).replace(tzinfo=None),
+        fetch_duration_ms=header["fetch_duration_ms"],
+        created_monotonic=time.monotonic() - age,
+        restored=restored,
+    )
+
+
+class SnapshotPersistence:
+    """Latest snapshot of each network on disk, for a warm start after a restart.
+
+    Register ``record`` as a SnapshotCache listener and pass ``load`` as its
+    ``restore``. Every new snapshot is encoded off the event loop and written
+    to a temp file that atomically replaces ``<network>.snapshot``, so a crash
+    mid-write leaves the previous file intact. Files older than ``max_age``
+    seconds are ignored.
+    """
+
+    def __init__(self, directory: str, max_age: float = 86400):
+        self.directory = directory
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._saved: Dict[str, int] = {}
+        self._writes: set = set()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, network: str) -> str:
+        return os.path.join(self.directory, f"{network}.snapshot")
+
+    def record(self, snapshot: Snapshot):
+        if snapshot.restored:
+            return
+        task = asyncio.get_running_loop().create_task(asyncio.to_thread(self._persist, snapshot))
+        self._writes.add(task)
+        task.add_done_callback(self._write_done)
+
+    def _persist(self, snapshot: Snapshot):
+        # The default listing order is almost always needed; persist it with the rest
+        snapshot.store.sorted_rows("stake", descending=True)
+        self.write(snapshot, snapshot.store.sort_orders())
+
+    def _write_done(self, task: asyncio.Task):
+        self._writes.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Failed to persist snapshot: {task.exception()}")
+
+    def write(self, snapshot: Snapshot, orders: Dict[Tuple[str, bool], np.ndarray]):
+        """Encode and atomically replace the network's file (blocking)"""
+        data = encode_snapshot(snapshot, orders)
+        path = self.path(snapshot.network)
+        with self._lock:
+            if self._saved.get(snapshot.network, 0) >= snapshot.version:
+                return  # a newer version finished first
+            temp = f"{path}.tmp"
+            with open(temp, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp, path)
+            self._saved[snapshot.network] = snapshot.version
+
+    def load(self, network: str) -> Optional[Snapshot]:
+        """The persisted snapshot of ``network``, or None if missing, stale or unreadable"""
+        path = self.path(network)
+        if not os.path.exists(path):
+            return None
+        started = time.perf_counter()
+        try:
+            data = map_file(path)
+            header, _ = read_header(data)
+            age = time.time() - header["fetched_at"]
+            if header["network"] != network or age > self.max_age:
+                logger.info(f"Ignoring persisted snapshot for {network} ({age:.0f}s old)")
+                return None
+            snapshot = decode_snapshot(data)
+        except Exception as e:
+            logger.warning(f"Could not restore snapshot for {network} from {path}: {e}")
+            return None
+        logger.info(
+            f"Restored {network} snapshot v{snapshot.version} ({len(snapshot.pnodes)} pNodes, "
+            f"{snapshot.age_seconds:.0f}s old) in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return snapshot
+
+    async def close(self):
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
@@ -0,0 +1,265 @@
+import hashlib
+from datetime import datetime, timedelta
+from functools import cached_property
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from app.services.pnode_record import PNode
+
+VERSIONS = np.array(["1.2.0", "1.1.5", "1.1.4", "1.1.3", "1.1.2"], dtype=object)
+VERSION_WEIGHTS = [0.6, 0.2, 0.1, 0.05, 0.05]
+
+PROVIDERS = ["AWS", "Google Cloud", "Microsoft Azure", "DigitalOcean", "Hetzner", "OVH"]
+REGIONS = ["us-east-1", "us-west-2", "eu-west-1", "asia-southeast-1", "eu-central-1"]
+DATA_CENTERS = np.array([f"{p} {r}" for p in PROVIDERS for r in REGIONS], dtype=object)
+
+# ASCII-only locations to avoid encoding issues
+LOCATIONS = np.array([
+    "New York, USA", "London, UK", "Singapore", "Tokyo, Japan",
+    "Frankfurt, Germany", "Sydney, Australia", "Sao Paulo, Brazil",
+    "Mumbai, India", "Paris, France", "Toronto, Canada",
+], dtype=object)
+
+# Node tiers: share of the fleet, then typical performance, uptime, stake, commission
+TIERS = np.array([
+    (5 / 30, 0.95, 99.9, 5_000_000, 1.5),
+    (10 / 30, 0.85, 98.5, 2_000_000, 3.0),
+    (10 / 30, 0.75, 95.0, 1_000_000, 5.0),
+    (5 / 30, 0.60, 88.0, 500_000, 8.0),
+])
+
+SLOTS_PER_EPOCH = 432_000
+MAX_LAST_SEEN_SECONDS = 300
+
+_HEX = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+
+def stable_seed(*parts: str) -> int:
+    """Seed derived from strings, identical across processes (unlike hash())"""
+    return int.from_bytes(hashlib.sha256("\0".join(parts).encode()).digest()[:8], "little")
+
+
+class SyntheticFleet:
+    """Deterministic synthetic pNode fleet of any size.
+
+    Randomness comes only from the fleet's own NumPy Generator, never the
+    global ``random`` module, so the same (network, seed) replays the same
+    fleet tick by tick and concurrent users cannot disturb each other. Nodes
+    keep their pubkey across ticks: ``tick`` drifts their metrics, flips the
+    activity of ``flap_rate`` of them and replaces ``churn_rate`` of the
+    fleet with new nodes. State is held as NumPy columns, so a tick over
+    100k nodes is a handful of vector operations.
+    """
+
+    def __init__(
+        self,
+        network: str = "demo",
+        size: int = 30,
+        seed: int = 0,
+        churn_rate: float = 0.0,
+        drift: float = 0.01,
+        flap_rate: float = 0.02,
+    ):
+        self.network = network
+        self.size = size
+        self.seed = seed
+        self.churn_rate = churn_rate
+        self.drift = drift
+        self.flap_rate = flap_rate
+        self.rng = np.random.default_rng([stable_seed(network), seed])
+        self.ticks = 0
+        self.slot = 1_500_000
+        self.columns = self._new_nodes(size)
+
+    def _new_nodes(self, count: int) -> Dict[str, np.ndarray]:
+        rng = self.rng
+        tier = TIERS[rng.choice(len(TIERS), size=count, p=TIERS[:, 0])]
+        hex_digits = np.ascontiguousarray(_HEX[rng.integers(0, 16, (count, 44))])
+        suffixes = hex_digits.view("S44").ravel().astype(str)
+        octets = np.column_stack([
+            rng.integers(10, 201, count),
+            rng.integers(0, 256, count),
+            rng.integers(0, 256, count),
+            rng.integers(1, 255, count),
+        ]).tolist()
+        is_active = rng.random(count) > 0.1  # 90% active
+        return {
+            "pubkey": np.array([f"xnd_{self.network[:3]}_{s}" for s in suffixes], dtype=object),
+            "ip": np.array([f"{a}.{b}.{c}.{d}" for a, b, c, d in octets], dtype=object),
+            "version": rng.choice(len(VERSIONS), size=count, p=VERSION_WEIGHTS),
+            "data_center": rng.integers(0, len(DATA_CENTERS), count),
+            "location": rng.integers(0, len(LOCATIONS), count),
+            "stake": (tier[:, 3] + rng.integers(-100_000, 100_001, count)).astype(np.int64),
+            "commission": tier[:, 4] + rng.uniform(-0.5, 0.5, count),
+            "performance_score": tier[:, 1] + rng.uniform(-0.05, 0.05, count),
+            "uptime_24h": np.minimum(tier[:, 2] + rng.uniform(-1, 1, count), 100.0),
+            "vote_success_rate": 98.5 + rng.uniform(-2, 1, count),
+            "response_time_ms": rng.integers(80, 251, count).astype(np.float64),
+            "peer_count": rng.integers(30, 121, count),
+            "is_active": is_active,
+            "epoch_credits": np.where(is_active, rng.integers(1000, 10_001, count), 0),
+            "last_seen_offset": rng.integers(0, MAX_LAST_SEEN_SECONDS + 1, count),
+        }
+
+    def tick(self):
+        """Advance one refresh: drift metrics, flap activity, churn identities"""
+        rng, columns, n, drift = self.rng, self.columns, self.size, self.drift
+        self.ticks += 1
+        self.slot += int(rng.integers(60, 90))
+
+        columns["performance_score"] = np.clip(columns["performance_score"] + rng.normal(0, drift, n), 0.0, 1.0)
+        columns["uptime_24h"] = np.clip(columns["uptime_24h"] + rng.normal(0, 10 * drift, n), 0.0, 100.0)
+        columns["vote_success_rate"] = np.clip(columns["vote_success_rate"] + rng.normal(0, 10 * drift, n), 0.0, 100.0)
+        columns["response_time_ms"] = np.clip(columns["response_time_ms"] * np.exp(rng.normal(0, 5 * drift, n)), 10.0, 5000.0)
+        columns["peer_count"] = np.clip(columns["peer_count"] + rng.integers(-2, 3, n), 0, 500)
+        columns["stake"] = np.maximum(columns["stake"] + (columns["stake"] * rng.normal(0, drift / 10, n)).astype(np.int64), 0)
+        columns["is_active"] ^= rng.random(n) < self.flap_rate
+        columns["epoch_credits"] += np.where(columns["is_active"], rng.integers(10, 50, n), 0)
+        columns["last_seen_offset"] = rng.integers(0, MAX_LAST_SEEN_SECONDS + 1, n)
+
+        churned = rng.binomial(n, self.churn_rate) if self.churn_rate else 0
+        if churned:
+            rows = rng.choice(n, size=churned, replace=False)
+            for name, values in self._new_nodes(churned).items():
+                columns[name][rows] = values
+        self.__dict__.pop("row_by_pubkey", None)
+
+    @cached_property
+    def row_by_pubkey(self) -> Dict[str, int]:
+        return {pubkey: row for row, pubkey in enumerate(self.columns["pubkey"])}
+
+    def batches(self, batch_size: int = 10_000, now: Optional[datetime] = None) -> Iterator[List[PNode]]:
+        """Current fleet as PNode records, highest stake first, ``batch_size`` at a time"""
+        now = now or datetime.utcnow()
+        columns = self.columns
+        last_seen = [(now - timedelta(seconds=s)).isoformat() for s in range(MAX_LAST_SEEN_SECONDS + 1)]
+        order = np.argsort(-columns["stake"], kind="stable")
+
+        for start in range(0, self.size, batch_size):
+            rows = order[start:start + batch_size]
+            active = columns["is_active"][rows]
+            batch = zip(
+                columns["pubkey"][rows].tolist(),
+                columns["ip"][rows].tolist(),
+                VERSIONS[columns["version"][rows]].tolist(),
+                active.tolist(),
+                columns["last_seen_offset"][rows].tolist(),
+                columns["stake"][rows].tolist(),
+                columns["commission"][rows].tolist(),
+                DATA_CENTERS[columns["data_center"][rows]].tolist(),
+                columns["performance_score"][rows].tolist(),
+                columns["uptime_24h"][rows].tolist(),
+                columns["vote_success_rate"][rows].tolist(),
+                columns["response_time_ms"][rows].round().tolist(),
+                columns["peer_count"][rows].tolist(),
+                LOCATIONS[columns["location"][rows]].tolist(),
+                np.where(active, self.slot - (rows % 32), 0).tolist(),
+                columns["epoch_credits"][rows].tolist(),
+            )
+            yield [
+                PNode(
+                    pubkey=pubkey,
+                    ip=ip,
+                    version=version,
+                    is_active=is_active,
+                    last_seen=last_seen[offset],
+                    stake=stake,
+                    commission=commission,
+                    data_center=data_center,
+                    performance_score=performance,
+                    uptime_24h=uptime,
+                    vote_success_rate=vote_success,
+                    response_time_ms=response_time,
+                    peer_count=peer_count,
+                    network=self.network,
+                    is_real_data=False,
+                    status="active" if is_active else "inactive",
+                    location=location,
+                    last_vote=last_vote,
+                    epoch_credits=credits,
+                )
+                for (pubkey, ip, version, is_active, offset, stake, commission, data_center, performance,
+                     uptime, vote_success, response_time, peer_count, location, last_vote, credits) in batch
+            ]
+
+    def pnodes(self, now: Optional[datetime] = None) -> List[PNode]:
+        return [pnode for batch in self.batches(now=now) for pnode in batch]
+
+    def network_info(self) -> Dict:
+        columns = self.columns
+        active = columns["is_active"]
+        versions = np.bincount(columns["version"], minlength=len(VERSIONS))
+        return {
+            "epoch": 200 + self.slot // SLOTS_PER_EPOCH,
+            "slot": self.slot,
+            "absolute_slot": self.slot,
+            "block_height": self.slot - 1000,
+            "transaction_count": self.slot * 7,
+            "current_validators": int(active.sum()),
+            "total_active_stake": int(columns["stake"][active].sum()),
+            "average_commission": round(float(columns["commission"][active].mean()), 2) if active.any() else 0,
+            "network_version": VERSIONS[int(versions.argmax())],
+            "is_real_data": False,
+            "timestamp": datetime.utcnow().isoformat(),
+            "note": "Demo mode - Xandeum public RPC endpoints not available",
+        }
+
+    def details(self, pubkey: str) -> Dict:
+        """Detail view of one node: its live state when it is in the fleet,
+        otherwise stable values derived from the pubkey alone"""
+        rng = np.random.default_rng([stable_seed(self.network, pubkey), self.seed])
+        row = self.row_by_pubkey.get(pubkey)
+        if row is None:
+            is_active = "inactive" not in pubkey
+            current = {
+                "uptime_24h": round(rng.uniform(85.0, 99.9), 1),
+                "vote_success_rate": round(rng.uniform(95.0, 99.9), 1),
+                "response_time_ms": int(rng.integers(50, 301)),
+                "peer_count": int(rng.integers(20, 151)),
+                "total_stake": int(rng.integers(100_000, 10_000_001)),
+                "commission": round(rng.uniform(0.5, 10.0), 2),
+                "version": VERSIONS[rng.choice(len(VERSIONS), p=VERSION_WEIGHTS)],
+                "data_center": DATA_CENTERS[rng.integers(len(DATA_CENTERS))],
+                "location": LOCATIONS[rng.integers(len(LOCATIONS))],
+                "epoch_credits": int(rng.integers(1000, 10_001)) if is_active else 0,
+            }
+        else:
+            columns = self.columns
+            is_active = bool(columns["is_active"][row])
+            current = {
+                "uptime_24h": round(float(columns["uptime_24h"][row]), 1),
+                "vote_success_rate": round(float(columns["vote_success_rate"][row]), 1),
+                "response_time_ms": int(round(columns["response_time_ms"][row])),
+                "peer_count": int(columns["peer_count"][row]),
+                "total_stake": int(columns["stake"][row]),
+                "commission": round(float(columns["commission"][row]), 2),
+                "version": VERSIONS[columns["version"][row]],
+                "data_center": DATA_CENTERS[columns["data_center"][row]],
+                "location": LOCATIONS[columns["location"][row]],
+                "epoch_credits": int(columns["epoch_credits"][row]),
+            }
+
+        return {
+            "pubkey": pubkey,
+            "status": "active" if is_active else "inactive",
+            "uptime_24h": current["uptime_24h"],
+            "uptime_7d": round(rng.uniform(88.0, 99.5), 1),
+            "uptime_30d": round(rng.uniform(90.0, 99.0), 1),
+            "vote_success_rate": current["vote_success_rate"],
+            "response_time_ms": current["response_time_ms"],
+            "peer_count": current["peer_count"],
+            "total_stake": current["total_stake"],
+            "commission": current["commission"],
+            "last_updated": datetime.utcnow().isoformat(),
+            "version": current["version"],
+            "data_center": current["data_center"],
+            "location": current["location"],
+            "latency_ms": int(rng.integers(20, 201)),
+            "reliability_score": round(rng.uniform(0.7, 1.0), 3),
+            "epoch_credits": current["epoch_credits"],
+            "last_vote": self.slot if is_active else 0,
+            "root_slot": self.slot - 32 if is_active else 0,
+            "is_real_data": False,
+            "notes": "Demo data - Real Xandeum API endpoints not publicly available",
+        }
@@ -1,156 +1,273 @@
 ﻿import aiohttp
 import asyncio
-from typing import List, Dict, Optional
+from collections import Counter
+from typing import List, Dict, Optional, Sequence, Tuple, Union
 import logging
-from datetime import datetime, timedelta
-import random
-import string
+from datetime import datetime
+
+from app.services.endpoint_pool import EndpointPool, split_urls
+from app.services.pnode_record import PNode
+from app.services.single_flight import SingleFlight
+from app.services.synthetic_fleet import SyntheticFleet
 
 logger = logging.getLogger(__name__)
 
+# Methods fetched together, as one JSON-RPC batch, on every snapshot refresh
+SNAPSHOT_CALLS = [
+    ("getClusterNodes", []),
+    ("getVoteAccounts", []),
+    ("getEpochInfo", []),
+]
+
+
+def pnode_details(pnode: PNode) -> Dict:
+    """Details view of a real-data pNode record"""
+    return {
+        "pubkey": pnode.pubkey,
+        "status": pnode["status"],
+        "uptime_24h": pnode["uptime_24h"],
+        "vote_success_rate": pnode["vote_success_rate"],
+        "response_time_ms": pnode["response_time_ms"],
+        "peer_count": pnode["peer_count"],
+        "total_stake": pnode["stake"],
+        "commission": pnode["commission"],
+        "last_updated": pnode["last_seen"],
+        "version": pnode["version"],
+        "data_center": pnode["data_center"],
+        "location": pnode["location"],
+        "reliability_score": pnode["performance_score"],
+        "epoch_credits": pnode["epoch_credits"],
+        "last_vote": pnode["last_vote"],
+        "is_real_data": True,
+    }
+
+
+# Keys a details response can hold (demo details carry a few more than real ones)
+DETAIL_FIELDS = (
+    "pubkey", "status", "uptime_24h", "uptime_7d", "uptime_30d", "vote_success_rate", "response_time_ms",
+    "peer_count", "total_stake", "commission", "last_updated", "version", "data_center", "location",
+    "latency_ms", "reliability_score", "epoch_credits", "last_vote", "root_slot", "is_real_data", "notes",
+)
+
+
 class XandeumPRPCClient:
-    """Xandeum pRPC Client - Demo Mode
-    Note: Public Xandeum RPC endpoints are not available.
-    This simulates what the dashboard would look like with real data.
+    """Xandeum pRPC Client
+    Talks JSON-RPC 2.0 to ``rpc_url`` (or a pool of ``rpc_urls``, routed by
+    latency with failover and hedging) when one is configured. Without it
+    (public Xandeum RPC endpoints are not available yet) it runs in demo
+    mode and simulates what the dashboard would look like with real data.
     """
     
-    def __init__(self, network: str = "testnet"):
+    def __init__(
+        self,
+        network: str = "testnet",
+        rpc_url: Optional[str] = None,
+        connector: Optional[aiohttp.BaseConnector] = None,
+        trace_configs: Optional[List[aiohttp.TraceConfig]] = None,
+        fleet: Optional[SyntheticFleet] = None,
+        rpc_urls: Optional[Sequence[str]] = None,
+        pool_options: Optional[Dict] = None,
+    ):
         self.network = network
-        self.is_real_data = False  # Important flag
+        self.rpc_urls = split_urls(rpc_urls or rpc_url)
+        self.rpc_url = self.rpc_urls[0] if self.rpc_urls else None
+        self.is_real_data = bool(self.rpc_urls)  # Important flag
+        self.pool_options = pool_options or {}  # EndpointPool tuning
+        self.connector = connector  # Shared pool owned by ClientRegistry when set
+        self.trace_configs = trace_configs or []
         self.session: Optional[aiohttp.ClientSession] = None
+        self.transport: Optional[EndpointPool] = None
+        self.single_flight = SingleFlight()
+        self.fleet = fleet or SyntheticFleet(network)  # Demo-mode data source
+        self._fleet_lock = asyncio.Lock()  # one tick at a time (get_pnodes and fetch_snapshot do not share a flight)
+        self._pnode_index: Tuple[Optional[List[PNode]], Dict[str, PNode]] = (None, {})
         
     async def connect(self):
         if not self.session or self.session.closed:
-            self.session = aiohttp.ClientSession()
+            self.session = aiohttp.ClientSession(
+                connector=self.connector,
+                connector_owner=self.connector is None,
+                trace_configs=self.trace_configs,
+                timeout=aiohttp.ClientTimeout(total=10),
+            )
+            if self.rpc_urls:
+                self.transport = EndpointPool(self.session, self.rpc_urls, **self.pool_options)
             
     async def close(self):
         if self.session:
             await self.session.close()
+            self.session = None
+            self.transport = None
+    
+    async def fetch_snapshot(self) -> Tuple[List[PNode], Dict]:
+        """Get pNodes and network info together (one upstream round trip)"""
+        return await self._single_flight("fetch_snapshot", self._fetch_snapshot)
+    
+    async def get_pnodes(self) -> List[PNode]:
+        """Get all pNodes, merged from gossip and vote accounts"""
+        return await self._single_flight("get_pnodes", self._get_pnodes)
+    
+    async def get_network_info(self) -> Dict:
+        """Get epoch/slot information for the network"""
+        return await self._single_flight("get_network_info", self._get_network_info)
+    
+    async def get_pnode_details(self, pubkey: str) -> Optional[Dict]:
+        """Get detailed information about a specific pNode"""
+        return await self._single_flight("get_pnode_details", self._get_pnode_details, pubkey)
+    
+    async def _single_flight(self, method: str, fn, *params):
+        """Concurrent identical calls (method, network, params) share one upstream call"""
+        return await self.single_flight.do((method, self.network, params), lambda: fn(*params))
     
-    async def get_pnodes(self) -> List[Dict]:
-        """Get realistic mock pNode data for demo"""
-        logger.info(f"Generating realistic demo data for {self.network}")
+    async def _fetch_snapshot(self) -> Tuple[List[PNode], Dict]:
+        if not self.is_real_data:
+            return await self._get_demo_pnodes(), await self._get_demo_network_info()
         
-        pnodes = []
-        base_time = datetime.utcnow()
+        await self.connect()
+        cluster_nodes, vote_accounts, epoch_info = await self.transport.batch(SNAPSHOT_CALLS)
+        return self._merge_snapshot(cluster_nodes or [], vote_accounts or {}, epoch_info or {})
+    
+    async def _get_pnodes(self) -> List[PNode]:
+        if not self.is_real_data:
+            return await self._get_demo_pnodes()
+        pnodes, _ = await self.fetch_snapshot()
+        return pnodes
+    
+    async def _get_network_info(self) -> Dict:
+        if not self.is_real_data:
+            return await self._get_demo_network_info()
+        _, network_info = await self.fetch_snapshot()
+        return network_info
+    
+    async def _get_pnode_details(self, pubkey: str) -> Optional[Dict]:
+        if not self.is_real_data:
+            return await self._get_demo_pnode_details(pubkey)
         
-        # Generate different node types
-        node_types = [
-            {"performance": 0.95, "uptime": 99.9, "stake": 5000000, "commission": 1.5, "count": 5},
-            {"performance": 0.85, "uptime": 98.5, "stake": 2000000, "commission": 3.0, "count": 10},
-            {"performance": 0.75, "uptime": 95.0, "stake": 1000000, "commission": 5.0, "count": 10},
-            {"performance": 0.60, "uptime": 88.0, "stake": 500000, "commission": 8.0, "count": 5},
-        ]
+        pnodes, _ = await self.fetch_snapshot()
+        pnode = self._index(pnodes).get(pubkey)
+        return pnode_details(pnode) if pnode is not None else None
+    
+    async def get_pnode_details_many(self, pubkeys: List[str], concurrency: int = 32) -> List[Union[Dict, None, Exception]]:
+        """get_pnode_details for every pubkey, in order; a failed lookup yields its exception.
         
-        node_counter = 0
-        for node_type in node_types:
-            for i in range(node_type["count"]):
-                node_counter += 1
-                is_active = random.random() > 0.1  # 90% active
-                last_seen_offset = random.randint(0, 300)  # 0-5 minutes ago
-                
-                pnode = {
-                    "pubkey": f"xnd_{self.network[:3]}_{''.join(random.choices(string.hexdigits.lower(), k=44))}",
-                    "ip": f"{random.randint(10, 200)}.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}",
-                    "version": self._generate_version(),
-                    "is_active": is_active,
-                    "last_seen": (base_time - timedelta(seconds=last_seen_offset)).isoformat(),
-                    "stake": node_type["stake"] + random.randint(-100000, 100000),
-                    "commission": node_type["commission"] + random.uniform(-0.5, 0.5),
-                    "data_center": self._generate_data_center(),
-                    "performance_score": node_type["performance"] + random.uniform(-0.05, 0.05),
-                    "uptime_24h": node_type["uptime"] + random.uniform(-1, 1),
-                    "vote_success_rate": 98.5 + random.uniform(-2, 1),
-                    "response_time_ms": random.randint(80, 250),
-                    "peer_count": random.randint(30, 120),
-                    "network": self.network,
-                    "is_real_data": False,
-                    "status": "active" if is_active else "inactive",
-                    "location": self._generate_location(),
-                    "last_vote": random.randint(1000000, 2000000) if is_active else 0,
-                    "epoch_credits": random.randint(1000, 10000) if is_active else 0,
-                }
-                pnodes.append(pnode)
+        Against a real endpoint every node comes from one snapshot fetch (one
+        JSON-RPC batch round trip); demo lookups run concurrently, at most
+        ``concurrency`` at a time.
+        """
+        if self.is_real_data:
+            try:
+                pnodes, _ = await self.fetch_snapshot()
+            except Exception as e:
+                return [e] * len(pubkeys)
+            index = self._index(pnodes)
+            return [pnode_details(index[pubkey]) if pubkey in index else None for pubkey in pubkeys]
         
-        # Sort by stake (highest first)
-        pnodes.sort(key=lambda x: x["stake"], reverse=True)
+        semaphore = asyncio.Semaphore(concurrency)
         
-        logger.info(f"Generated {len(pnodes)} realistic pNodes for {self.network} demo")
-        return pnodes
+        async def lookup(pubkey: str) -> Optional[Dict]:
+            async with semaphore:
+                return await self.get_pnode_details(pubkey)
+        
+        return await asyncio.gather(*(lookup(pubkey) for pubkey in pubkeys), return_exceptions=True)
     
-    def _generate_version(self) -> str:
-        versions = ["1.2.0", "1.1.5", "1.1.4", "1.1.3", "1.1.2"]
-        weights = [0.6, 0.2, 0.1, 0.05, 0.05]
-        return random.choices(versions, weights=weights)[0]
-    
-    def _generate_data_center(self) -> str:
-        providers = ["AWS", "Google Cloud", "Microsoft Azure", "DigitalOcean", "Hetzner", "OVH"]
-        regions = ["us-east-1", "us-west-2", "eu-west-1", "asia-southeast-1", "eu-central-1"]
-        return f"{random.choice(providers)} {random.choice(regions)}"
-    
-    def _generate_location(self) -> str:
-        # Using ASCII-only locations to avoid encoding issues
-        locations = [
-            "New York, USA", "London, UK", "Singapore", "Tokyo, Japan",
-            "Frankfurt, Germany", "Sydney, Australia", "Sao Paulo, Brazil",
-            "Mumbai, India", "Paris, France", "Toronto, Canada"
-        ]
-        return random.choice(locations)
+    def _index(self, pnodes: List[PNode]) -> Dict[str, PNode]:
+        """pubkey -> record for a fetched node list, built once per list"""
+        if self._pnode_index[0] is not pnodes:
+            self._pnode_index = (pnodes, {p.pubkey: p for p in pnodes})
+        return self._pnode_index[1]
     
-    async def get_network_info(self) -> Dict:
-        """Generate realistic network information"""
-        # Simulate network progression
-        base_epoch = 250
-        base_slot = 1520000
+    def _merge_snapshot(self, cluster_nodes: List[Dict], vote_accounts: Dict, epoch_info: Dict) -> Tuple[List[PNode], Dict]:
+        """Join getClusterNodes and getVoteAccounts by node pubkey into pNode records"""
+        now = datetime.utcnow().isoformat()
         
-        # Add some randomness and progression
-        time_factor = int(datetime.utcnow().timestamp() / 1000)
-        current_slot = base_slot + (time_factor % 10000)
-        current_epoch = base_epoch + (current_slot // 432000)  # ~432000 slots per epoch
+        votes: Dict[str, Tuple[Dict, bool]] = {}
+        for account in vote_accounts.get("current", []):
+            votes[account["nodePubkey"]] = (account, True)
+        for account in vote_accounts.get("delinquent", []):
+            votes.setdefault(account["nodePubkey"], (account, False))
         
-        return {
-            "epoch": current_epoch,
-            "slot": current_slot,
-            "absolute_slot": current_slot,
-            "block_height": current_slot - 1000,
-            "transaction_count": random.randint(5000000, 10000000),
-            "current_validators": random.randint(20, 40),
-            "total_active_stake": random.randint(500000000, 1000000000),
-            "average_commission": round(random.uniform(3.0, 6.0), 2),
-            "network_version": "1.2.0",
-            "is_real_data": False,
-            "timestamp": datetime.utcnow().isoformat(),
-            "note": "Demo mode - Xandeum public RPC endpoints not available"
-        }
-    
-    async def get_pnode_details(self, pubkey: str) -> Optional[Dict]:
-        """Get detailed information about a specific pNode"""
-        # Generate consistent details based on pubkey
-        random.seed(pubkey)  # Seed for consistency
+        def epoch_credits(account: Dict) -> int:
+            history = account.get("epochCredits") or []
+            if not history:
+                return 0
+            _, credits, previous = history[-1]
+            return credits - previous
+        
+        max_credits = max((epoch_credits(a) for a, _ in votes.values()), default=0)
+        gossip = {node["pubkey"]: node for node in cluster_nodes}
         
-        is_active = "inactive" not in pubkey
-        stake = random.randint(100000, 10000000)
+        pnodes = []
+        for pubkey in gossip.keys() | votes.keys():
+            node = gossip.get(pubkey, {})
+            account, is_current = votes.get(pubkey, ({}, False))
+            is_active = is_current and pubkey in gossip
+            credits = epoch_credits(account) if account else 0
+            address = node.get("gossip") or ""
+            
+            pnodes.append(PNode(
+                pubkey=pubkey,
+                ip=address.rsplit(":", 1)[0] if address else None,
+                version=node.get("version") or "unknown",
+                is_active=is_active,
+                last_seen=now,
+                stake=account.get("activatedStake", 0),
+                commission=account.get("commission", 0),
+                data_center=None,
+                performance_score=round(credits / max_credits, 3) if max_credits else 0.0,
+                uptime_24h=None,
+                vote_success_rate=None,
+                response_time_ms=None,
+                peer_count=None,
+                network=self.network,
+                is_real_data=True,
+                status="active" if is_active else "inactive",
+                location=None,
+                last_vote=account.get("lastVote", 0),
+                epoch_credits=credits,
+            ))
         
-        return {
-            "pubkey": pubkey,
-            "status": "active" if is_active else "inactive",
-            "uptime_24h": round(random.uniform(85.0, 99.9), 1),
-            "uptime_7d": round(random.uniform(88.0, 99.5), 1),
-            "uptime_30d": round(random.uniform(90.0, 99.0), 1),
-            "vote_success_rate": round(random.uniform(95.0, 99.9), 1),
-            "response_time_ms": random.randint(50, 300),
-            "peer_count": random.randint(20, 150),
-            "total_stake": stake,
-            "commission": round(random.uniform(0.5, 10.0), 2),
-            "last_updated": datetime.utcnow().isoformat(),
-            "version": self._generate_version(),
-            "data_center": self._generate_data_center(),
-            "location": self._generate_location(),
-            "latency_ms": random.randint(20, 200),
-            "reliability_score": round(random.uniform(0.7, 1.0), 3),
-            "epoch_credits": random.randint(1000, 10000) if is_active else 0,
-            "last_vote": random.randint(1000000, 2000000) if is_active else 0,
-            "root_slot": random.randint(1000000, 2000000) if is_active else 0,
-            "is_real_data": False,
-            "notes": "Demo data - Real Xandeum API endpoints not publicly available"
+        # Sort by stake (highest first)
+        pnodes.sort(key=lambda x: x.stake, reverse=True)
+        
+        current = vote_accounts.get("current", [])
+        versions = Counter(node.get("version") for node in cluster_nodes if node.get("version"))
+        absolute_slot = epoch_info.get("absoluteSlot", 0)
+        network_info = {
+            "epoch": epoch_info.get("epoch", 0),
+            "slot": absolute_slot,
+            "absolute_slot": absolute_slot,
+            "slot_index": epoch_info.get("slotIndex", 0),
+            "slots_in_epoch": epoch_info.get("slotsInEpoch", 0),
+            "block_height": epoch_info.get("blockHeight", 0),
+            "transaction_count": epoch_info.get("transactionCount", 0),
+            "current_validators": len(current),
+            "total_active_stake": sum(a.get("activatedStake", 0) for a in current),
+            "average_commission": round(sum(a.get("commission", 0) for a in current) / len(current), 2) if current else 0,
+            "network_version": versions.most_common(1)[0][0] if versions else "unknown",
+            "is_real_data": True,
+            "timestamp": now,
         }
+        return pnodes, network_info
+    
+    async def _get_demo_pnodes(self) -> List[PNode]:
+        """Advance the synthetic fleet one tick and return its nodes.
+
+        Runs on a worker thread: at load-test fleet sizes the tick and
+        building the records take long enough to stall the event loop.
+        """
+        async with self._fleet_lock:
+            pnodes = await asyncio.to_thread(self._tick_fleet)
+        logger.info(f"Generated {len(pnodes)} realistic pNodes for {self.network} demo (tick {self.fleet.ticks})")
+        return pnodes
+    
+    def _tick_fleet(self) -> List[PNode]:
+        self.fleet.tick()
+        return self.fleet.pnodes()
+    
+    async def _get_demo_network_info(self) -> Dict:
+        """Network information consistent with the synthetic fleet"""
+        return self.fleet.network_info()
+    
+    async def _get_demo_pnode_details(self, pubkey: str) -> Optional[Dict]:
+        """Consistent demo details for a pNode (no global RNG state involved)"""
+        return self.fleet.details(pubkey)
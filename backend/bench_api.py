@@ -0,0 +1,222 @@
+"""Benchmark: API endpoint latency and throughput at increasing fleet sizes.
+
+Serves a synthetic fleet of each size from the demo network and drives the
+main endpoints at several concurrency levels, either in-process through the
+ASGI app (default) or over HTTP against `uvicorn app.main:app`:
+
+    python bench_api.py --sizes 50 1000 10000 100000 --concurrency 1 10 50 --output api.json
+    python bench_api.py --uvicorn --output api-uvicorn.json
+    python bench_api.py --compare api.json        # flag regressions against a saved run
+
+Each result row records p50/p95/p99 latency, throughput and process RSS.
+Requests repeat within a snapshot, so the snapshot endpoints measure the
+warm path (response cache hits) after the first request.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from app import config
+from app.main import app
+
+NETWORK = "demo"
+ENDPOINTS = {
+    "/pnodes": lambda pubkey: f"/pnodes/?network={NETWORK}&limit=100",
+    "/pnodes/stats/summary": lambda pubkey: f"/pnodes/stats/summary?network={NETWORK}",
+    "/pnodes/{pubkey}": lambda pubkey: f"/pnodes/{pubkey}?network={NETWORK}",
+    "/pnodes/network/info": lambda pubkey: f"/pnodes/network/info?network={NETWORK}",
+}
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_level(
+    http: httpx.AsyncClient,
+    path_for: Callable[[str], str],
+    pubkeys: List[str],
+    requests: int,
+    concurrency: int,
+) -> Dict:
+    """Issue ``requests`` GETs from ``concurrency`` workers; latency per request"""
+    latencies: List[float] = []
+    errors = 0
+    keys = itertools.cycle(pubkeys)
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            path = path_for(next(keys))
+            started = time.perf_counter()
+            response = await http.get(path)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "throughput_rps": round(requests / elapsed, 1),
+    }
+
+
+async def run_size(http: httpx.AsyncClient, pid: int, size: int, args) -> List[Dict]:
+    page = (await http.get(f"/pnodes/?network={NETWORK}&limit=500&fields=pubkey")).json()
+    pubkeys = [p["pubkey"] for p in page["pnodes"]]
+    results = []
+    for endpoint, path_for in ENDPOINTS.items():
+        for concurrency in args.concurrency:
+            await run_level(http, path_for, pubkeys, min(args.requests, 50), concurrency)  # warm-up
+            result = await run_level(http, path_for, pubkeys, args.requests, concurrency)
+            result = {"fleet_size": size, "endpoint": endpoint, "concurrency": concurrency, **result,
+                      "rss_mb": round(rss_mb(pid), 1)}
+            print(json.dumps(result), flush=True)
+            results.append(result)
+    return results
+
+
+def configure(size: int, history_path: str):
+    """Point the app at a single synthetic network of ``size`` nodes"""
+    config.NETWORKS = [NETWORK]
+    config.RPC_URLS = {}
+    config.DEMO_FLEET_SIZE = size
+    config.SNAPSHOT_REFRESH_INTERVAL = 3600  # keep one snapshot for the whole run
+    config.HISTORY_DB_PATH = history_path
+
+
+async def bench_in_process(args, workdir: str) -> List[Dict]:
+    results = []
+    for size in args.sizes:
+        configure(size, os.path.join(workdir, f"history-{size}.sqlite3"))
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+                results += await run_size(http, os.getpid(), size, args)
+    return results
+
+
+async def wait_for_server(http: httpx.AsyncClient, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await http.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def bench_uvicorn(args, workdir: str) -> List[Dict]:
+    results = []
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    for size in args.sizes:
+        env = {
+            **os.environ,
+            "XANDEUM_NETWORKS": NETWORK,
+            "DEMO_FLEET_SIZE": str(size),
+            "SNAPSHOT_REFRESH_INTERVAL": "3600",
+            "HISTORY_DB_PATH": os.path.join(workdir, f"history-{size}.sqlite3"),
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+            env=env,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60) as http:
+                await wait_for_server(http)
+                results += await run_size(http, server.pid, size, args)
+        finally:
+            server.terminate()
+            server.wait()
+    return results
+
+
+def compare(baseline_path: str, results: List[Dict], tolerance: float) -> int:
+    """Print rows whose p95 grew or throughput fell by more than ``tolerance``"""
+    with open(baseline_path) as f:
+        baseline = {(r["fleet_size"], r["endpoint"], r["concurrency"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    for row in results:
+        before = baseline.get((row["fleet_size"], row["endpoint"], row["concurrency"]))
+        if before is None:
+            continue
+        p95 = row["p95_ms"] / before["p95_ms"] if before["p95_ms"] else 1.0
+        rps = row["throughput_rps"] / before["throughput_rps"] if before["throughput_rps"] else 1.0
+        if p95 > 1 + tolerance or rps < 1 - tolerance:
+            regressions += 1
+            print(f"REGRESSION {row['endpoint']} size={row['fleet_size']} c={row['concurrency']}: "
+                  f"p95 x{p95:.2f}, throughput x{rps:.2f}")
+    print(f"{regressions} regression(s) against {baseline_path}")
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="API endpoint benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 1000, 10000, 100000])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint and level")
+    parser.add_argument("--uvicorn", action="store_true", help="Benchmark over HTTP against uvicorn")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier --output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown for --compare")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        bench = bench_uvicorn if args.uvicorn else bench_in_process
+        results = await bench(args, workdir)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "benchmark": "api",
+                "mode": "uvicorn" if args.uvicorn else "in_process",
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "results": results,
+            }, f, indent=2)
+    if args.compare and compare(args.compare, results, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""Benchmark: memory per node and /pnodes serialization, dicts vs PNode records.
+
+Builds fleets from the stub server's RPC responses and compares the old
+representation (one dict per node, strings as parsed from JSON, encoded via
+FastAPI's jsonable_encoder + json.dumps) with PNode records encoded by orjson:
+
+    python bench_records.py --nodes 1000 10000 50000 --output records.json
+"""
+import argparse
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from app.services.xandeum_client import XandeumPRPCClient
+from stub_rpc_server import StubRpcServer
+
+
+def build_records(count: int):
+    stub = StubRpcServer(node_count=count)
+    client = XandeumPRPCClient("testnet", rpc_url=stub.url)
+    pnodes, _ = client._merge_snapshot(
+        stub.handle_call("getClusterNodes", []),
+        stub.handle_call("getVoteAccounts", []),
+        stub.handle_call("getEpochInfo", []),
+    )
+    return pnodes
+
+
+def measure_memory(factory: Callable[[], List]) -> float:
+    """Bytes retained per node by the list ``factory`` builds"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    items = factory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return retained / len(items)
+
+
+def time_ms(fn: Callable[[], bytes], repeat: int = 5) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def default_encode(content: Dict) -> bytes:
+    """What FastAPI does for a returned dict: jsonable_encoder, then json.dumps"""
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def run(count: int) -> Dict:
+    records = build_records(count)
+    # The old dicts held strings as parsed from each RPC response, one copy per node
+    raw = orjson.dumps(records)
+    dict_bytes = measure_memory(lambda: orjson.loads(raw))
+    record_bytes = measure_memory(lambda: build_records(count))
+
+    dicts = orjson.loads(raw)
+    page = {"total": count, "pnodes": dicts}
+    page_records = {"total": count, "pnodes": records}
+    before_ms = time_ms(lambda: default_encode(page))
+    after_ms = time_ms(lambda: orjson.dumps(page_records, option=orjson.OPT_SERIALIZE_NUMPY))
+
+    return {
+        "nodes": count,
+        "dict_bytes_per_node": round(dict_bytes),
+        "record_bytes_per_node": round(record_bytes),
+        "serialize_default_ms": round(before_ms, 2),
+        "serialize_orjson_ms": round(after_ms, 2),
+        "speedup": round(before_ms / after_ms, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PNode record memory and serialization benchmark")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    for count in args.nodes:
+        result = run(count)
+        print(json.dumps(result))
+        results.append(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "pnode_records", "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
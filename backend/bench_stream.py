@@ -0,0 +1,126 @@
+"""Benchmark: idle SSE connections held by a single uvicorn worker.
+
+Starts `uvicorn app.main:app` in a subprocess, opens N concurrent
+/pnodes/stream connections, then waits for the next snapshot broadcast and
+records how long fan-out to every client took, plus server RSS:
+
+    python bench_stream.py --connections 1000 2000 5000 --output stream.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import aiohttp
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def read_events(response: aiohttp.ClientResponse, count: int, received: List[float]):
+    """Read ``count`` snapshot events, recording when each one arrived"""
+    seen = 0
+    async for line in response.content:
+        if line.startswith(b"event: snapshot"):
+            seen += 1
+            received.append(time.perf_counter())
+            if seen == count:
+                return
+
+
+async def wait_for_server(url: str, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(f"{url}/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def run_level(url: str, pid: int, connections: int, network: str) -> Dict:
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=None, sock_read=None)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        rss_before = rss_mb(pid)
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(
+            session.get(f"{url}/pnodes/stream?network={network}") for _ in range(connections)
+        ))
+        initial: List[float] = []
+        await asyncio.gather(*(read_events(r, 1, initial) for r in responses))
+        connect_seconds = time.perf_counter() - started
+        rss_connected = rss_mb(pid)
+
+        # Every client now idles until the next background refresh is broadcast
+        broadcast: List[float] = []
+        await asyncio.gather(*(read_events(r, 1, broadcast) for r in responses))
+        fan_out_ms = [(t - broadcast[0]) * 1000 for t in broadcast]
+
+        for response in responses:
+            response.close()
+
+    return {
+        "connections": connections,
+        "connect_seconds": round(connect_seconds, 3),
+        "rss_before_mb": round(rss_before, 1),
+        "rss_connected_mb": round(rss_connected, 1),
+        "rss_per_connection_kb": round((rss_connected - rss_before) * 1024 / connections, 2),
+        "fan_out_ms_p50": round(statistics.median(fan_out_ms), 2),
+        "fan_out_ms_max": round(max(fan_out_ms), 2),
+        "delivered": len(broadcast),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="SSE fan-out benchmark")
+    parser.add_argument("--connections", type=int, nargs="+", default=[500, 1000, 2000])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--network", default="testnet")
+    parser.add_argument("--refresh-interval", type=float, default=3.0)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    env = {
+        **os.environ,
+        "SNAPSHOT_REFRESH_INTERVAL": str(args.refresh_interval),
+        "STREAM_MAX_SUBSCRIBERS": str(max(args.connections) + 100),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    url = f"http://127.0.0.1:{args.port}"
+    results = []
+    try:
+        await wait_for_server(url)
+        for connections in args.connections:
+            result = await run_level(url, server.pid, connections, args.network)
+            print(json.dumps(result))
+            results.append(result)
+    finally:
+        server.terminate()
+        server.wait()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "sse_fan_out", "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""Benchmark: upstream tail latency with a single endpoint vs a routed pool.
+
+Starts several local stub RPC servers with injected faults (a share of slow
+responses, a share of 503s) and sends the snapshot batch through
+EndpointPool configured three ways: one endpoint (the old single-URL
+client), a pool without hedging, and a pool with hedging:
+
+    python bench_upstream.py --requests 2000 --output upstream.json
+    python bench_upstream.py --slow-rate 0.1 --slow-latency 0.5 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List
+
+import aiohttp
+
+from app.services.endpoint_pool import EndpointPool
+from app.services.xandeum_client import SNAPSHOT_CALLS
+from stub_rpc_server import StubRpcServer
+
+MODES = {
+    "single": dict(endpoints=1, hedge=False),
+    "pool": dict(endpoints=None, hedge=False),
+    "pool_hedged": dict(endpoints=None, hedge=True),
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_mode(urls: List[str], mode: Dict, args) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(args.requests))
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
+        pool = EndpointPool(session, urls[:mode["endpoints"]], hedge=mode["hedge"], reset_timeout=args.reset_timeout)
+
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    await pool.batch(SNAPSHOT_CALLS)
+                except Exception:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        routing = pool.to_dict()
+
+    return {
+        "requests": args.requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(max(latencies), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "throughput_rps": round(args.requests / elapsed, 1),
+        "hedges": routing["hedges"],
+        "hedge_wins": routing["hedge_wins"],
+        "failovers": routing["failovers"],
+        "endpoints": routing["endpoints"],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Upstream routing/hedging benchmark")
+    parser.add_argument("--endpoints", type=int, default=3)
+    parser.add_argument("--nodes", type=int, default=200, help="pNodes served by each stub")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.005, help="Base seconds per response")
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--reset-timeout", type=float, default=5.0)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    stubs = [
+        StubRpcServer(node_count=args.nodes, latency=args.latency, slow_rate=args.slow_rate,
+                      slow_latency=args.slow_latency, error_rate=args.error_rate, fault_seed=i)
+        for i in range(args.endpoints)
+    ]
+    for stub in stubs:
+        await stub.start()
+    try:
+        results = []
+        for name, mode in MODES.items():
+            result = {"mode": name, **await run_mode([stub.url for stub in stubs], mode, args)}
+            print(json.dumps({k: v for k, v in result.items() if k != "endpoints"}), flush=True)
+            results.append(result)
+    finally:
+        for stub in stubs:
+            await stub.stop()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "upstream_routing", "config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
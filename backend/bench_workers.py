@@ -0,0 +1,153 @@
+"""Benchmark: throughput and upstream load as uvicorn workers are added.
+
+Starts a local stub RPC server, then `uvicorn app.main:app --workers N` for
+each worker count, once with every worker polling upstream on its own
+(per_worker) and once with SHARED_SNAPSHOT_DIR set (shared), and drives the
+snapshot endpoints over HTTP for a fixed time:
+
+    python bench_workers.py --workers 1 2 4 --duration 10 --output workers.json
+    python bench_workers.py --nodes 5000 --refresh-interval 1 --concurrency 64
+
+Each row records throughput, latency percentiles, upstream requests per
+second (what the stub received) and out_of_order: responses carrying an
+older snapshot version than one already returned before the request was
+sent, i.e. a client bounced between workers that disagree.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from bench_api import git_commit, percentile, wait_for_server
+from stub_rpc_server import StubRpcServer
+
+NETWORK = "testnet"
+PATHS = [
+    f"/pnodes/stats/summary?network={NETWORK}",
+    f"/pnodes/?network={NETWORK}&limit=100",
+    f"/pnodes/network/info?network={NETWORK}",
+]
+MODES = ("per_worker", "shared")
+
+
+async def drive(http: httpx.AsyncClient, duration: float, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    out_of_order = 0
+    newest = 0
+    paths = itertools.cycle(PATHS)
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors, out_of_order, newest
+        while time.perf_counter() < deadline:
+            floor = newest
+            started = time.perf_counter()
+            response = await http.get(next(paths))
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                errors += 1
+                continue
+            version = int(response.headers["x-snapshot-version"])
+            if version < floor:
+                out_of_order += 1
+            newest = max(newest, version)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "out_of_order": out_of_order,
+    }
+
+
+async def run_one(stub: StubRpcServer, workers: int, mode: str, args, workdir: str) -> Dict:
+    env = {
+        **os.environ,
+        "XANDEUM_NETWORKS": NETWORK,
+        f"XANDEUM_RPC_URL_{NETWORK.upper()}": stub.url,
+        "SNAPSHOT_REFRESH_INTERVAL": str(args.refresh_interval),
+        "HISTORY_DB_PATH": os.path.join(workdir, f"history-{mode}-{workers}.sqlite3"),
+    }
+    if mode == "shared":
+        env["SHARED_SNAPSHOT_DIR"] = os.path.join(workdir, f"shared-{workers}")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60) as http:
+            await wait_for_server(http)
+            # Every worker has its first snapshot before the clock starts
+            await drive(http, 2.0, args.concurrency)
+            upstream_before = stub.http_requests
+            result = await drive(http, args.duration, args.concurrency)
+            upstream = stub.http_requests - upstream_before
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        "mode": mode,
+        "workers": workers,
+        "concurrency": args.concurrency,
+        **result,
+        "upstream_requests": upstream,
+        "upstream_rps": round(upstream / args.duration, 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Multi-worker snapshot sharing benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--nodes", type=int, default=1000, help="pNodes served by the stub")
+    parser.add_argument("--refresh-interval", type=float, default=2.0)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per row")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    async with StubRpcServer(node_count=args.nodes) as stub:
+        with tempfile.TemporaryDirectory() as workdir:
+            for mode in args.modes:
+                for workers in args.workers:
+                    result = await run_one(stub, workers, mode, args, workdir)
+                    print(json.dumps(result), flush=True)
+                    results.append(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "benchmark": "workers",
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+                "config": vars(args),
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Dict, Optional
+
+import httpx
+import pytest
+
+from app import config
+from app.main import app
+from stub_rpc_server import StubRpcServer
+
+
+@pytest.fixture(autouse=True)
+def isolated_history_db(monkeypatch, tmp_path):
+    """Every test gets its own rollup database instead of ./pnode_history.sqlite3"""
+    monkeypatch.setattr(config, "HISTORY_DB_PATH", str(tmp_path / "history.sqlite3"))
+
+
+@pytest.fixture
+def running_app(monkeypatch):
+    """The app with its lifespan running against local stub RPC servers.
+
+        async with running_app(node_count=300) as (http, stub):
+            await http.get("/pnodes/")
+
+    ``stubs`` maps networks to StubRpcServer instances (default: one
+    testnet stub built from ``stub_options``; ``{}`` leaves every network
+    on demo data). Stubs already running are used as they are and left
+    running, so one stub can outlive several app lifespans.
+    """
+    @asynccontextmanager
+    async def start(stubs: Optional[Dict[str, StubRpcServer]] = None, **stub_options):
+        if stubs is None:
+            stubs = {"testnet": StubRpcServer(**stub_options)}
+        async with AsyncExitStack() as stack:
+            for network, stub in stubs.items():
+                if not stub.running:
+                    await stack.enter_async_context(stub)
+                monkeypatch.setitem(config.RPC_URLS, network, stub.url)
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+            http = await stack.enter_async_context(httpx.AsyncClient(transport=transport, base_url="http://test"))
+            yield http, stubs.get("testnet")
+
+    return start
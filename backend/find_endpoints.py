@@ -1,90 +1,71 @@
-import aiohttp
+"""Find working Xandeum JSON-RPC endpoints.
+
+Probes base URL x port x path candidates per network concurrently (one
+JSON-RPC batch per candidate, hosts that refuse connections are skipped)
+and writes a JSON report the API can start from:
+
+    python find_endpoints.py --output endpoints.json
+    python find_endpoints.py --target testnet=http://127.0.0.1:8899 --ports "" --paths /
+    RPC_DISCOVERY_REPORT=endpoints.json uvicorn app.main:app
+"""
+import argparse
 import asyncio
 import json
+from typing import Dict, List
+
+from app.services.endpoint_discovery import (
+    DEFAULT_METHODS,
+    DEFAULT_PATHS,
+    DEFAULT_PORTS,
+    DEFAULT_TARGETS,
+    EndpointDiscovery,
+)
+
+
+def parse_targets(values: List[str]) -> Dict[str, List[str]]:
+    targets: Dict[str, List[str]] = {}
+    for value in values:
+        network, _, base_url = value.partition("=")
+        if not base_url:
+            raise argparse.ArgumentTypeError(f"expected network=base_url, got {value!r}")
+        targets.setdefault(network, []).append(base_url)
+    return targets
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Concurrent Xandeum JSON-RPC endpoint discovery")
+    parser.add_argument("--target", action="append", default=[],
+                        help="network=base_url to probe (repeatable; default: public mainnet/testnet hosts)")
+    parser.add_argument("--ports", nargs="+", default=DEFAULT_PORTS, help='Port suffixes, e.g. "" :8899')
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    parser.add_argument("--methods", nargs="+", default=DEFAULT_METHODS)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=3.0, help="Seconds per probe")
+    parser.add_argument("--connect-timeout", type=float, default=1.5)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    discovery = EndpointDiscovery(
+        methods=args.methods,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        connect_timeout=args.connect_timeout,
+    )
+    report = await discovery.discover(
+        targets=parse_targets(args.target) if args.target else DEFAULT_TARGETS,
+        ports=args.ports,
+        paths=args.paths,
+    )
+
+    summary = report.to_dict()
+    for network, endpoints in summary["endpoints"].items():
+        print(f"{network}: {len(endpoints)} working endpoint(s)")
+        for endpoint in endpoints:
+            print(f"  {endpoint['url']}  {endpoint['latency_ms']}ms  {json.dumps(endpoint['methods'])}")
+    print(f"{summary['probed']} probed, {summary['skipped']} skipped in {summary['duration_ms']:.0f}ms")
+    if args.output:
+        report.save(args.output)
 
-async def test_all_possible_endpoints():
-    """Test all possible Xandeum RPC endpoint formats"""
-    
-    base_urls = [
-        "https://mainnet.xandeum.network",
-        "https://testnet.xandeum.network",
-        "http://mainnet.xandeum.network",  # Try HTTP
-        "http://testnet.xandeum.network",  # Try HTTP
-    ]
-    
-    # Try different port combinations
-    ports = ["", ":8899", ":80", ":443", ":8080"]
-    
-    # Try different path combinations
-    paths = ["", "/", "/rpc", "/api", "/api/v1", "/v1/rpc"]
-    
-    methods = ["getClusterNodes", "getVoteAccounts", "getEpochInfo"]
-    
-    successful_endpoints = []
-    
-    for base in base_urls:
-        for port in ports:
-            for path in paths:
-                endpoint = f"{base}{port}{path}"
-                print(f"\n?? Testing: {endpoint}")
-                
-                for method in methods:
-                    try:
-                        async with aiohttp.ClientSession() as session:
-                            payload = {
-                                "jsonrpc": "2.0",
-                                "id": 1,
-                                "method": method,
-                                "params": []
-                            }
-                            
-                            try:
-                                async with session.post(
-                                    endpoint,
-                                    json=payload,
-                                    timeout=aiohttp.ClientTimeout(total=3)
-                                ) as response:
-                                    if response.status == 200:
-                                        data = await response.text()
-                                        if "result" in data or '"error"' in data:
-                                            print(f"  ? {method}: SUCCESS (200)")
-                                            if endpoint not in successful_endpoints:
-                                                successful_endpoints.append(endpoint)
-                                                
-                                            # Try to parse and show small sample
-                                            try:
-                                                json_data = json.loads(data)
-                                                if "result" in json_data:
-                                                    result = json_data["result"]
-                                                    if isinstance(result, list):
-                                                        print(f"     Found {len(result)} items")
-                                                    elif isinstance(result, dict):
-                                                        print(f"     Keys: {list(result.keys())[:3]}...")
-                                            except:
-                                                pass
-                                        else:
-                                            print(f"  ?? {method}: Got 200 but no JSON-RPC response")
-                                    else:
-                                        print(f"  ? {method}: HTTP {response.status}")
-                            except Exception as e:
-                                print(f"  ? {method}: Error - {str(e)[:50]}")
-                                
-                    except Exception as e:
-                        print(f"  ? {method}: Failed - {str(e)[:50]}")
-    
-    print(f"\n{'='*60}")
-    print("?? SUMMARY:")
-    print(f"{'='*60}")
-    if successful_endpoints:
-        print("? Successful endpoints found:")
-        for endpoint in successful_endpoints:
-            print(f"   - {endpoint}")
-    else:
-        print("? No successful endpoints found")
-        print("\n?? Suggestions:")
-        print("1. Check if Xandeum has public RPC endpoints")
-        print("2. Check Discord for correct endpoints")
-        print("3. Might need authentication/API key")
-        print("4. Could be WebSocket-only API")
 
-asyncio.run(test_all_possible_endpoints())
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,7 +1,10 @@
 ﻿from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
-import random
+from typing import Dict
+
+from app.services.pnode_store import PNodeStore
+from app.services.synthetic_fleet import SyntheticFleet
 
 app = FastAPI(
     title="Xandeum pNode Dashboard API",
@@ -17,33 +20,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# One deterministic fleet per network, so nodes keep their identity between calls
+_fleets: Dict[str, SyntheticFleet] = {}
+
+def get_fleet(network: str, count: int = 30) -> SyntheticFleet:
+    fleet = _fleets.get(network)
+    if fleet is None or fleet.size != count:
+        fleet = _fleets[network] = SyntheticFleet(network, size=count)
+    return fleet
+
 def generate_mock_pnodes(network="testnet", count=30):
-    """Generate realistic mock pNode data"""
-    import string
-    from datetime import datetime, timedelta
-    
-    pnodes = []
-    for i in range(count):
-        is_active = random.random() > 0.2
-        stake = random.randint(100000, 10000000)
-        commission = random.uniform(0.5, 10.0)
-        
-        pnodes.append({
-            "pubkey": f"{network[:3]}_{''.join(random.choices(string.hexdigits.lower(), k=40))}",
-            "ip": f"{random.randint(1,255)}.{random.randint(1,255)}.{random.randint(1,255)}.{random.randint(1,255)}",
-            "version": f"1.{random.randint(0,2)}.{random.randint(0,9)}",
-            "is_active": is_active,
-            "last_seen": (datetime.utcnow() - timedelta(minutes=random.randint(0, 60))).isoformat(),
-            "stake": stake,
-            "commission": round(commission, 2),
-            "data_center": random.choice(["AWS us-east-1", "Google Cloud europe-west", "Azure asia-east"]),
-            "performance_score": round(random.uniform(0.7, 1.0), 3),
-            "network": network
-        })
-    
-    # Sort by stake
-    pnodes.sort(key=lambda x: x["stake"], reverse=True)
-    return pnodes
+    """Realistic mock pNode data from the synthetic fleet"""
+    return get_fleet(network, count).pnodes()
 
 @app.get("/")
 async def root():
@@ -85,33 +73,19 @@ async def get_pnodes(network: str = "testnet", skip: int = 0, limit: int = 100):
 async def get_summary(network: str = "testnet"):
     """Get summary statistics"""
     pnodes = generate_mock_pnodes(network, count=50)
-    active = [p for p in pnodes if p["is_active"]]
-    
-    if not active:
-        return {
-            "network": network,
-            "total_pnodes": len(pnodes),
-            "active_pnodes": 0,
-            "total_stake": 0,
-            "avg_commission": 0,
-            "avg_performance": 0,
-            "is_real_data": False
-        }
-    
-    total_stake = sum(p["stake"] for p in active)
-    avg_commission = sum(p["commission"] for p in active) / len(active)
-    avg_performance = sum(p["performance_score"] for p in active) / len(active)
+    summary = PNodeStore(pnodes).summary
+    network_info = get_fleet(network, 50).network_info()
     
     return {
         "network": network,
-        "total_pnodes": len(pnodes),
-        "active_pnodes": len(active),
-        "inactive_pnodes": len(pnodes) - len(active),
-        "total_stake": total_stake,
-        "avg_commission": round(avg_commission, 2),
-        "avg_performance": round(avg_performance, 3),
-        "current_epoch": random.randint(200, 300),
-        "current_slot": random.randint(1500000, 1600000),
+        "total_pnodes": summary["total_pnodes"],
+        "active_pnodes": summary["active_pnodes"],
+        "inactive_pnodes": summary["inactive_pnodes"],
+        "total_stake": summary["total_stake"],
+        "avg_commission": summary["avg_commission"],
+        "avg_performance": summary["avg_performance"],
+        "current_epoch": network_info["epoch"],
+        "current_slot": network_info["slot"],
         "is_real_data": False,
         "demo_note": "Realistic simulation - Ready for Xandeum API"
     }
@@ -119,15 +93,16 @@ async def get_summary(network: str = "testnet"):
 @app.get("/pnodes/{pubkey}")
 async def get_pnode(pubkey: str, network: str = "testnet"):
     """Get pNode details"""
+    details = get_fleet(network, 50).details(pubkey)
     return {
         "pubkey": pubkey,
         "network": network,
-        "status": "active",
-        "uptime_24h": round(random.uniform(95.0, 99.9), 1),
-        "stake": random.randint(100000, 10000000),
-        "commission": round(random.uniform(1.0, 8.0), 2),
-        "performance": round(random.uniform(0.8, 1.0), 3),
-        "version": "1.2.0",
+        "status": details["status"],
+        "uptime_24h": details["uptime_24h"],
+        "stake": details["total_stake"],
+        "commission": details["commission"],
+        "performance": details["reliability_score"],
+        "version": details["version"],
         "is_real_data": False,
-        "last_updated": datetime.utcnow().isoformat()
+        "last_updated": details["last_updated"]
     }
@@ -0,0 +1,203 @@
+"""Local JSON-RPC 2.0 stub of a Xandeum RPC node.
+
+Answers getClusterNodes, getVoteAccounts and getEpochInfo (single or batched)
+with deterministic data so tests and benchmarks run offline:
+
+    python stub_rpc_server.py --port 8899 --nodes 500
+    XANDEUM_RPC_URL_TESTNET=http://127.0.0.1:8899 uvicorn app.main:app
+
+Faults can be injected to exercise failover and hedging: a share of
+responses delayed (tail latency) or failed with HTTP 503, or the whole
+server marked down:
+
+    python stub_rpc_server.py --port 8900 --slow-rate 0.1 --slow-latency 0.5 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import random
+from collections import Counter
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+
+class StubRpcServer:
+    """In-process stub server; counts HTTP requests and method calls"""
+
+    def __init__(
+        self,
+        node_count: int = 50,
+        seed: int = 42,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 0.0,
+        error_rate: float = 0.0,
+        fault_seed: Optional[int] = None,
+        reject_batches: bool = False,
+    ):
+        self.node_count = node_count
+        self.seed = seed
+        self.host = host
+        self.port = port
+        self.latency = latency  # Seconds added to every HTTP response
+        self.slow_rate = slow_rate  # Share of responses delayed by a further slow_latency
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate  # Share of responses failed with HTTP 503
+        self.down = False  # Fail every request while set
+        self.reject_batches = reject_batches  # Answer batch arrays with one error object, like servers without batch support
+        self._faults = random.Random(fault_seed)
+        self.http_requests = 0
+        self.method_calls: Counter = Counter()
+        self.slot = 1_520_000
+        self._nodes = self._build_nodes()
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None
+
+    @property
+    def pubkeys(self) -> List[str]:
+        return [n["pubkey"] for n in self._nodes]
+
+    def update_node(self, pubkey: str, **changes) -> Dict:
+        """Change a node's fields (stake, commission, version, delinquent, ...) from the next call on"""
+        node = next(n for n in self._nodes if n["pubkey"] == pubkey)
+        node.update(changes)
+        return node
+
+    def remove_node(self, pubkey: str):
+        self._nodes = [n for n in self._nodes if n["pubkey"] != pubkey]
+
+    def _build_nodes(self) -> List[Dict]:
+        rng = random.Random(self.seed)
+        nodes = []
+        for i in range(self.node_count):
+            nodes.append({
+                "pubkey": f"stub{i:05d}" + "".join(rng.choices("0123456789abcdef", k=39)),
+                "vote_pubkey": "vote" + "".join(rng.choices("0123456789abcdef", k=40)),
+                "ip": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+                "version": rng.choices(["1.2.0", "1.1.5", "1.1.4"], weights=[0.7, 0.2, 0.1])[0],
+                "stake": rng.randint(100_000, 10_000_000),
+                "commission": rng.randint(0, 10),
+                "credits": rng.randint(1_000, 10_000),
+                "delinquent": rng.random() < 0.1,
+            })
+        return nodes
+
+    def handle_call(self, method: str, params: list):
+        self.method_calls[method] += 1
+        if method == "getClusterNodes":
+            return [
+                {
+                    "pubkey": n["pubkey"],
+                    "gossip": f"{n['ip']}:8001",
+                    "rpc": f"{n['ip']}:8899",
+                    "tpu": f"{n['ip']}:8003",
+                    "version": n["version"],
+                }
+                for n in self._nodes
+            ]
+        if method == "getVoteAccounts":
+            current, delinquent = [], []
+            for n in self._nodes:
+                account = {
+                    "votePubkey": n["vote_pubkey"],
+                    "nodePubkey": n["pubkey"],
+                    "activatedStake": n["stake"],
+                    "commission": n["commission"],
+                    "epochVoteAccount": True,
+                    "lastVote": self.slot - (5000 if n["delinquent"] else 1),
+                    "rootSlot": self.slot - 32,
+                    "epochCredits": [[250, n["credits"] + 10_000, 10_000]],
+                }
+                (delinquent if n["delinquent"] else current).append(account)
+            return {"current": current, "delinquent": delinquent}
+        if method == "getEpochInfo":
+            return {
+                "epoch": 250 + self.slot // 432_000,
+                "slotIndex": self.slot % 432_000,
+                "slotsInEpoch": 432_000,
+                "absoluteSlot": self.slot,
+                "blockHeight": self.slot - 1000,
+                "transactionCount": self.slot * 7,
+            }
+        raise KeyError(method)
+
+    def _respond(self, request: Dict) -> Dict:
+        request_id = request.get("id")
+        try:
+            result = self.handle_call(request["method"], request.get("params") or [])
+        except KeyError:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32601, "message": "Method not found"}}
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.http_requests += 1
+        payload = await request.json()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.slow_rate and self._faults.random() < self.slow_rate:
+            await asyncio.sleep(self.slow_latency)
+        if self.down or (self.error_rate and self._faults.random() < self.error_rate):
+            return web.Response(status=503, text="injected fault")
+        if isinstance(payload, list):
+            if self.reject_batches:
+                return web.json_response({"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Batch requests are not supported"}})
+            return web.json_response([self._respond(item) for item in payload])
+        return web.json_response(self._respond(payload))
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/", self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Local Xandeum JSON-RPC stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--nodes", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Share of responses delayed by --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of responses failed with HTTP 503")
+    args = parser.parse_args()
+
+    server = StubRpcServer(
+        node_count=args.nodes, seed=args.seed, host=args.host, port=args.port, latency=args.latency,
+        slow_rate=args.slow_rate, slow_latency=args.slow_latency, error_rate=args.error_rate,
+    )
+    await server.start()
+    print(f"Stub JSON-RPC server with {args.nodes} nodes on {server.url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+import asyncio
+
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.api.endpoints.stream import stream_updates
+from app.services.broadcast import BroadcastHub
+from app.services.pnode_store import PNodeStore
+from app.services.snapshot_cache import Snapshot
+from app.services.snapshot_diff import diff_stores
+
+
+def make_snapshot(version, pnodes, previous=None):
+    store = PNodeStore(pnodes)
+    diff = diff_stores(previous.store, store, previous.version, version) if previous else None
+    return Snapshot(network="testnet", version=version, pnodes=pnodes, network_info={}, store=store, diff=diff)
+
+
+def test_slow_subscriber_backlog_collapses_to_one_resync():
+    async def run():
+        hub = BroadcastHub()
+        fast, slow = hub.subscribe("testnet"), hub.subscribe("testnet")
+        other = hub.subscribe("mainnet")
+
+        snapshot = make_snapshot(1, [{"pubkey": "a", "stake": 1}])
+        hub.publish(snapshot)
+        first = await fast.next(timeout=1)
+        for version in range(2, 6):
+            snapshot = make_snapshot(version, [{"pubkey": "a", "stake": version}], snapshot)
+            hub.publish(snapshot)
+            if version == 2:
+                second = await fast.next(timeout=1)
+
+        slow_message = await slow.next(timeout=1)
+        idle = await other.next(timeout=0.01)
+        return hub, first, second, slow_message, slow, idle
+
+    hub, first, second, slow_message, slow, idle = asyncio.run(run())
+
+    assert second.payload["since"] == 1 and second.payload["changes"]["changed"][0]["pubkey"] == "a"
+    # The slow client skipped versions 1-4 and gets one resync for version 5
+    assert slow_message.version == 5 and slow_message.payload["full_resync"] is True
+    assert slow.coalesced == 4
+    assert idle is None
+    assert hub.to_dict()["fanned_out"] == 10
+
+
+def test_stream_subscribes_only_while_its_body_is_sent():
+    class Cache:
+        def peek(self, network):
+            return None
+
+        def changes_since(self, network, since):
+            raise RuntimeError("boom")
+
+    async def run():
+        hub, cache = BroadcastHub(max_subscribers=1), Cache()
+        snapshot = make_snapshot(1, [{"pubkey": "a", "stake": 1}])
+        request = Request({"type": "http", "headers": []})
+        counts = []
+
+        unsent = await stream_updates(request, "testnet", snapshot, cache, hub)  # client left before the body
+        counts.append(hub.subscriber_count)
+
+        response = await stream_updates(request, "testnet", snapshot, cache, hub)
+        body = response.body_iterator
+        first = await body.__anext__()
+        counts.append(hub.subscriber_count)
+        try:
+            await stream_updates(request, "testnet", snapshot, cache, hub)
+        except HTTPException as e:
+            full = e.status_code
+        await body.aclose()
+        counts.append(hub.subscriber_count)
+
+        failing = await stream_updates(Request({"type": "http", "headers": [(b"last-event-id", b"1")]}),
+                                       "testnet", snapshot, cache, hub)
+        try:
+            await failing.body_iterator.__anext__()
+        except RuntimeError:
+            counts.append(hub.subscriber_count)
+        return unsent, first, full, counts
+
+    unsent, first, full, counts = asyncio.run(run())
+    assert unsent.status_code == 200
+    assert first.startswith(b"retry: 5000\n\nid: 1\n")
+    assert full == 503
+    assert counts == [0, 1, 0, 0]
@@ -0,0 +1,55 @@
+import asyncio
+
+from app.main import app
+
+
+def run_with_stub(running_app, scenario):
+    async def run():
+        async with running_app(node_count=30) as (http, stub):
+            return await scenario(stub, app.state.snapshot_cache, http)
+
+    return asyncio.run(run())
+
+
+def test_etag_and_304_until_snapshot_changes(running_app):
+    async def scenario(stub, cache, http):
+        results = {}
+        for path in ("/pnodes/?limit=5", "/pnodes/stats/summary", "/pnodes/network/info"):
+            first = await http.get(path)
+            etag = first.headers["etag"]
+            again = await http.get(path, headers={"If-None-Match": etag})
+            await cache.refresh("testnet")
+            after_refresh = await http.get(path, headers={"If-None-Match": etag})
+            results[path] = (first, again, after_refresh)
+        return results
+
+    for path, (first, again, after_refresh) in run_with_stub(running_app, scenario).items():
+        assert first.status_code == 200, path
+        assert again.status_code == 304 and again.content == b"", path
+        assert again.headers["etag"] == first.headers["etag"]
+        assert after_refresh.status_code == 200, path
+        assert after_refresh.headers["etag"] != first.headers["etag"]
+
+
+def test_changes_since_reports_only_touched_nodes(running_app):
+    async def scenario(stub, cache, http):
+        since = (await cache.get("testnet")).version
+        unchanged = (await http.get(f"/pnodes/changes?since={since}")).json()
+
+        changed, removed = stub.pubkeys[:2]
+        stub.update_node(changed, commission=11)  # stub commissions are 0-10
+        stub.remove_node(removed)
+        await cache.refresh("testnet")
+        changes = (await http.get(f"/pnodes/changes?since={since}")).json()
+        stale = (await http.get("/pnodes/changes?since=999")).json()
+        return changed, removed, unchanged, changes, stale
+
+    changed, removed, unchanged, changes, stale = run_with_stub(running_app, scenario)
+
+    assert unchanged["added"] == unchanged["removed"] == unchanged["changed"] == []
+    assert changes["version"] == changes["since"] + 1
+    assert changes["added"] == []
+    assert changes["removed"] == [removed]
+    assert [c["pubkey"] for c in changes["changed"]] == [changed]
+    assert "commission" in changes["changed"][0]["changed_fields"]
+    assert stale["full_resync"] is True
@@ -0,0 +1,26 @@
+import asyncio
+
+from app.services.client_registry import ClientRegistry
+from stub_rpc_server import StubRpcServer
+
+
+def test_shared_connector_reuses_one_keep_alive_connection():
+    async def run():
+        async with StubRpcServer(node_count=10) as stub:
+            registry = ClientRegistry(["testnet"], rpc_urls={"testnet": stub.url})
+            await registry.start()
+            try:
+                client = registry.get("testnet")
+                counts = []
+                for _ in range(5):
+                    await client.fetch_snapshot()
+                    counts.append((registry.stats.connections_created, registry.stats.connections_reused))
+            finally:
+                await registry.close()
+            return counts, registry.pool_stats(), stub.http_requests
+
+    counts, stats, stub_requests = asyncio.run(run())
+    assert stub_requests == 5
+    assert counts == [(1, 0), (1, 1), (1, 2), (1, 3), (1, 4)]
+    assert stats["requests"] == 5
+    assert stats["reuse_ratio"] == 0.8
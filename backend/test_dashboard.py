@@ -0,0 +1,46 @@
+import asyncio
+import os
+import re
+
+from app import config
+
+
+def test_bootstrap_matches_the_three_endpoints_and_assets_are_cacheable(running_app):
+    async def run():
+        async with running_app(node_count=300) as (http, _):
+            bootstrap = await http.get("/dashboard/bootstrap?limit=100")
+            parts = [await http.get(path) for path in
+                     ("/pnodes/stats/summary", "/pnodes/network/info", "/pnodes/?limit=100")]
+            revalidated = await http.get("/dashboard/bootstrap?limit=100",
+                                         headers={"If-None-Match": bootstrap.headers["etag"]})
+
+            page = await http.get("/dashboard/")
+            script_url = re.search(r'src="(/dashboard/static/script\.\w+\.js)"', page.text).group(1)
+            script = await http.get(script_url, headers={"Accept-Encoding": "br"})
+            script_gzip = await http.get(script_url, headers={"Accept-Encoding": "gzip"})
+            script_again = await http.get(script_url, headers={"If-None-Match": script.headers["etag"]})
+            missing = await http.get("/dashboard/static/nope.js")
+            return bootstrap, parts, revalidated, page, script, script_gzip, script_again, missing
+
+    bootstrap, parts, revalidated, page, script, script_gzip, script_again, missing = asyncio.run(run())
+    body = bootstrap.json()
+    summary, network_info, pnodes = (part.json() for part in parts)
+    assert body["summary"] == summary
+    assert body["network_info"] == network_info
+    assert body["pnodes"] == pnodes
+    assert body["snapshot_version"] == pnodes["snapshot_version"]
+    assert revalidated.status_code == 304
+
+    assert page.headers["cache-control"] == "no-cache"
+    assert '<meta name="api-base" content="" />' in page.text
+
+    with open(os.path.join(config.FRONTEND_DIR, "script.js"), "rb") as f:
+        source = f.read()
+    assert script.headers["content-encoding"] == "br"  # httpx decodes the body
+    assert "immutable" in script.headers["cache-control"]
+    assert script.headers["vary"] == "Accept-Encoding"
+    assert script.content == source
+    assert script_gzip.headers["content-encoding"] == "gzip"
+    assert script_gzip.content == source
+    assert script_again.status_code == 304
+    assert missing.status_code == 404
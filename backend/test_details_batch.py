@@ -0,0 +1,36 @@
+import asyncio
+
+from app import config
+
+
+def test_batch_details_dedupe_and_come_from_the_snapshot(monkeypatch, running_app):
+    async def run():
+        async with running_app(node_count=300) as (http, stub):
+            page = await http.get("/pnodes/?limit=300&fields=pubkey")
+            pubkeys = [p["pubkey"] for p in page.json()["pnodes"]]
+            single = await http.get(f"/pnodes/{pubkeys[0]}")
+            before = stub.http_requests
+            batch = await http.post("/pnodes/details", json={"pubkeys": pubkeys + pubkeys[:10] + ["missing"]})
+            round_trips = stub.http_requests - before
+            projected = await http.post("/pnodes/details", json={"pubkeys": pubkeys[:2], "fields": ["pubkey", "total_stake"]})
+            empty = await http.post("/pnodes/details", json={"pubkeys": []})
+            bad_fields = await http.post("/pnodes/details", json={"pubkeys": pubkeys[:2], "fields": ["bogus"]})
+            monkeypatch.setattr(config, "DETAILS_BATCH_MAX", 5)
+            too_many = await http.post("/pnodes/details", json={"pubkeys": pubkeys[:6]})
+            return pubkeys, single, batch, round_trips, projected, empty, bad_fields, too_many
+
+    pubkeys, single, batch, round_trips, projected, empty, bad_fields, too_many = asyncio.run(run())
+
+    body = batch.json()
+    assert batch.status_code == 200
+    assert (body["requested"], body["unique"], body["found"]) == (311, 301, 300)
+    assert [p["pubkey"] for p in body["pnodes"]] == pubkeys + ["missing"]
+    assert body["pnodes"][-1] == {"pubkey": "missing", "error": "not found"}
+    assert body["pnodes"][0] == single.json()
+    assert round_trips == 0  # answered from the current snapshot, not upstream
+
+    assert projected.json()["pnodes"] == [{"pubkey": p, "total_stake": d["total_stake"]}
+                                          for p, d in zip(pubkeys[:2], body["pnodes"][:2])]
+    assert empty.status_code == 422
+    assert bad_fields.status_code == 400
+    assert too_many.status_code == 400
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import socket
+
+from aiohttp import web
+
+from app.services.endpoint_discovery import (
+    HTTP_ERROR,
+    INVALID,
+    OK,
+    SKIPPED,
+    UNREACHABLE,
+    EndpointDiscovery,
+    load_endpoints,
+)
+from stub_rpc_server import StubRpcServer
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def html_page(request: web.Request) -> web.Response:
+    return web.Response(text="<html>hello</html>")
+
+
+async def html_server() -> web.AppRunner:
+    app = web.Application()
+    app.router.add_post("/", html_page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    return runner
+
+
+def test_discovery_probes_concurrently_and_skips_refusing_hosts(tmp_path):
+    closed = free_port()
+
+    async def run():
+        runner = await html_server()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        html_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        try:
+            async with StubRpcServer(node_count=5) as stub:
+                discovery = EndpointDiscovery(timeout=2.0)
+                report = await discovery.discover(
+                    targets={"testnet": [stub.url, f"http://127.0.0.1:{closed}", html_url]},
+                    ports=[""],
+                    paths=["", "/rpc", "/api"],
+                )
+                return report, stub.url, html_url, stub.http_requests
+        finally:
+            await runner.cleanup()
+
+    report, stub_url, html_url, stub_requests = asyncio.run(run())
+    statuses = {r.url: r.status for r in report.results}
+
+    working = report.working("testnet")
+    assert [r.url for r in working] == [stub_url]
+    assert working[0].batch and set(working[0].methods.values()) == {OK}
+    assert stub_requests == 1  # every method in one batch
+    assert statuses[f"{stub_url}/rpc"] == statuses[f"{stub_url}/api"] == HTTP_ERROR
+
+    refused = [status for url, status in statuses.items() if f":{closed}" in url]
+    assert refused == [UNREACHABLE, SKIPPED, SKIPPED]
+    assert report.skipped == 2
+    assert statuses[html_url] == INVALID
+
+    path = tmp_path / "endpoints.json"
+    report.save(str(path))
+    assert json.loads(path.read_text())["probed"] == 7
+    assert load_endpoints(str(path)) == {"testnet": [stub_url]}
+    assert load_endpoints(str(tmp_path / "missing.json")) == {}
+
+
+def test_probe_falls_back_to_single_requests_when_batches_are_rejected():
+    async def run():
+        async with StubRpcServer(node_count=5, reject_batches=True) as stub:
+            discovery = EndpointDiscovery(timeout=2.0)
+            report = await discovery.discover(targets={"testnet": [stub.url]}, ports=[""], paths=[""])
+            return report, stub.url, stub.http_requests, stub.method_calls, discovery.methods
+
+    report, stub_url, stub_requests, method_calls, methods = asyncio.run(run())
+
+    working = report.working("testnet")
+    assert [r.url for r in working] == [stub_url]
+    assert not working[0].batch and set(working[0].methods.values()) == {OK}
+    assert stub_requests == 1 + len(methods)  # the rejected batch, then one request object per method
+    assert all(method_calls[method] == 1 for method in methods)
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from app.services.endpoint_pool import CLOSED, OPEN, EndpointPool, NoEndpointAvailableError
+from stub_rpc_server import StubRpcServer
+
+CALLS = [("getEpochInfo", [])]
+
+
+def test_routes_to_the_lowest_latency_endpoint():
+    async def run():
+        async with StubRpcServer(latency=0.03) as slow, StubRpcServer() as fast, aiohttp.ClientSession() as session:
+            pool = EndpointPool(session, [slow.url, fast.url], hedge=False)
+            for _ in range(20):
+                await pool.batch(CALLS)
+            return slow.http_requests, fast.http_requests
+
+    slow_requests, fast_requests = asyncio.run(run())
+    assert slow_requests == 1  # sampled once, then avoided
+    assert fast_requests == 19
+
+
+def test_hedges_past_the_delay_and_takes_the_first_answer():
+    async def run():
+        async with StubRpcServer(slow_rate=1.0, slow_latency=1.0) as stalled, StubRpcServer() as healthy, \
+                aiohttp.ClientSession() as session:
+            pool = EndpointPool(session, [stalled.url, healthy.url], hedge_delay_ms=50)
+            started = time.perf_counter()
+            result = await pool.batch(CALLS)
+            return result, time.perf_counter() - started, pool.counters
+
+    result, elapsed, counters = asyncio.run(run())
+    assert result[0]["epoch"]
+    assert elapsed < 0.5
+    assert (counters.hedges, counters.hedge_wins) == (1, 1)
+
+
+def test_single_calls_are_not_sent_as_batches():
+    async def run():
+        async with StubRpcServer(reject_batches=True) as stub, aiohttp.ClientSession() as session:
+            pool = EndpointPool(session, [stub.url], hedge=False)
+            result = await pool.call("getEpochInfo")
+            return result, stub.http_requests
+
+    result, http_requests = asyncio.run(run())
+    assert result["epoch"]
+    assert http_requests == 1  # a plain request object, not a rejected one-element batch
+
+
+def test_circuit_opens_on_failures_and_recovers_through_a_probe():
+    async def run():
+        async with StubRpcServer() as flaky, StubRpcServer(latency=0.01) as backup, \
+                aiohttp.ClientSession() as session:
+            pool = EndpointPool(session, [flaky.url, backup.url], hedge=False, failure_threshold=2, reset_timeout=0.2)
+            flaky_endpoint = pool.endpoints[0]
+            flaky.down = True
+            for _ in range(2):
+                await pool.batch(CALLS)  # fails over to the backup
+            states = [flaky_endpoint.breaker.state]
+            requests_while_open = flaky.http_requests
+            await pool.batch(CALLS)
+            skipped = flaky.http_requests == requests_while_open
+
+            flaky.down = False
+            await asyncio.sleep(0.25)
+            await pool.batch(CALLS)  # half-open probe goes to the recovered endpoint
+            states.append(flaky_endpoint.breaker.state)
+
+            backup.down = True
+            flaky.down = True
+            for _ in range(2):
+                with pytest.raises(aiohttp.ClientResponseError):
+                    await pool.batch(CALLS)
+            with pytest.raises(NoEndpointAvailableError):
+                await pool.batch(CALLS)
+            return states, skipped, pool.counters
+
+    states, skipped, counters = asyncio.run(run())
+    assert states == [OPEN, CLOSED]
+    assert skipped
+    assert counters.failovers >= 2
+    assert counters.unavailable == 1
@@ -0,0 +1,108 @@
+import asyncio
+import csv
+import io
+from datetime import timedelta, timezone
+
+import orjson
+import pytest
+
+from app import config
+from app.main import app
+from app.services.history_store import EXPORT_AGGREGATES, HISTORY_METRICS, HistoryStore
+from test_history_store import T0, make_snapshot
+
+
+def test_rollup_export_matches_per_node_queries(tmp_path):
+    start = T0.replace(tzinfo=timezone.utc).timestamp()
+    pubkeys = ["A", "B", "C", "D"]
+
+    async def run():
+        history = HistoryStore(str(tmp_path / "history.sqlite3"))
+        history.open()
+        # Three closed minutes on disk plus an open one; D only shows up in the open minute
+        for i in range(8):
+            nodes = {"A": 100 + i, "B": 10 * i, "C": 5}
+            if i >= 6:
+                nodes["D"] = 1
+            history.record(make_snapshot(i, T0 + timedelta(seconds=30 * i), nodes))
+        expected = [await history.rollups("testnet", pubkey, "1m", start, start + 600) for pubkey in pubkeys]
+        chunks = [chunk async for chunk in await history.export_rollups(
+            "testnet", ["0", *pubkeys, "Z"], "1m", start, start + 600, chunk_rows=2)]
+        await history.close()
+        return expected, chunks
+
+    expected, chunks = asyncio.run(run())
+    flat = [
+        (pubkey, point["timestamp"], *(
+            None if point[metric] is None else point[metric][aggregate]
+            for metric in HISTORY_METRICS for aggregate in EXPORT_AGGREGATES
+        ))
+        for pubkey, points in zip(pubkeys, expected) for point in points
+    ]
+    assert len(chunks) > 1
+    assert [row for chunk in chunks for row in chunk] == flat
+    assert [row[0] for row in flat].count("D") == 1
+
+
+def export(monkeypatch, running_app, *paths):
+    async def run():
+        monkeypatch.setattr(config, "EXPORT_CHUNK_ROWS", 64)
+        async with running_app(node_count=300) as (http, _):
+            cache = app.state.snapshot_cache
+            await cache.get("testnet")
+            await cache.refresh("testnet")
+            return [await http.get(path) for path in paths]
+
+    return asyncio.run(run())
+
+
+def test_fleet_and_history_export(monkeypatch, running_app):
+    listing, fleet_csv, active_ndjson, history_csv, bad = export(
+        monkeypatch, running_app,
+        "/pnodes/?limit=500",
+        "/pnodes/export?format=csv",
+        "/pnodes/export?format=ndjson&active_only=true&fields=pubkey,stake,is_active",
+        "/pnodes/export/history?format=csv&resolution=raw&metric=performance_score",
+        "/pnodes/export?format=xml",
+    )
+    pnodes = listing.json()["pnodes"]
+
+    assert fleet_csv.headers["content-type"].startswith("text/csv")
+    assert 'filename="pnodes-testnet-v' in fleet_csv.headers["content-disposition"]
+    assert fleet_csv.headers["x-snapshot-version"] == str(listing.json()["snapshot_version"])
+    rows = list(csv.DictReader(io.StringIO(fleet_csv.text)))
+    assert [row["pubkey"] for row in rows] == [p["pubkey"] for p in pnodes]  # same order as /pnodes
+    assert [int(row["stake"]) for row in rows] == [p["stake"] for p in pnodes]
+
+    lines = [orjson.loads(line) for line in active_ndjson.text.splitlines()]
+    assert lines == [{"pubkey": p["pubkey"], "stake": p["stake"], "is_active": True} for p in pnodes if p["is_active"]]
+
+    samples = list(csv.DictReader(io.StringIO(history_csv.text)))
+    assert list(samples[0]) == ["pubkey", "timestamp", "performance_score"]
+    assert len({row["timestamp"] for row in samples}) == 2  # both snapshots
+    assert [row["pubkey"] for row in samples] == sorted(row["pubkey"] for row in samples)
+    assert bad.status_code == 422
+
+
+def test_parquet_export_writes_a_row_group_per_chunk(monkeypatch, running_app):
+    pq = pytest.importorskip("pyarrow.parquet")
+    listing, parquet = export(monkeypatch, running_app, "/pnodes/?limit=500", "/pnodes/export?format=parquet")
+
+    table = pq.ParquetFile(io.BytesIO(parquet.content))
+    assert table.metadata.num_rows == 300
+    assert table.metadata.num_row_groups == 5  # 300 rows / 64 per chunk
+    assert table.read(columns=["pubkey"]).column(0).to_pylist() == [p["pubkey"] for p in listing.json()["pnodes"]]
+
+
+def test_history_export_fails_before_streaming_when_the_store_cannot_be_read(monkeypatch, running_app):
+    async def run():
+        monkeypatch.setattr(config, "HISTORY_DB_PATH", ":memory:")
+        async with running_app(node_count=20) as (http, _):
+            rollups = await http.get("/pnodes/export/history?format=csv&resolution=1h")
+            raw = await http.get("/pnodes/export/history?format=csv&resolution=raw")
+            return rollups, raw
+
+    rollups, raw = asyncio.run(run())
+    assert rollups.status_code == 503
+    assert "cannot be exported" in rollups.json()["detail"]
+    assert raw.status_code == 200  # raw samples come from memory
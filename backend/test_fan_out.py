@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+from app import config
+from app.services.snapshot_cache import SnapshotCache
+from app.services.synthetic_fleet import SyntheticFleet
+from stub_rpc_server import StubRpcServer
+
+
+class SlowClient:
+    def __init__(self, delay: float, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+
+    async def fetch_snapshot(self):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        fleet = SyntheticFleet("demo", size=5)
+        return fleet.pnodes(), fleet.network_info()
+
+
+def test_get_many_is_concurrent_with_per_network_timeouts():
+    clients = {
+        "fast": SlowClient(0.3),
+        "also_fast": SlowClient(0.3),
+        "hung": SlowClient(30),
+        "broken": SlowClient(0.1, fail=True),
+    }
+
+    async def run():
+        cache = SnapshotCache(client_factory=clients.__getitem__, networks=list(clients))
+        started = time.perf_counter()
+        fan_out = await cache.get_many(list(clients) + ["nope"], timeout=0.6)
+        elapsed = time.perf_counter() - started
+        await cache.stop()
+        return fan_out, elapsed
+
+    fan_out, elapsed = asyncio.run(run())
+    assert elapsed < 1.0  # bounded by the timeout, not the sum of the delays
+    assert sorted(fan_out.snapshots) == ["also_fast", "fast"]
+    assert fan_out.partial
+    assert fan_out.errors["hung"].startswith("timed out")
+    assert fan_out.errors["broken"] == "upstream down"
+    assert fan_out.errors["nope"] == "unknown network"
+
+
+def test_network_all_and_compare(monkeypatch, running_app):
+    async def run():
+        testnet, mainnet = StubRpcServer(node_count=20), StubRpcServer(node_count=35, seed=7)
+        monkeypatch.setattr(config, "NETWORKS", ["testnet", "mainnet"])
+        async with running_app(stubs={"testnet": testnet, "mainnet": mainnet}) as (http, _):
+            summary = await http.get("/pnodes/stats/summary?network=all")
+            info = await http.get("/pnodes/network/info?network=all")
+            compare = await http.get("/pnodes/stats/compare")
+            again = await http.get("/pnodes/stats/compare", headers={"If-None-Match": compare.headers["etag"]})
+            one = await http.get("/pnodes/stats/compare?networks=mainnet")
+            unknown = await http.get("/pnodes/stats/compare?networks=devnet")
+            listing = await http.get("/pnodes/?network=all")
+            return summary, info, compare, again, one, unknown, listing
+
+    summary, info, compare, again, one, unknown, listing = asyncio.run(run())
+
+    assert summary.status_code == 200
+    body = summary.json()
+    assert body["partial"] is False and body["errors"] == {}
+    assert {n: s["total_pnodes"] for n, s in body["networks"].items()} == {"testnet": 20, "mainnet": 35}
+    assert set(info.json()["networks"]) == {"testnet", "mainnet"}
+
+    networks = compare.json()["networks"]
+    assert networks["mainnet"]["summary"]["total_pnodes"] == 35
+    assert "epoch" in networks["testnet"]["network_info"]
+    assert compare.json()["totals"]["total_pnodes"] == 55
+    assert again.status_code == 304
+    assert list(one.json()["networks"]) == ["mainnet"]
+    assert unknown.status_code == 404
+    assert listing.status_code == 400
+
+
+def test_snapshots_are_prepared_off_the_event_loop():
+    calls = []
+
+    async def run():
+        cache = SnapshotCache(client_factory=lambda network: SlowClient(0), networks=["demo"])
+        loop_thread = threading.get_ident()
+
+        def seen(step):
+            # (step, version, on a worker thread, already published)
+            return lambda snapshot: calls.append(
+                (step, snapshot.version, threading.get_ident() != loop_thread, cache.peek("demo") is snapshot))
+
+        cache.add_listener(seen("record"), prepare=seen("prepare"))
+        await cache.refresh("demo")
+        return await cache.refresh("demo")
+
+    second = asyncio.run(run())
+    assert calls == [
+        ("prepare", 1, True, False), ("record", 1, False, True),
+        ("prepare", 2, True, False), ("record", 2, False, True),
+    ]
+    assert second.diff is not None and second.diff.from_version == 1
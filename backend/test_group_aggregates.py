@@ -0,0 +1,109 @@
+import asyncio
+import dataclasses
+import random
+from datetime import datetime
+
+from app.services.group_aggregates import GROUP_DIMENSIONS, GroupAggregates
+from app.services.pnode_store import PNodeStore
+from app.services.snapshot_cache import Snapshot
+from app.services.snapshot_diff import REBUILD_FRACTION, diff_stores
+from app.services.synthetic_fleet import SyntheticFleet
+
+NOW = datetime(2024, 1, 1)
+
+
+def make_snapshot(version, pnodes, previous=None):
+    store = PNodeStore(pnodes)
+    diff = diff_stores(previous.store, store, previous.version, version) if previous else None
+    return Snapshot(network="testnet", version=version, pnodes=pnodes, network_info={}, store=store, diff=diff)
+
+
+def nudge(pnodes, rng, count=40):
+    """``pnodes`` with ``count`` of them regrouped and one replaced by a newcomer: a small diff"""
+    pnodes = list(pnodes)
+    for i in rng.sample(range(len(pnodes)), count):
+        pnodes[i] = dataclasses.replace(
+            pnodes[i], version=rng.choice(["0.9.0", "1.0.0", "1.1.0"]), is_active=rng.random() < 0.8,
+            stake=rng.randrange(10**9))
+    gone = pnodes.pop(rng.randrange(len(pnodes)))
+    pnodes.append(dataclasses.replace(gone, pubkey=f"new-{rng.random()}"))
+    return pnodes
+
+
+def distributions(groups, snapshot, dimensions=GROUP_DIMENSIONS):
+    return asyncio.run(groups.distributions(snapshot, dimensions))
+
+
+def test_incremental_updates_match_a_full_rebuild():
+    rng = random.Random(3)
+    fleet = SyntheticFleet("testnet", size=2000, churn_rate=0.05, seed=3)
+    incremental = GroupAggregates()
+    snapshot = make_snapshot(1, fleet.pnodes(NOW))
+    incremental.record(snapshot)
+    for version in range(2, 7):
+        snapshot = make_snapshot(version, nudge(snapshot.pnodes, rng), snapshot)
+        incremental.record(snapshot)
+
+    rebuilt = GroupAggregates()
+    assert distributions(incremental, snapshot) == distributions(rebuilt, snapshot)
+    assert (incremental.rebuilds, incremental.incremental_updates) == (1, 5)
+
+    versions = distributions(incremental, snapshot, ["version"])["version"]
+    assert sum(row["nodes"] for row in versions) == 2000
+    assert sum(row["stake"] for row in versions) == int(snapshot.store.stake.sum())
+    assert [row["nodes"] for row in versions] == sorted((row["nodes"] for row in versions), reverse=True)
+
+
+def test_full_churn_is_rebuilt_off_the_loop():
+    fleet = SyntheticFleet("testnet", size=2000, churn_rate=0.05, seed=3)
+    groups = GroupAggregates()
+    first = make_snapshot(1, fleet.pnodes(NOW))
+    groups.record(first)
+    fleet.tick()  # drifts every node
+    second = make_snapshot(2, fleet.pnodes(NOW), first)
+    assert second.diff.touched > REBUILD_FRACTION * len(second.store)
+
+    groups.prepare(second)
+    assert groups.networks["testnet"].version == 1  # untouched until record swaps the rebuild in
+    groups.record(second)
+    assert (groups.rebuilds, groups.incremental_updates) == (2, 0)
+    assert distributions(groups, second) == distributions(GroupAggregates(), second)
+
+
+def test_missed_version_falls_back_to_a_rebuild():
+    groups = GroupAggregates()
+    first = make_snapshot(1, [{"pubkey": "a", "version": "1.0", "is_active": True, "stake": 5}])
+    second = make_snapshot(2, [{"pubkey": "a", "version": "1.1", "is_active": False, "stake": 5}], first)
+    third = make_snapshot(3, [{"pubkey": "a", "version": "1.1", "is_active": True, "stake": 7}], second)
+    groups.record(first)
+    groups.record(third)  # version 2 never reached the listener
+
+    assert groups.rebuilds == 2
+    assert distributions(groups, third, ["version"])["version"] == [{
+        "value": "1.1", "nodes": 1, "active": 1, "inactive": 0, "active_ratio": 1.0,
+        "node_share": 1.0, "stake": 7, "active_stake": 7, "stake_share": 1.0,
+    }]
+
+    # A request still holding an older snapshot reads the newer tables rather than rebuilding them
+    assert asyncio.run(groups.for_snapshot(second)) is groups.networks["testnet"]
+    assert (groups.networks["testnet"].version, groups.rebuilds) == (3, 2)
+
+
+def test_distribution_endpoint(running_app):
+    async def run():
+        async with running_app(node_count=200) as (http, _):
+            full = await http.get("/pnodes/stats/distribution")
+            cached = await http.get("/pnodes/stats/distribution", headers={"If-None-Match": full.headers["etag"]})
+            one = await http.get("/pnodes/stats/distribution?by=data_center")
+            bad = await http.get("/pnodes/stats/distribution?by=stake")
+            return full, cached, one, bad
+
+    full, cached, one, bad = asyncio.run(run())
+    body = full.json()
+    assert full.status_code == 200
+    assert set(body["distributions"]) == set(GROUP_DIMENSIONS)
+    for rows in body["distributions"].values():
+        assert sum(row["nodes"] for row in rows) == body["total_pnodes"] == 200
+    assert cached.status_code == 304
+    assert list(one.json()["distributions"]) == ["data_center"]
+    assert bad.status_code == 400
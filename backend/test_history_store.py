@@ -0,0 +1,104 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+
+from app.main import app
+from app.services.history_store import HistoryStore
+from app.services.pnode_store import PNodeStore
+from app.services.snapshot_cache import Snapshot
+
+# Start of a recent minute (older rollups would fall outside retention)
+T0 = datetime.utcnow().replace(second=0, microsecond=0) - timedelta(minutes=10)
+
+
+def make_snapshot(version, at, response_times, active=True):
+    pnodes = [
+        {"pubkey": pubkey, "response_time_ms": rt, "performance_score": 0.9, "peer_count": 40,
+         "uptime_24h": None, "is_active": active, "stake": 1}
+        for pubkey, rt in response_times.items()
+    ]
+    return Snapshot("testnet", version, pnodes, {}, PNodeStore(pnodes), fetched_at=at)
+
+
+def test_rollups_persist_and_merge_with_open_bucket(tmp_path):
+    path = str(tmp_path / "history.sqlite3")
+    start = T0.replace(tzinfo=timezone.utc).timestamp()
+
+    async def record_and_query():
+        history = HistoryStore(path, capacity=4)
+        history.open()
+        # Three samples in the first minute, two in the next, the last one inactive
+        for i, (offset, rt) in enumerate([(0, 100), (20, 300), (40, 200), (60, 50), (90, 70)]):
+            history.record(make_snapshot(i, T0 + timedelta(seconds=offset), {"A": rt, "B": 10}, active=i < 4))
+        live = await history.rollups("testnet", "A", "1m", start, start + 120)
+        raw = await history.raw("testnet", "A", start, start + 120, ["response_time_ms"])
+        await history.close()
+
+        reopened = HistoryStore(path)
+        reopened.open()
+        persisted = await reopened.rollups("testnet", "A", "1m", start, start + 120, ["response_time_ms", "is_active"])
+        uptime = await reopened.uptime_percent("testnet", "A", start, start + 3600)
+        await reopened.close()
+        return live, raw, persisted, uptime
+
+    live, raw, persisted, uptime = asyncio.run(record_and_query())
+
+    first, second = live
+    assert first["response_time_ms"] == {"min": 100, "max": 300, "avg": 200, "last": 200, "count": 3}
+    assert second["timestamp"] == first["timestamp"] + 60
+    assert second["response_time_ms"]["last"] == 70
+    # Ring buffer keeps only the 4 most recent samples
+    assert [p["response_time_ms"] for p in raw] == [300, 200, 50, 70]
+    assert [p["response_time_ms"] for p in persisted] == [first["response_time_ms"], second["response_time_ms"]]
+    assert persisted[1]["is_active"]["avg"] == 0.5
+    assert uptime == 80.0
+
+
+def test_readers_do_not_wait_for_rollup_writes(tmp_path):
+    start = T0.replace(tzinfo=timezone.utc).timestamp()
+    release = threading.Event()
+
+    async def run():
+        history = HistoryStore(str(tmp_path / "history.sqlite3"))
+        history.open()
+        write = history._write
+        history._write = lambda closed: release.wait(5) and write(closed)
+        for i, (offset, rt) in enumerate([(0, 100), (30, 300), (60, 50)]):
+            history.record(make_snapshot(i, T0 + timedelta(seconds=offset), {"A": rt}))
+        # The first minute closed but its write is stuck: readers serve it from memory
+        while_writing = await asyncio.wait_for(history.rollups("testnet", "A", "1m", start, start + 120), 1)
+        uptime_while_writing = await asyncio.wait_for(history.uptime_percent("testnet", "A", start, start + 3600), 1)
+        release.set()
+        while history._writes:
+            await asyncio.sleep(0.01)
+        written = await history.rollups("testnet", "A", "1m", start, start + 120)
+        await history.close()
+        return while_writing, uptime_while_writing, written
+
+    while_writing, uptime_while_writing, written = asyncio.run(run())
+
+    assert while_writing == written
+    assert written[0]["response_time_ms"] == {"min": 100, "max": 300, "avg": 200, "last": 300, "count": 2}
+    assert uptime_while_writing == 100.0
+
+
+def test_history_endpoint(running_app):
+    async def run():
+        async with running_app(node_count=10) as (http, _):
+            cache = app.state.snapshot_cache
+            snapshot = await cache.get("testnet")
+            await cache.refresh("testnet")
+            pubkey = snapshot.pnodes[0]["pubkey"]
+            raw = await http.get(f"/pnodes/{pubkey}/history", params={"metric": "performance_score", "resolution": "raw"})
+            rollup = await http.get(f"/pnodes/{pubkey}/history", params={"resolution": "1h"})
+            bad = await http.get(f"/pnodes/{pubkey}/history", params={"metric": "nope"})
+            return raw, rollup, bad
+
+    raw, rollup, bad = asyncio.run(run())
+    assert raw.status_code == 200
+    assert raw.json()["resolution"] == "raw"
+    assert len(raw.json()["points"]) == 2
+    assert set(raw.json()["points"][0]) == {"timestamp", "performance_score"}
+    points = rollup.json()["points"]
+    assert sum(p["is_active"]["count"] for p in points) == 2
+    assert bad.status_code == 400
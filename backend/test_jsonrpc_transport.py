@@ -0,0 +1,53 @@
+import asyncio
+
+from app.services.jsonrpc import JsonRpcError
+from app.services.xandeum_client import XandeumPRPCClient
+from stub_rpc_server import StubRpcServer
+
+PNODE_KEYS = {
+    "pubkey", "ip", "version", "is_active", "last_seen", "stake", "commission",
+    "data_center", "performance_score", "uptime_24h", "vote_success_rate",
+    "response_time_ms", "peer_count", "network", "is_real_data", "status",
+    "location", "last_vote", "epoch_credits",
+}
+
+
+def test_snapshot_is_one_batched_round_trip():
+    async def run():
+        async with StubRpcServer(node_count=20) as stub:
+            client = XandeumPRPCClient(network="testnet", rpc_url=stub.url)
+            pnodes, network_info = await client.fetch_snapshot()
+            await client.close()
+            return stub, pnodes, network_info
+
+    stub, pnodes, network_info = asyncio.run(run())
+
+    assert stub.http_requests == 1
+    assert stub.method_calls == {"getClusterNodes": 1, "getVoteAccounts": 1, "getEpochInfo": 1}
+    assert len(pnodes) == 20
+    assert all(set(p) == PNODE_KEYS for p in pnodes)
+    assert [p["stake"] for p in pnodes] == sorted((p["stake"] for p in pnodes), reverse=True)
+    assert network_info["slot"] == stub.slot
+    assert network_info["current_validators"] == sum(p["is_active"] for p in pnodes)
+
+
+def test_batch_returns_per_call_errors():
+    async def run():
+        async with StubRpcServer(node_count=1) as stub:
+            client = XandeumPRPCClient(network="testnet", rpc_url=stub.url)
+            await client.connect()
+            results = await client.transport.batch(
+                [("getEpochInfo", []), ("noSuchMethod", [])], return_exceptions=True
+            )
+            try:
+                await client.transport.call("noSuchMethod")
+            except JsonRpcError as e:
+                raised = e
+            await client.close()
+            return results, raised
+
+    results, raised = asyncio.run(run())
+
+    assert results[0]["absoluteSlot"] > 0
+    assert isinstance(results[1], JsonRpcError) and results[1].code == -32601
+    assert raised.method == "noSuchMethod"
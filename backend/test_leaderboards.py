@@ -0,0 +1,125 @@
+import asyncio
+import dataclasses
+import random
+from datetime import datetime
+
+from app.services.leaderboards import LEADERBOARD_METRICS, Leaderboards, OrderStatisticList
+from app.services.pnode_store import PNodeStore
+from app.services.snapshot_cache import Snapshot
+from app.services.snapshot_diff import REBUILD_FRACTION, diff_stores
+from app.services.synthetic_fleet import SyntheticFleet
+
+NOW = datetime(2024, 1, 1)
+
+
+def make_snapshot(version, pnodes, previous=None):
+    store = PNodeStore(pnodes)
+    diff = diff_stores(previous.store, store, previous.version, version) if previous else None
+    return Snapshot(network="testnet", version=version, pnodes=pnodes, network_info={}, store=store, diff=diff)
+
+
+def test_order_statistic_list_matches_a_sorted_list():
+    rng = random.Random(5)
+    expected = sorted(rng.sample(range(100_000), 500))
+    keys = OrderStatisticList(expected, load=8)
+    for _ in range(3000):
+        if expected and rng.random() < 0.5:
+            key = expected.pop(rng.randrange(len(expected)))
+            keys.remove(key)
+        else:
+            key = rng.randrange(100_000)
+            if key in expected:
+                continue
+            expected.insert(sum(k < key for k in expected), key)
+            keys.add(key)
+    assert len(keys) == len(expected)
+    assert list(keys.islice(0, len(keys))) == expected
+    assert list(keys.islice(37, 61)) == expected[37:61]
+    assert all(keys.rank(key) == i for i, key in enumerate(expected))
+    assert keys[len(expected) - 1] == expected[-1]
+    assert keys.rank(-1) is None
+
+
+def nudge(pnodes, rng, count=40):
+    """``pnodes`` with ``count`` of them re-scored and one replaced by a newcomer: a small diff"""
+    pnodes = list(pnodes)
+    for i in rng.sample(range(len(pnodes)), count):
+        pnodes[i] = dataclasses.replace(
+            pnodes[i], stake=rng.randrange(10**9), performance_score=rng.random(), response_time_ms=rng.uniform(10, 500))
+    gone = pnodes.pop(rng.randrange(len(pnodes)))
+    pnodes.append(dataclasses.replace(gone, pubkey=f"new-{rng.random()}"))
+    return pnodes
+
+
+def assert_matches_a_full_sort(boards, snapshot):
+    store = snapshot.store
+    current = asyncio.run(boards.for_snapshot(snapshot))
+    for metric, descending in LEADERBOARD_METRICS.items():
+        order = store.sorted_rows(metric, descending)
+        ranked = [store.pubkeys[row] for row in order if store.get(store.pubkeys[row]).get(metric) is not None]
+        assert [pubkey for _, pubkey in current.top(metric, 50)] == ranked[:50]
+        assert [pubkey for _, pubkey in current.top(metric, 5, skip=100)] == ranked[100:105]
+        for pubkey in ranked[::97]:
+            assert current.rank(metric, pubkey) == ranked.index(pubkey) + 1
+
+
+def test_incremental_boards_match_a_full_sort():
+    rng = random.Random(11)
+    fleet = SyntheticFleet("testnet", size=2000, churn_rate=0.05, seed=11)
+    boards = Leaderboards()
+    snapshot = make_snapshot(1, fleet.pnodes(NOW))
+    boards.record(snapshot)
+    for version in range(2, 6):
+        snapshot = make_snapshot(version, nudge(snapshot.pnodes, rng), snapshot)
+        boards.record(snapshot)
+    assert (boards.rebuilds, boards.incremental_updates) == (1, 4)
+    assert_matches_a_full_sort(boards, snapshot)
+
+    # A tick drifts every node: past REBUILD_FRACTION the boards are rebuilt, off the loop
+    fleet.tick()
+    snapshot = make_snapshot(6, fleet.pnodes(NOW), snapshot)
+    assert snapshot.diff.touched > REBUILD_FRACTION * len(snapshot.store)
+    boards.prepare(snapshot)
+    assert boards.networks["testnet"].version == 5  # untouched until record swaps the rebuild in
+    boards.record(snapshot)
+    assert (boards.rebuilds, boards.incremental_updates) == (2, 4)
+    assert_matches_a_full_sort(boards, snapshot)
+
+
+def test_older_snapshots_do_not_wind_the_boards_back():
+    rng = random.Random(5)
+    fleet = SyntheticFleet("testnet", size=500, seed=5)
+    first = make_snapshot(1, fleet.pnodes(NOW))
+    second = make_snapshot(2, nudge(first.pnodes, rng, count=10), first)
+
+    boards = Leaderboards()
+    # Boards no listener built (a restored snapshot) are built for the request
+    assert asyncio.run(boards.for_snapshot(first)).version == 1
+    boards.record(second)
+    assert asyncio.run(boards.for_snapshot(first)).version == 2
+    assert (boards.rebuilds, boards.incremental_updates) == (1, 1)
+
+
+def test_leaderboard_endpoints(running_app):
+    async def run():
+        async with running_app(node_count=200) as (http, _):
+            stake = await http.get("/pnodes/leaderboards/stake?limit=5&fields=pubkey,stake")
+            commission = await http.get("/pnodes/leaderboards/commission?limit=200")
+            leader = stake.json()["entries"][0]["pnode"]["pubkey"]
+            ranks = await http.get(f"/pnodes/{leader}/ranks")
+            unknown = await http.get("/pnodes/leaderboards/peer_count")
+            missing = await http.get("/pnodes/nobody/ranks")
+            return stake, commission, ranks, unknown, missing
+
+    stake, commission, ranks, unknown, missing = asyncio.run(run())
+    entries = stake.json()["entries"]
+    assert stake.status_code == 200
+    assert [e["rank"] for e in entries] == [1, 2, 3, 4, 5]
+    assert [e["value"] for e in entries] == sorted((e["value"] for e in entries), reverse=True)
+    assert set(entries[0]["pnode"]) == {"pubkey", "stake"}
+    values = [e["value"] for e in commission.json()["entries"]]
+    assert commission.json()["order"] == "asc" and values == sorted(values)
+    assert ranks.json()["ranks"]["stake"]["rank"] == 1
+    assert ranks.json()["ranks"]["stake"]["of"] == 200
+    assert unknown.status_code == 404
+    assert missing.status_code == 404
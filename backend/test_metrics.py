@@ -0,0 +1,56 @@
+import asyncio
+
+from app.services.metrics import Histogram, Registry
+
+
+def sample(text: str, prefix: str) -> float:
+    """Value of the first exposition line starting with ``prefix``"""
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"no sample {prefix!r}")
+
+
+def test_histogram_exposition_is_cumulative():
+    registry = Registry()
+    histogram = registry.register(Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe("/a", value=value)
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert sample(text, 'latency_seconds_bucket{route="/a",le="0.1"}') == 2
+    assert sample(text, 'latency_seconds_bucket{route="/a",le="1"}') == 3
+    assert sample(text, 'latency_seconds_bucket{route="/a",le="+Inf"}') == 4
+    assert sample(text, 'latency_seconds_count{route="/a"}') == 4
+    assert sample(text, 'latency_seconds_sum{route="/a"}') == 3.65
+
+
+def test_metrics_endpoint_reports_routes_upstream_and_caches(running_app):
+    async def run():
+        async with running_app(node_count=50) as (http, _):
+            page = await http.get("/pnodes/?limit=5")
+            await http.get("/pnodes/?limit=5")
+            await http.get(f"/pnodes/{page.json()['pnodes'][0]['pubkey']}")
+            await http.get("/no/such/path")
+            await http.delete("/pnodes/?limit=5")
+            return await http.get("/metrics")
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+
+    assert sample(text, 'http_requests_total{route="/pnodes/",method="GET",status="200"}') >= 2
+    assert sample(text, 'http_requests_total{route="/pnodes/{pubkey}",method="GET",status="200"}') >= 1
+    assert sample(text, 'http_requests_total{route="unmatched",method="GET",status="404"}') >= 1
+    assert sample(text, 'http_requests_total{route="/pnodes/",method="DELETE",status="405"}') == 1
+    assert sample(text, 'http_request_duration_seconds_count{route="/pnodes/",method="GET"}') >= 2
+    # The scrape itself is still in flight
+    assert sample(text, 'http_requests_in_flight{route="/metrics"}') == 1
+    assert sample(text, 'http_requests_in_flight{route="/pnodes/"}') == 0
+
+    assert sample(text, 'upstream_rpc_duration_seconds_count{method="getClusterNodes"}') >= 1
+    assert sample(text, 'snapshot_refresh_duration_seconds_count{network="testnet"}') >= 1
+    assert sample(text, 'snapshot_age_seconds{network="testnet"}') >= 0
+    assert sample(text, "response_cache_hits_total") >= 1
+    assert sample(text, 'response_serialization_seconds_count{route="/pnodes/"}') >= 1
@@ -0,0 +1,71 @@
+import asyncio
+
+from app import config
+from app.main import app
+from app.services.pagination import decode_cursor, encode_cursor
+
+
+async def walk(http, cache, path, refresh_between_pages):
+    pages = []
+    url = path
+    while url:
+        page = (await http.get(url)).json()
+        pages.append(page)
+        if refresh_between_pages:
+            await cache.refresh("testnet")
+        url = f"{path}&cursor={page['next_cursor']}" if page["next_cursor"] else None
+    return pages
+
+
+def run_walk(monkeypatch, running_app, retain, path="/pnodes/?network=testnet&limit=7"):
+    monkeypatch.setattr(config, "SNAPSHOT_RETAIN", retain)
+
+    async def run():
+        async with running_app(stubs={}) as (http, _):
+            cache = app.state.snapshot_cache
+            first = await cache.get("testnet")
+            pages = await walk(http, cache, path, refresh_between_pages=True)
+            return first, pages
+
+    return asyncio.run(run())
+
+
+def test_cursor_walk_stays_on_its_snapshot(monkeypatch, running_app):
+    first, pages = run_walk(monkeypatch, running_app, retain=10)
+
+    pubkeys = [p["pubkey"] for page in pages for p in page["pnodes"]]
+    assert pubkeys == [p["pubkey"] for p in first.pnodes]
+    assert {page["snapshot_version"] for page in pages} == {first.version}
+
+
+def test_cursor_falls_back_to_keyset_seek_when_snapshot_evicted(monkeypatch, running_app):
+    first, pages = run_walk(monkeypatch, running_app, retain=1, path="/pnodes/?network=testnet&limit=7&sort_by=commission&order=asc")
+
+    rows = [p for page in pages for p in page["pnodes"]]
+    pubkeys = [p["pubkey"] for p in rows]
+    assert len(pubkeys) == len(set(pubkeys))
+    commissions = [p["commission"] for p in rows]
+    assert commissions == sorted(commissions)
+    assert len({page["snapshot_version"] for page in pages}) > 1
+
+
+def test_cursor_rejected_for_other_filters(running_app):
+    async def run():
+        async with running_app(stubs={}) as (http, _):
+            page = (await http.get("/pnodes/?limit=5")).json()
+            return await http.get(f"/pnodes/?limit=5&sort_by=commission&cursor={page['next_cursor']}")
+
+    assert asyncio.run(run()).status_code == 400
+
+
+def test_cursor_with_mistyped_key_rejected(running_app):
+    async def run():
+        async with running_app(stubs={}) as (http, _):
+            page = (await http.get("/pnodes/?limit=5&sort_by=commission")).json()
+            cursor = decode_cursor(page["next_cursor"])
+            cursor.last_value = "abc"
+            return await http.get(f"/pnodes/?limit=5&sort_by=commission&cursor={encode_cursor(cursor)}")
+
+    response = asyncio.run(run())
+    assert response.status_code == 400
+    assert "sort column" in response.json()["detail"]
@@ -0,0 +1,105 @@
+import math
+import random
+
+from app.services.pnode_store import PNodeQuery, PNodeStore
+
+
+def make_pnodes(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "pubkey": f"node{i}",
+            "is_active": rng.random() > 0.1,
+            "stake": rng.choice([0, rng.randint(100_000, 10_000_000)]),
+            "commission": rng.uniform(0, 10),
+            "performance_score": rng.uniform(0.5, 1.0),
+            "uptime_24h": rng.choice([None, rng.uniform(85, 100)]),
+            "response_time_ms": rng.randint(50, 300),
+            "status": rng.choice(["active", "inactive"]),
+            "version": rng.choice(["1.2.0", "1.1.5", "1.1.4"]),
+            "data_center": rng.choice(["AWS us-east-1", "Hetzner eu-central-1", None]),
+            "ip": f"10.0.{rng.randint(0, 9)}.{i % 256}",
+        }
+        for i in range(count)
+    ]
+
+
+def test_summary_matches_list_comprehensions():
+    pnodes = make_pnodes(1000)
+    summary = PNodeStore(pnodes).summary
+
+    active = [p for p in pnodes if p["is_active"]]
+    commissions = [p["commission"] for p in active if p["stake"] > 0]
+    latencies = sorted(p["response_time_ms"] for p in active)
+
+    assert summary["total_pnodes"] == 1000
+    assert summary["active_pnodes"] == len(active)
+    assert summary["total_stake"] == sum(p["stake"] for p in active)
+    assert summary["avg_commission"] == round(sum(commissions) / len(commissions), 2)
+    assert math.isclose(
+        summary["avg_performance"],
+        round(sum(p["performance_score"] for p in active) / len(active), 3),
+    )
+    assert summary["high_performers"] == len([p for p in active if p["performance_score"] > 0.9])
+    assert summary["low_commission_nodes"] == len([p for p in active if p["commission"] < 3.0])
+    assert latencies[0] <= summary["latency_ms"]["p50"] <= summary["latency_ms"]["p99"] <= latencies[-1]
+
+
+def test_empty_store():
+    summary = PNodeStore([]).summary
+    assert summary["total_pnodes"] == 0
+    assert summary["avg_commission"] == 0
+    assert summary["latency_ms"] == {"p50": None, "p95": None, "p99": None}
+
+
+def test_select_matches_brute_force():
+    pnodes = make_pnodes(2000)
+    store = PNodeStore(pnodes)
+    query = PNodeQuery(
+        version=["1.2.0", "1.1.5"],
+        status=["active"],
+        min_stake=1_000_000,
+        max_commission=6.0,
+        sort_by="commission",
+        descending=False,
+    )
+
+    rows = store.select(query)
+
+    expected = sorted(
+        (
+            p for p in pnodes
+            if p["version"] in ("1.2.0", "1.1.5") and p["status"] == "active"
+            and p["stake"] >= 1_000_000 and p["commission"] <= 6.0
+        ),
+        key=lambda p: (p["commission"], p["pubkey"]),
+    )
+    assert [store.pnodes[r]["pubkey"] for r in rows] == [p["pubkey"] for p in expected]
+
+
+def test_select_search_and_missing_values_sort_last():
+    pnodes = make_pnodes(500)
+    store = PNodeStore(pnodes)
+
+    found = {store.pnodes[r]["pubkey"] for r in store.select(PNodeQuery(search="hetzner"))}
+    assert found == {p["pubkey"] for p in pnodes if p["data_center"] == "Hetzner eu-central-1"}
+
+    found = {store.pnodes[r]["pubkey"] for r in store.select(PNodeQuery(search="10.0.3."))}
+    assert found == {p["pubkey"] for p in pnodes if p["ip"].startswith("10.0.3.")}
+
+    for descending in (True, False):
+        rows = store.select(PNodeQuery(sort_by="uptime_24h", descending=descending))
+        uptimes = [store.pnodes[r]["uptime_24h"] for r in rows]
+        present = [u for u in uptimes if u is not None]
+        assert uptimes[len(present):] == [None] * (len(uptimes) - len(present))
+        assert present == sorted(present, reverse=descending)
+
+
+def test_select_repeated_filter_values_match_each_row_once():
+    pnodes = make_pnodes(500)
+    store = PNodeStore(pnodes)
+
+    once = store.select(PNodeQuery(version=["1.2.0"]))
+    repeated = store.select(PNodeQuery(version=["1.2.0", "1.2.0"]))
+    assert repeated.tolist() == once.tolist()
+    assert len(once) == len([p for p in pnodes if p["version"] == "1.2.0"])
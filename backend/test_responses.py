@@ -0,0 +1,53 @@
+import asyncio
+
+import orjson
+
+from app.main import app
+from app.services.pnode_store import PNodeStore
+
+
+def test_project_matches_full_records():
+    pnodes = [
+        {"pubkey": "a", "stake": 5, "ip": None, "commission": 1.5},
+        {"pubkey": "b", "stake": 7, "ip": "10.0.0.1", "commission": 2.0},
+    ]
+    store = PNodeStore(pnodes)
+    assert orjson.loads(store.project([1, 0], ["pubkey", "ip"])) == [
+        {"pubkey": "b", "ip": "10.0.0.1"},
+        {"pubkey": "a", "ip": None},
+    ]
+    assert store.project([], ["pubkey"]) == b"[]"
+
+
+def test_fields_projection_and_cached_compression(running_app):
+    async def run():
+        async with running_app(node_count=200) as (http, _):
+            plain = await http.get("/pnodes/?limit=50", headers={"Accept-Encoding": "identity"})
+            projected = await http.get("/pnodes/?limit=50&fields=pubkey,stake", headers={"Accept-Encoding": "identity"})
+            bad = await http.get("/pnodes/?fields=pubkey,nope")
+            gzipped = await http.get("/pnodes/?limit=50", headers={"Accept-Encoding": "gzip"})
+            again = await http.get("/pnodes/?limit=50", headers={"Accept-Encoding": "gzip"})
+            br = await http.get("/pnodes/?limit=50", headers={"Accept-Encoding": "gzip, br"})
+            pubkey = plain.json()["pnodes"][0]["pubkey"]
+            detail = await http.get(f"/pnodes/{pubkey}?fields=pubkey,total_stake")
+            bad_detail = await http.get(f"/pnodes/{pubkey}?fields=bogus")
+            return plain, projected, bad, gzipped, again, br, detail, bad_detail, app.state.response_cache.to_dict()
+
+    plain, projected, bad, gzipped, again, br, detail, bad_detail, cache_stats = asyncio.run(run())
+
+    full = plain.json()
+    assert "content-encoding" not in plain.headers
+    assert projected.json()["pnodes"] == [{"pubkey": p["pubkey"], "stake": p["stake"]} for p in full["pnodes"]]
+    assert projected.json()["next_cursor"] == full["next_cursor"]
+    assert bad.status_code == 400
+
+    # httpx decodes both codings transparently
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.json() == full
+    assert again.headers["etag"] == gzipped.headers["etag"] != plain.headers["etag"]
+    assert br.headers["content-encoding"] == "br"
+    assert br.json() == full
+    assert cache_stats["hits"] >= 1
+
+    assert detail.json() == {"pubkey": full["pnodes"][0]["pubkey"], "total_stake": full["pnodes"][0]["stake"]}
+    assert bad_detail.status_code == 400
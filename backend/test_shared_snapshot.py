@@ -0,0 +1,63 @@
+import asyncio
+
+import numpy as np
+
+from app.services.shared_snapshot import SharedSnapshotCache
+from app.services.synthetic_fleet import SyntheticFleet
+
+
+class CountingClient:
+    def __init__(self, fleet: SyntheticFleet):
+        self.fleet = fleet
+        self.fetches = 0
+
+    async def fetch_snapshot(self):
+        self.fetches += 1
+        self.fleet.tick()
+        return self.fleet.pnodes(), self.fleet.network_info()
+
+
+def test_one_refresher_and_every_worker_serves_its_version(tmp_path):
+    client = CountingClient(SyntheticFleet("demo", size=300, churn_rate=0.05))
+
+    def workers():
+        return [SharedSnapshotCache(lambda network: client, ["demo"], str(tmp_path), refresh_interval=3600,
+                                    sync_interval=0.05)
+                for _ in range(3)]
+
+    async def run():
+        leader, *followers = workers()
+        first = await leader.get("demo")
+        seen_first = [await follower.get("demo") for follower in followers]
+        for follower in followers:
+            await follower.refresh("demo")  # followers never fetch
+        await leader.refresh("demo")
+        # Requests do not look at the file; the background sync picks the new version up
+        not_yet = await followers[0].get("demo")
+        for follower in followers:
+            await follower.start()
+        await asyncio.sleep(0.3)
+        seen_second = [await cache.get("demo") for cache in (leader, *followers)]
+        roles = [cache.is_leader for cache in (leader, *followers)]
+
+        await leader.stop()  # releases the lease
+        await followers[0].refresh("demo")
+        await asyncio.sleep(0.3)
+        takeover = await followers[1].get("demo")
+        took_over = followers[0].is_leader
+        for follower in followers:
+            await follower.stop()
+        return first, seen_first, not_yet, seen_second, roles, took_over, takeover
+
+    first, seen_first, not_yet, seen_second, roles, took_over, takeover = asyncio.run(run())
+    assert roles == [True, False, False]
+    assert [s.version for s in seen_first] == [1, 1]
+    assert not_yet.version == 1
+    assert [s.version for s in seen_second] == [2, 2, 2]
+    assert seen_second[0].store.stake.flags.writeable  # the leader serves what it fetched, not a re-read
+    assert seen_first[0].pnodes == first.pnodes
+    assert seen_second[1].diff.from_version == 1 and not seen_second[1].diff.is_empty
+    assert not seen_second[1].store.stake.flags.writeable  # a view of the mapped file
+    assert np.array_equal(seen_second[1].store.stake, seen_second[0].store.stake)
+    assert took_over and takeover.version == 3
+    assert client.fetches == 3
@@ -0,0 +1,30 @@
+import asyncio
+
+from app.main import app
+
+CONCURRENT_REQUESTS = 2000
+
+
+def test_concurrent_requests_share_upstream_calls(running_app):
+    async def run():
+        async with running_app(node_count=50, latency=0.5) as (http, stub):
+            pubkey = stub.pubkeys[0]
+            paths = [
+                f"/pnodes/{pubkey}?network=testnet" if i % 2 else "/pnodes/?network=testnet"
+                for i in range(CONCURRENT_REQUESTS)
+            ]
+            responses = await asyncio.gather(*(http.get(path) for path in paths))
+            client = app.state.client_registry.get("testnet")
+            fetches = await asyncio.gather(*(client.fetch_snapshot() for _ in range(CONCURRENT_REQUESTS)))
+            health = (await http.get("/health")).json()
+        return stub, responses, fetches, health["single_flight"]["testnet"]
+
+    stub, responses, fetches, stats = asyncio.run(run())
+
+    assert all(r.status_code == 200 for r in responses)
+    assert all(len(pnodes) == 50 for pnodes, _ in fetches)
+    assert stats["callers"] >= CONCURRENT_REQUESTS
+    # Thousands of callers collapse onto a handful of upstream batches
+    assert stub.http_requests <= 10
+    assert stub.method_calls["getClusterNodes"] == stub.http_requests
+    assert stats["max_callers_per_call"] > 100
@@ -0,0 +1,70 @@
+import asyncio
+import random
+import threading
+from datetime import datetime
+
+from app.services.synthetic_fleet import SyntheticFleet
+from app.services.xandeum_client import XandeumPRPCClient
+
+NOW = datetime(2024, 1, 1)
+
+
+def test_same_seed_replays_the_same_fleet():
+    a, b = SyntheticFleet("testnet", size=500, seed=7), SyntheticFleet("testnet", size=500, seed=7)
+    for _ in range(3):
+        a.tick()
+        b.tick()
+    assert a.pnodes(NOW) == b.pnodes(NOW)
+    assert a.network_info()["slot"] == b.network_info()["slot"]
+    assert SyntheticFleet("testnet", size=500, seed=8).pnodes(NOW) != a.pnodes(NOW)
+
+
+def test_identities_are_stable_and_churn_is_controlled():
+    stable = SyntheticFleet("demo", size=1000, churn_rate=0.0)
+    before = {p.pubkey: p for p in stable.pnodes(NOW)}
+    stable.tick()
+    after = {p.pubkey: p for p in stable.pnodes(NOW)}
+    assert before.keys() == after.keys()
+    assert sum(before[k].performance_score != after[k].performance_score for k in before) > 900
+
+    churning = SyntheticFleet("demo", size=1000, churn_rate=0.05)
+    first = {p.pubkey for p in churning.pnodes(NOW)}
+    churning.tick()
+    replaced = len(first - {p.pubkey for p in churning.pnodes(NOW)})
+    assert 20 <= replaced <= 90
+
+
+def test_batches_cover_any_size_in_stake_order():
+    fleet = SyntheticFleet("demo", size=25_000)
+    batches = list(fleet.batches(batch_size=10_000, now=NOW))
+    assert [len(b) for b in batches] == [10_000, 10_000, 5_000]
+    stakes = [p.stake for batch in batches for p in batch]
+    assert stakes == sorted(stakes, reverse=True)
+
+
+def test_details_do_not_touch_the_global_rng():
+    fleet = SyntheticFleet("demo", size=10)
+    pubkey = fleet.pnodes(NOW)[0].pubkey
+    random.seed(1234)
+    state = random.getstate()
+    first = fleet.details(pubkey)
+    unknown = fleet.details("xnd_dem_unknown")
+    assert random.getstate() == state
+    assert fleet.details("xnd_dem_unknown")["uptime_7d"] == unknown["uptime_7d"]
+    assert first["total_stake"] == fleet.pnodes(NOW)[0].stake
+
+
+def test_demo_snapshots_tick_the_fleet_off_the_event_loop():
+    fleet = SyntheticFleet("testnet", size=50)
+    ticked_on = []
+    tick = fleet.tick
+    fleet.tick = lambda: (ticked_on.append(threading.get_ident()), tick())
+
+    async def run():
+        client = XandeumPRPCClient("testnet", fleet=fleet)
+        pnodes, _ = await client.fetch_snapshot()
+        return pnodes, threading.get_ident()
+
+    pnodes, loop_thread = asyncio.run(run())
+    assert len(pnodes) == 50
+    assert ticked_on and loop_thread not in ticked_on
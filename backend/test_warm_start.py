@@ -0,0 +1,102 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app import config
+from app.services.pnode_store import PNodeStore
+from app.services.snapshot_cache import Snapshot, SnapshotCache
+from app.services.snapshot_persistence import SnapshotPersistence, decode_snapshot, encode_snapshot
+from app.services.synthetic_fleet import SyntheticFleet
+from stub_rpc_server import StubRpcServer
+
+
+def test_snapshot_file_round_trip():
+    fleet = SyntheticFleet("demo", size=500)
+    pnodes = fleet.pnodes()
+    pnodes[0].uptime_24h = None
+    pnodes[1].peer_count = None
+    snapshot = Snapshot(network="demo", version=7, pnodes=pnodes, network_info=fleet.network_info(),
+                        store=PNodeStore(pnodes), fetched_at=datetime.utcnow() - timedelta(seconds=90))
+    order = snapshot.store.sorted_rows("uptime_24h", descending=True)
+
+    restored = decode_snapshot(encode_snapshot(snapshot, snapshot.store.sort_orders()))
+
+    assert restored.restored and restored.version == 7
+    assert restored.pnodes == pnodes
+    assert restored.network_info == snapshot.network_info
+    assert 89 < restored.age_seconds < 95
+    assert restored.store.summary == snapshot.store.summary
+    assert np.array_equal(restored.store.sorted_rows("uptime_24h", descending=True), order)
+
+
+def test_unreadable_or_stale_files_are_ignored(tmp_path):
+    persistence = SnapshotPersistence(str(tmp_path), max_age=60)
+    (tmp_path / "testnet.snapshot").write_bytes(b"garbage")
+    assert persistence.load("testnet") is None
+    assert persistence.load("mainnet") is None
+
+    pnodes = SyntheticFleet("demo", size=5).pnodes()
+    old = Snapshot(network="demo", version=1, pnodes=pnodes, network_info={}, store=PNodeStore(pnodes),
+                   fetched_at=datetime.utcnow() - timedelta(seconds=120))
+    (tmp_path / "demo.snapshot").write_bytes(encode_snapshot(old, {}))
+    assert persistence.load("demo") is None
+
+
+def test_snapshots_are_restored_and_persisted_off_the_event_loop(tmp_path):
+    persistence = SnapshotPersistence(str(tmp_path))
+    pnodes = SyntheticFleet("demo", size=20).pnodes()
+    persistence.write(Snapshot(network="demo", version=3, pnodes=pnodes, network_info={}, store=PNodeStore(pnodes)), {})
+    threads = []
+
+    def load(network):
+        threads.append(threading.get_ident())
+        return persistence.load(network)
+
+    async def run():
+        cache = SnapshotCache(client_factory=None, networks=["demo"], restore=load)
+        cache.refresh = lambda network: asyncio.sleep(3600)  # no upstream: keep the restored snapshot
+        await cache.start()
+        restored = cache.peek("demo")
+        await cache.stop()
+
+        sorted_on = []
+        fresh = Snapshot(network="demo", version=4, pnodes=pnodes, network_info={}, store=PNodeStore(pnodes))
+        sorted_rows = fresh.store.sorted_rows
+        fresh.store.sorted_rows = lambda *args, **kwargs: (sorted_on.append(threading.get_ident()), sorted_rows(*args, **kwargs))[1]
+        persistence.record(fresh)
+        await persistence.close()
+        return restored, threading.get_ident(), sorted_on
+
+    restored, loop_thread, sorted_on = asyncio.run(run())
+    # Restored by start(), before any request asked for it
+    assert restored is not None and restored.restored and restored.version == 3
+    assert threads and loop_thread not in threads
+    assert sorted_on and loop_thread not in sorted_on
+    assert persistence.load("demo").version == 4
+
+
+def test_restart_serves_the_persisted_snapshot_while_upstream_is_down(monkeypatch, tmp_path, running_app):
+    monkeypatch.setattr(config, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+
+    async def run():
+        async with StubRpcServer(node_count=200) as stub:
+            async with running_app(stubs={"testnet": stub}) as (http, _):
+                before = await http.get("/pnodes/?limit=50")
+
+            stub.down = True
+            async with running_app(stubs={"testnet": stub}) as (http, _):
+                after = await http.get("/pnodes/?limit=50")
+                revalidated = await http.get("/pnodes/?limit=50", headers={"If-None-Match": before.headers["etag"]})
+                health = await http.get("/health")
+            return before, after, revalidated, health
+
+    before, after, revalidated, health = asyncio.run(run())
+    assert "x-snapshot-restored" not in before.headers
+    assert after.status_code == 200
+    assert after.headers["x-snapshot-restored"] == "true"
+    assert after.json()["pnodes"] == before.json()["pnodes"]
+    assert after.json()["snapshot_version"] == before.json()["snapshot_version"]
+    assert revalidated.status_code == 304  # same version, same ETag across the restart
+    assert health.json()["snapshots"]["testnet"]["restored"]
@@ -2,10 +2,13 @@
 // Xandeum pNode Dashboard - Main Script
 // ============================================
 
-// Configuration
-const API_BASE = 'http://localhost:8000';
+// Configuration - same origin when the page is served by the API (/dashboard/)
+const API_BASE = document.querySelector('meta[name="api-base"]')?.content ?? 'http://localhost:8000';
 let allPnodes = [];
 let currentNetwork = 'testnet';
+let currentVersion = null;  // snapshot_version of the rows in allPnodes
+let liveSource = null;
+let pollTimer = null;
 
 // Initialize
 document.addEventListener('DOMContentLoaded', () => {
@@ -16,8 +19,20 @@ function initializeDashboard() {
     setupEventListeners();
     loadDashboardData();
     
-    // Auto-refresh every 30 seconds
-    setInterval(loadDashboardData, 30000);
+    // Updates are pushed by the API; browsers without EventSource poll every 30 seconds
+    startLiveUpdates();
+}
+
+function startLiveUpdates() {
+    if (liveSource) liveSource.close();
+    if (!window.EventSource) {
+        if (!pollTimer) pollTimer = setInterval(refreshDashboardData, 30000);
+        return;
+    }
+    liveSource = new EventSource(`${API_BASE}/pnodes/stream?network=${currentNetwork}`);
+    liveSource.addEventListener('snapshot', event => {
+        applyUpdate(JSON.parse(event.data)).catch(error => console.error('Error applying live update:', error));
+    });
 }
 
 function setupEventListeners() {
@@ -69,8 +84,10 @@ async function switchNetwork() {
             break;
     }
     
+    currentVersion = null;
     showNotification(`Switching to ${currentNetwork}...`, 'info');
     await loadDashboardData();
+    startLiveUpdates();
 }
 
 // Load all dashboard data
@@ -78,19 +95,13 @@ async function loadDashboardData() {
     try {
         showNotification(`Loading ${currentNetwork} data...`, 'info');
         
-        // Load stats summary
-        const statsResponse = await fetch(`${API_BASE}/pnodes/stats/summary?network=${currentNetwork}`);
-        const stats = await statsResponse.json();
-        renderStats(stats);
-        
-        // Load pnodes
-        const pnodesResponse = await fetch(`${API_BASE}/pnodes?network=${currentNetwork}&limit=100`);
-        const pnodesData = await pnodesResponse.json();
-        allPnodes = pnodesData.pnodes || [];
-        filterTable();
-        
-        // Load network info
-        await loadNetworkInfo();
+        // Stats summary, network info and the first page come from one snapshot in one request
+        const response = await fetch(`${API_BASE}/dashboard/bootstrap?${pnodeParams()}`);
+        if (!response.ok) throw new Error(`bootstrap failed: ${response.status}`);
+        const data = await response.json();
+        renderStats(data.summary);
+        renderNetworkInfo(data.network_info);
+        renderPnodes(data.pnodes);
         
         // Update timestamp
         const now = new Date();
@@ -115,10 +126,7 @@ async function loadDashboardData() {
 async function loadNetworkInfo() {
     try {
         const response = await fetch(`${API_BASE}/pnodes/network/info?network=${currentNetwork}`);
-        const data = await response.json();
-        
-        document.getElementById('currentEpoch').textContent = data.epoch || 0;
-        document.getElementById('currentSlot').textContent = data.slot || 0;
+        renderNetworkInfo(await response.json());
     } catch (error) {
         console.error('Error loading network info:', error);
         document.getElementById('currentEpoch').textContent = '0';
@@ -126,6 +134,11 @@ async function loadNetworkInfo() {
     }
 }
 
+function renderNetworkInfo(data) {
+    document.getElementById('currentEpoch').textContent = data.epoch || 0;
+    document.getElementById('currentSlot').textContent = data.slot || 0;
+}
+
 // Render statistics
 function renderStats(stats) {
     const statsGrid = document.getElementById('statsGrid');
@@ -190,38 +203,111 @@ function renderStats(stats) {
     `).join('');
 }
 
-// Filter and render table
-function filterTable() {
-    const searchTerm = document.getElementById('searchInput')?.value.toLowerCase() || '';
+// Sort options map to API sort keys
+const SORT_OPTIONS = {
+    stake: { sort_by: 'stake', order: 'desc' },
+    performance: { sort_by: 'performance_score', order: 'desc' },
+    commission: { sort_by: 'commission', order: 'asc' }
+};
+
+// Load pnodes - filtering, search and sorting run server-side over the whole fleet
+// Only the columns renderTable() shows
+const TABLE_FIELDS = ['pubkey', 'ip', 'version', 'is_active', 'last_seen', 'stake', 'commission', 'performance_score'];
+
+// Listing parameters shared by /pnodes/ and /dashboard/bootstrap
+function pnodeParams() {
+    const searchTerm = document.getElementById('searchInput')?.value.trim() || '';
     const activeOnly = document.getElementById('activeOnly')?.checked || false;
     const sortBy = document.getElementById('sortSelect')?.value || 'stake';
 
-    let filtered = allPnodes.filter(pnode => {
-        const matchesSearch = 
-            pnode.pubkey.toLowerCase().includes(searchTerm) ||
-            pnode.ip.toLowerCase().includes(searchTerm) ||
-            (pnode.data_center && pnode.data_center.toLowerCase().includes(searchTerm));
-        
-        const matchesActive = !activeOnly || pnode.is_active;
-        
-        return matchesSearch && matchesActive;
+    const params = new URLSearchParams({
+        network: currentNetwork,
+        limit: 100,
+        fields: TABLE_FIELDS.join(','),
+        ...(SORT_OPTIONS[sortBy] || SORT_OPTIONS.stake)
     });
+    if (searchTerm) params.set('search', searchTerm);
+    if (activeOnly) params.set('active_only', 'true');
+    return params;
+}
 
-    // Sort
-    filtered.sort((a, b) => {
-        switch (sortBy) {
-            case 'stake':
-                return b.stake - a.stake;
-            case 'performance':
-                return b.performance_score - a.performance_score;
-            case 'commission':
-                return a.commission - b.commission;
-            default:
-                return 0;
+async function loadPnodes() {
+    const response = await fetch(`${API_BASE}/pnodes/?${pnodeParams()}`);
+    renderPnodes(await response.json());
+}
+
+function renderPnodes(data) {
+    allPnodes = data.pnodes || [];
+    currentVersion = data.snapshot_version ?? null;
+    renderTable(allPnodes);
+}
+
+// Patch the table with a changes payload; reload the page when rows may have moved
+async function applyChanges(changes, version) {
+    const sortKey = (SORT_OPTIONS[document.getElementById('sortSelect')?.value] || SORT_OPTIONS.stake).sort_by;
+    const reorders = changes.changed.some(c =>
+        c.changed_fields.includes(sortKey) || c.changed_fields.includes('is_active'));
+    if (changes.added.length || changes.removed.length || reorders) {
+        await loadPnodes();
+        return;
+    }
+    const updated = new Map(changes.changed.map(c => [c.pubkey, c.pnode]));
+    allPnodes = allPnodes.map(pnode => updated.get(pnode.pubkey) || pnode);
+    currentVersion = version;
+    renderTable(allPnodes);
+}
+
+// Live update pushed over /pnodes/stream
+async function applyUpdate(update) {
+    if (update.network !== currentNetwork) return;
+    if (currentVersion !== null && update.version <= currentVersion) return;
+
+    renderStats(update.summary);
+    document.getElementById('currentEpoch').textContent = update.network_info.epoch || 0;
+    document.getElementById('currentSlot').textContent = update.network_info.slot || 0;
+
+    if (update.full_resync || currentVersion === null || update.since !== currentVersion) {
+        await loadPnodes();
+    } else {
+        await applyChanges(update.changes, update.version);
+    }
+    document.getElementById('lastUpdateTime').textContent = new Date().toLocaleTimeString();
+}
+
+// Polling fallback - only fetch what changed since the version on screen.
+// Summary and network info are revalidated with ETags, so unchanged ones are 304s.
+async function refreshDashboardData() {
+    if (currentVersion === null) {
+        return loadDashboardData();
+    }
+
+    try {
+        const response = await fetch(`${API_BASE}/pnodes/changes?network=${currentNetwork}&since=${currentVersion}`);
+        const changes = await response.json();
+        if (changes.version === currentVersion) return;
+
+        if (changes.full_resync) {
+            await loadPnodes();
+        } else {
+            await applyChanges(changes, changes.version);
         }
-    });
 
-    renderTable(filtered);
+        const statsResponse = await fetch(`${API_BASE}/pnodes/stats/summary?network=${currentNetwork}`);
+        renderStats(await statsResponse.json());
+        await loadNetworkInfo();
+        document.getElementById('lastUpdateTime').textContent = new Date().toLocaleTimeString();
+    } catch (error) {
+        console.error('Error refreshing dashboard data:', error);
+    }
+}
+
+// Filter and render table (debounced so typing doesn't fire a request per key)
+let filterTimer = null;
+function filterTable() {
+    clearTimeout(filterTimer);
+    filterTimer = setTimeout(() => {
+        loadPnodes().catch(error => console.error('Error loading pNodes:', error));
+    }, 250);
 }
 
 // Render table